@@ -0,0 +1,60 @@
+"""
+Compara los formatos de persistencia: tamaño del archivo, tiempo de guardado
+y tiempo de carga, sobre datos sintéticos.
+
+Uso:
+    python benchmarks/bench_persistence.py --tareas 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from bench_startup import generar_datos
+from utils.storage import AlmacenamientoArchivo, AlmacenamientoBinario
+
+
+def medir(storage, data, repeticiones):
+    """Retorna (bytes, segundos de guardado, segundos de carga), el mejor de las repeticiones"""
+    guardado = carga = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        storage.escribir(data)
+        guardado = min(guardado, time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        storage.decodificar(storage.leer())
+        carga = min(carga, time.perf_counter() - inicio)
+    return os.path.getsize(storage.filename), guardado, carga
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tareas', type=int, default=10000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        origen = os.path.join(directorio, 'origen.json')
+        generar_datos(origen, args.tareas)
+        fuente = AlmacenamientoArchivo(origen)
+        data = fuente.decodificar(fuente.leer())
+
+        formatos = [
+            ('json', AlmacenamientoArchivo(os.path.join(directorio, 'data.json'))),
+            ('binario', AlmacenamientoBinario(os.path.join(directorio, 'data.bin'), 'ninguna')),
+            ('binario+zlib', AlmacenamientoBinario(os.path.join(directorio, 'data.zlib'), 'zlib')),
+            ('binario+gzip', AlmacenamientoBinario(os.path.join(directorio, 'data.gz'), 'gzip')),
+        ]
+
+        print(f"{'formato':>14} {'tamaño KB':>11} {'guardar ms':>11} {'cargar ms':>10}")
+        for nombre, storage in formatos:
+            tamano, guardado, carga = medir(storage, data, args.repeticiones)
+            print(f"{nombre:>14} {tamano / 1024:11.1f} {guardado * 1000:11.1f} {carga * 1000:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Mide el costo de arranque: importar controller, crear la aplicación y la
+primera solicitud (que es cuando se cargan los datos).
+
+Uso:
+    python benchmarks/bench_startup.py --tareas 100000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+MEDICION = r'''
+import json, sys, time
+inicio = time.perf_counter()
+import controller
+importado = time.perf_counter()
+app = controller.create_app({"DATA_FILE": sys.argv[1]})
+creada = time.perf_counter()
+app.test_client().get("/stats")
+primera = time.perf_counter()
+print(json.dumps({
+    "import_s": importado - inicio,
+    "create_app_s": creada - importado,
+    "primera_solicitud_s": primera - creada
+}))
+'''
+
+
+def generar_datos(filename, cantidad):
+    """Genera un archivo de datos con usuarios, tareas y asignaciones sintéticas"""
+    usuarios = [{"alias": f"dev{i}", "nombre": f"Usuario {i}"} for i in range(100)]
+    tareas = []
+    asignaciones = []
+    for task_id in range(1, cantidad + 1):
+        alias = f"dev{task_id % 100}"
+        tareas.append({
+            "id": task_id,
+            "nombre": f"Tarea {task_id} de autenticación",
+            "descripcion": f"Descripción de la tarea {task_id}",
+            "usuario_creador": alias,
+            "rol": "programador",
+            "estado": "nueva",
+            "dependencias": [task_id - 1] if task_id > 1 else []
+        })
+        asignaciones.append({"task_id": task_id, "user_alias": alias, "rol": "programador"})
+    with open(filename, 'w') as f:
+        json.dump({"tasks": tareas, "users": usuarios, "assignments": asignaciones,
+                   "next_task_id": cantidad + 1}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tareas', type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        filename = os.path.join(directorio, 'data.json')
+        generar_datos(filename, args.tareas)
+        resultado = subprocess.run(
+            [sys.executable, '-c', MEDICION, filename],
+            cwd=SRC, capture_output=True, text=True, check=True
+        )
+        for clave, valor in json.loads(resultado.stdout).items():
+            print(f"{clave:>22}: {valor * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
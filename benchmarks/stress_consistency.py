@@ -0,0 +1,268 @@
+"""
+Prueba de estrés y consistencia ante caídas: levanta el servidor en un proceso
+aparte, lo carga con clientes concurrentes y lo mata con SIGKILL a mitad de un
+save_data. Después de cada caída recarga el archivo de datos y verifica que sea
+consistente y que no falte ninguna escritura confirmada. También informa el
+rendimiento (operaciones por segundo) bajo esa carga.
+
+Uso:
+    python benchmarks/stress_consistency.py --rondas 10 --clientes 16 --tareas-iniciales 5000
+
+Para matar el proceso durante una escritura, el padre le envía SIGUSR1 y el
+servidor programa un SIGKILL a sí mismo en un punto al azar del siguiente
+save_data (serialización, escritura, fsync o reemplazo del archivo). Si no
+ocurre ninguna escritura a tiempo, el padre lo mata igual.
+"""
+import argparse
+import glob
+import http.client
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+from data_handler import DataHandler
+
+
+USUARIOS = [f"dev{i}" for i in range(10)]
+ROLES = ['programador', 'pruebas', 'infra']
+
+
+def servir(filename):
+    """Modo hijo: sirve la aplicación con un servidor de hilos e informa el puerto"""
+    from werkzeug.serving import make_server
+    from controller import create_app
+
+    # Con SIGUSR1 el siguiente save_data muere en un punto al azar de su duración
+    armado = threading.Event()
+    signal.signal(signal.SIGUSR1, lambda *_: armado.set())
+    save_data = DataHandler.save_data
+    duracion = [0.01]
+
+    def save_data_con_caida(self):
+        if armado.is_set():
+            armado.clear()
+            retardo = random.uniform(0, duracion[0])
+            threading.Timer(retardo, os.kill, (os.getpid(), signal.SIGKILL)).start()
+        inicio = time.perf_counter()
+        save_data(self)
+        duracion[0] = time.perf_counter() - inicio
+
+    DataHandler.save_data = save_data_con_caida
+
+    app = create_app({'DATA_FILE': filename, 'PRELOAD': True, 'WRITE_QUEUE_DEPTH': 256})
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    print(servidor.server_port, flush=True)
+    servidor.serve_forever()
+
+
+def preparar(filename, tareas_iniciales):
+    """Crea los usuarios y las tareas iniciales con una sola escritura"""
+    data_handler = DataHandler(filename)
+    tareas = [
+        {'nombre': f"Tarea inicial {i}", 'descripcion': "Carga de datos para la prueba",
+         'usuario_creador': USUARIOS[i % len(USUARIOS)], 'rol': ROLES[i % len(ROLES)]}
+        for i in range(tareas_iniciales)
+    ]
+    data_handler.import_records([{'alias': alias, 'nombre': alias} for alias in USUARIOS], tareas)
+
+
+class Cliente(threading.Thread):
+    """Envía operaciones al azar hasta que el servidor deja de responder"""
+
+    def __init__(self, puerto, confirmadas, semilla):
+        super().__init__(daemon=True)
+        self.puerto = puerto
+        self.confirmadas = confirmadas  # task_id confirmados con 201, compartido
+        self.random = random.Random(semilla)
+        self.exitosas = 0
+        self.rechazadas = 0
+
+    def _post(self, conexion, ruta, cuerpo):
+        conexion.request('POST', ruta, json.dumps(cuerpo), {'Content-Type': 'application/json'})
+        respuesta = conexion.getresponse()
+        return respuesta.status, json.loads(respuesta.read() or b'{}')
+
+    def _operacion(self, conexion):
+        r = self.random.random()
+        conocidas = self.confirmadas
+        if r < 0.5 or not conocidas:
+            status, cuerpo = self._post(conexion, '/tasks', {
+                'nombre': "Tarea de estrés", 'descripcion': "Creada por la prueba",
+                'usuario': self.random.choice(USUARIOS), 'rol': self.random.choice(ROLES)
+            })
+            if status == 201:
+                conocidas.append(cuerpo['task_id'])
+            return status
+        task_id = self.random.choice(conocidas)
+        if r < 0.7:
+            return self._post(conexion, f'/tasks/{task_id}/users', {
+                'usuario': self.random.choice(USUARIOS), 'rol': self.random.choice(ROLES),
+                'accion': self.random.choice(['adicionar', 'remover'])
+            })[0]
+        if r < 0.9:
+            return self._post(conexion, f'/tasks/{task_id}', {
+                'estado': self.random.choice(['en_progreso', 'nueva', 'finalizada'])
+            })[0]
+        return self._post(conexion, f'/tasks/{task_id}/dependencies', {
+            'dependencytaskid': self.random.choice(conocidas), 'accion': 'adicionar'
+        })[0]
+
+    def run(self):
+        conexion = http.client.HTTPConnection('127.0.0.1', self.puerto, timeout=30)
+        while True:
+            try:
+                status = self._operacion(conexion)
+            except (OSError, http.client.HTTPException):
+                return
+            # Un 422 (transición o asignación inválida elegida al azar) también es una respuesta atendida
+            if status == 503:
+                self.rechazadas += 1
+            else:
+                self.exitosas += 1
+
+
+def verificar_consistencia(data_handler, confirmadas):
+    """Retorna la lista de inconsistencias del almacén recargado"""
+    errores = []
+    ids = [task.id for task in data_handler.tasks]
+    if len(ids) != len(set(ids)):
+        errores.append("IDs de tareas repetidos")
+    aliases = [user.alias for user in data_handler.users]
+    if len(aliases) != len(set(aliases)):
+        errores.append("Alias de usuarios repetidos")
+
+    todos = set(ids) | {task_id for task_id in confirmadas if task_id in data_handler.archive}
+    maximo = max(todos, default=0)
+    if data_handler.next_task_id <= maximo:
+        errores.append(f"next_task_id {data_handler.next_task_id} no es mayor que el ID máximo {maximo}")
+
+    faltantes = [task_id for task_id in confirmadas if task_id not in todos]
+    if faltantes:
+        errores.append(f"{len(faltantes)} tareas confirmadas no están en el archivo, p. ej. {faltantes[:5]}")
+
+    asignadas = {user.alias: set(user.tareas_asignadas) for user in data_handler.users}
+    for task in data_handler.tasks:
+        if not task.usuarios_asignados:
+            errores.append(f"Tarea {task.id} sin usuarios asignados")
+        for asignacion in task.usuarios_asignados:
+            if task.id not in asignadas.get(asignacion['usuario'], ()):
+                errores.append(f"Tarea {task.id} asignada a {asignacion['usuario']} sin reflejo en el usuario")
+        for dep_id in task.dependencias:
+            if dep_id not in todos:
+                errores.append(f"Tarea {task.id} depende de {dep_id}, que no existe")
+    for alias, task_ids in asignadas.items():
+        for task_id in task_ids:
+            task = data_handler.get_task_by_id(task_id)
+            if task is None or task.rol_asignado(alias) is None:
+                errores.append(f"Usuario {alias} lista la tarea {task_id} sin estar asignado")
+    return errores
+
+
+def ronda(filename, clientes, duracion, semilla):
+    """Levanta el servidor, lo carga, lo mata y retorna las métricas de la ronda"""
+    proceso = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--servir', filename],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    linea = proceso.stdout.readline()
+    if not linea:
+        proceso.wait()
+        raise RuntimeError("El servidor no pudo iniciar; el archivo de datos quedó dañado")
+    puerto = int(linea)
+
+    confirmadas = []
+    hilos = [Cliente(puerto, confirmadas, semilla * 1000 + i) for i in range(clientes)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(duracion)
+
+    proceso.send_signal(signal.SIGUSR1)
+    try:
+        proceso.wait(timeout=5)
+        durante_escritura = True
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+        proceso.wait()
+        durante_escritura = False
+    transcurrido = time.perf_counter() - inicio
+    for hilo in hilos:
+        hilo.join()
+
+    for temporal in glob.glob(filename + '.*.tmp'):
+        os.unlink(temporal)
+    return {
+        'confirmadas': confirmadas,
+        'operaciones': sum(hilo.exitosas for hilo in hilos),
+        'rechazadas': sum(hilo.rechazadas for hilo in hilos),
+        'segundos': transcurrido,
+        'durante_escritura': durante_escritura
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servir', metavar='ARCHIVO', help=argparse.SUPPRESS)
+    parser.add_argument('--rondas', type=int, default=10)
+    parser.add_argument('--clientes', type=int, default=16)
+    parser.add_argument('--tareas-iniciales', type=int, default=5000)
+    parser.add_argument('--duracion-min', type=float, default=0.5, help="segundos mínimos antes de la caída")
+    parser.add_argument('--duracion-max', type=float, default=2.0, help="segundos máximos antes de la caída")
+    parser.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.servir:
+        servir(args.servir)
+        return 0
+
+    azar = random.Random(args.semilla)
+    fallas = 0
+    durante_escritura = 0
+    operaciones = segundos = 0
+    with tempfile.TemporaryDirectory() as directorio:
+        filename = os.path.join(directorio, 'data.json')
+        preparar(filename, args.tareas_iniciales)
+        confirmadas = []
+
+        print(f"{'ronda':>5} {'ops':>7} {'ops/s':>8} {'503':>5} {'en save':>8}  resultado")
+        for numero in range(1, args.rondas + 1):
+            try:
+                resultado = ronda(filename, args.clientes,
+                                  azar.uniform(args.duracion_min, args.duracion_max), args.semilla + numero)
+            except RuntimeError as e:
+                print(f"{numero:>5}  {e}")
+                return 1
+            confirmadas.extend(resultado['confirmadas'])
+            durante_escritura += resultado['durante_escritura']
+            operaciones += resultado['operaciones']
+            segundos += resultado['segundos']
+
+            try:
+                errores = verificar_consistencia(DataHandler(filename), confirmadas)
+            except Exception as e:
+                errores = [f"No se pudo recargar: {e!r}"]
+            fallas += bool(errores)
+
+            print(f"{numero:>5} {resultado['operaciones']:>7} "
+                  f"{resultado['operaciones'] / resultado['segundos']:>8.1f} {resultado['rechazadas']:>5} "
+                  f"{'sí' if resultado['durante_escritura'] else 'no':>8}  "
+                  f"{'consistente' if not errores else 'INCONSISTENTE'}")
+            for error in errores[:10]:
+                print(f"        - {error}")
+
+    print(f"\n{operaciones} operaciones en {segundos:.1f} s ({operaciones / segundos:.1f} ops/s)")
+    print(f"{args.rondas} caídas, {durante_escritura} durante save_data, {fallas} con inconsistencias")
+    return 1 if fallas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+import pytest
+import sys
+import os
+
+# Agregar el directorio src al path para importar los módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from data_handler import DataHandler
+from utils.storage import AlmacenamientoMemoria
+
+
+@pytest.fixture
+def memory_storage():
+    """Almacenamiento en memoria: las pruebas no escriben archivos ni los comparten"""
+    return AlmacenamientoMemoria()
+
+
+@pytest.fixture(scope='session')
+def datos_base():
+    """Snapshot con usuarios, tareas y una dependencia, construido una sola vez por sesión"""
+    data_handler = DataHandler(storage=AlmacenamientoMemoria())
+    data_handler.create_user("dev1", "Juan Pérez")
+    data_handler.create_user("dev2", "María García")
+    login = data_handler.create_task("Login", "Formulario de ingreso", "dev1", "programador")
+    base = data_handler.create_task("Base de datos", "Esquema inicial", "dev2", "infra")
+    data_handler.add_task_dependency(login.id, base.id)
+    data_handler.assign_user_to_task(login.id, "dev2", "pruebas")
+    return data_handler.snapshot()
+
+
+@pytest.fixture
+def handler_con_datos(memory_storage, datos_base):
+    """DataHandler en memoria restaurado desde el snapshot base"""
+    data_handler = DataHandler(storage=memory_storage)
+    data_handler.restore(datos_base)
+    return data_handler
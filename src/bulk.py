@@ -0,0 +1,168 @@
+"""
+Importación y exportación masiva de usuarios y tareas en NDJSON o CSV.
+
+Uso:
+    python src/bulk.py --data data.json import --usuarios usuarios.csv --tareas tareas.ndjson
+    python src/bulk.py --data data.json export --tareas tareas.csv --archivadas
+    python src/bulk.py --data data.json convert data.bin --compresion gzip
+
+El formato se deduce de la extensión (.csv o NDJSON para cualquier otra);
+'-' representa la entrada o salida estándar. convert pasa el archivo de datos
+al formato binario (o de vuelta a JSON con --formato json).
+"""
+import argparse
+import csv
+import json
+import sys
+from contextlib import contextmanager
+
+from data_handler import DataHandler
+from utils.storage import COMPRESIONES, convertir
+
+
+CAMPOS_USUARIO = ['alias', 'nombre']
+CAMPOS_TAREA = ['id', 'nombre', 'descripcion', 'usuario_creador', 'rol', 'estado',
+                'dependencias', 'usuarios_asignados']
+
+
+def _es_csv(ruta):
+    return ruta.lower().endswith('.csv')
+
+
+@contextmanager
+def _abrir(ruta, modo):
+    """Abre un archivo o la entrada/salida estándar si la ruta es '-'"""
+    if ruta == '-':
+        yield sys.stdin if 'r' in modo else sys.stdout
+    else:
+        with open(ruta, modo, encoding='utf-8', newline='') as f:
+            yield f
+
+
+def _tarea_desde_csv(fila):
+    """Convierte una fila CSV: dependencias '2;3' y usuarios_asignados 'dev1:programador;dev2:pruebas'"""
+    tarea = {campo: fila.get(campo) or None for campo in CAMPOS_TAREA}
+    # Los IDs de dependencias se convierten a número al validar la importación
+    tarea['dependencias'] = [dep for dep in (fila.get('dependencias') or '').split(';') if dep]
+    asignaciones = []
+    for par in (fila.get('usuarios_asignados') or '').split(';'):
+        if par:
+            usuario, _, rol = par.partition(':')
+            asignaciones.append({'usuario': usuario, 'rol': rol})
+    tarea['usuarios_asignados'] = asignaciones
+    return tarea
+
+
+def _tarea_a_csv(tarea):
+    fila = dict(tarea)
+    fila['dependencias'] = ';'.join(str(dep) for dep in tarea['dependencias'])
+    fila['usuarios_asignados'] = ';'.join(
+        f"{asignacion['usuario']}:{asignacion['rol']}" for asignacion in tarea['usuarios_asignados']
+    )
+    return fila
+
+
+def leer_registros(ruta, tipo):
+    """Lee registros de forma incremental desde NDJSON o CSV"""
+    with _abrir(ruta, 'r') as f:
+        if _es_csv(ruta):
+            for fila in csv.DictReader(f):
+                yield _tarea_desde_csv(fila) if tipo == 'tarea' else fila
+        else:
+            for numero, linea in enumerate(f, 1):
+                if linea.strip():
+                    try:
+                        yield json.loads(linea)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"{ruta}, línea {numero}: JSON inválido ({e})")
+
+
+def escribir_registros(ruta, registros, campos, a_csv=None):
+    """Escribe registros uno a uno, sin acumularlos en memoria"""
+    total = 0
+    with _abrir(ruta, 'w') as f:
+        if _es_csv(ruta):
+            escritor = csv.DictWriter(f, fieldnames=campos)
+            escritor.writeheader()
+            for registro in registros:
+                escritor.writerow(a_csv(registro) if a_csv else registro)
+                total += 1
+        else:
+            for registro in registros:
+                f.write(json.dumps(registro, ensure_ascii=False))
+                f.write('\n')
+                total += 1
+    return total
+
+
+def importar(data_handler, ruta_usuarios=None, ruta_tareas=None):
+    """Importa los archivos indicados con una sola escritura del almacenamiento"""
+    usuarios = list(leer_registros(ruta_usuarios, 'usuario')) if ruta_usuarios else []
+    tareas = list(leer_registros(ruta_tareas, 'tarea')) if ruta_tareas else []
+    return data_handler.import_records(usuarios, tareas)
+
+
+def exportar(data_handler, ruta_usuarios=None, ruta_tareas=None, archivadas=False):
+    """Exporta usuarios y tareas; con archivadas incluye también el almacén frío"""
+    total_usuarios = total_tareas = 0
+    if ruta_usuarios:
+        usuarios = ({'alias': u.alias, 'nombre': u.nombre} for u in data_handler.users)
+        total_usuarios = escribir_registros(ruta_usuarios, usuarios, CAMPOS_USUARIO)
+    if ruta_tareas:
+        def tareas():
+            for task in data_handler.tasks:
+                yield task.to_dict()
+            if archivadas:
+                yield from data_handler.archive
+        total_tareas = escribir_registros(ruta_tareas, tareas(), CAMPOS_TAREA, _tarea_a_csv)
+    return total_usuarios, total_tareas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importación y exportación masiva de tareas")
+    parser.add_argument('--data', default='data.json', help="archivo de datos del DataHandler")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    parser_import = subparsers.add_parser('import', help="importar usuarios y tareas")
+    parser_import.add_argument('--usuarios', help="archivo de usuarios (.ndjson o .csv)")
+    parser_import.add_argument('--tareas', help="archivo de tareas (.ndjson o .csv)")
+
+    parser_export = subparsers.add_parser('export', help="exportar usuarios y tareas")
+    parser_export.add_argument('--usuarios', help="archivo de salida de usuarios")
+    parser_export.add_argument('--tareas', help="archivo de salida de tareas")
+    parser_export.add_argument('--archivadas', action='store_true', help="incluir tareas archivadas")
+
+    parser_convert = subparsers.add_parser('convert', help="convertir el archivo de datos entre JSON y binario")
+    parser_convert.add_argument('destino', help="archivo de datos de salida")
+    parser_convert.add_argument('--formato', choices=['binary', 'json'], default='binary')
+    parser_convert.add_argument('--compresion', choices=list(COMPRESIONES), default='zlib')
+
+    args = parser.parse_args(argv)
+    if args.comando == 'convert':
+        try:
+            data = convertir(args.data, args.destino, args.formato, args.compresion)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"Convertidas {len(data.get('tasks', []))} tareas a {args.destino}", file=sys.stderr)
+        return 0
+
+    if not args.usuarios and not args.tareas:
+        parser.error("indique --usuarios y/o --tareas")
+
+    data_handler = DataHandler(args.data)
+    try:
+        if args.comando == 'import':
+            usuarios, tareas = importar(data_handler, args.usuarios, args.tareas)
+            print(f"Importados {usuarios} usuarios y {tareas} tareas", file=sys.stderr)
+        else:
+            usuarios, tareas = exportar(data_handler, args.usuarios, args.tareas, args.archivadas)
+            print(f"Exportados {usuarios} usuarios y {tareas} tareas", file=sys.stderr)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,75 @@
-from flask import Flask, jsonify, request
+from flask import Blueprint, Flask, Response, current_app, jsonify, make_response, request, stream_with_context
+from werkzeug.local import LocalProxy
 from data_handler import DataHandler
+from utils.changes import HistorialExpirado
+from utils.admission import ColaSaturada, ControlAdmision
+from utils.storage import AlmacenamientoBinario, AlmacenamientoMemoria
+from models.tarea import Tarea
+from models.usuario import Usuario
+from contextlib import ExitStack
+from functools import wraps
+import gzip
+import hashlib
+import json
+import os
 import re
+import threading
+import time
+import zlib
 
-app = Flask(__name__)
-data_handler = DataHandler()
+
+class TaskSystem:
+    """
+    Servicios de una aplicación: el DataHandler se crea de forma diferida en el
+    primer uso (o al llamar a preload), así importar el módulo o crear la
+    aplicación no lee el archivo de datos
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._data_handler = config.get('DATA_HANDLER')
+        self._lock = threading.Lock()
+        self.write_admission = ControlAdmision(
+            concurrencia=config['WRITE_CONCURRENCY'],
+            profundidad_cola=config['WRITE_QUEUE_DEPTH'],
+            espera_maxima=config['WRITE_QUEUE_TIMEOUT']
+        )
+        # Long-polls y streams SSE ocupan un hilo mientras esperan: se limitan por
+        # debajo de los hilos del servidor para que el resto de la API siga respondiendo.
+        # Con FEED_MAX_CLIENTS=0 solo se atienden consultas sin espera
+        self.feed_admission = ControlAdmision(
+            concurrencia=config['FEED_MAX_CLIENTS'], profundidad_cola=0
+        ) if config['FEED_MAX_CLIENTS'] > 0 else None
+
+    @property
+    def loaded(self):
+        return self._data_handler is not None
+
+    @property
+    def data_handler(self):
+        if self._data_handler is None:
+            with self._lock:
+                if self._data_handler is None:
+                    if self.config['STORAGE'] == 'memory':
+                        self._data_handler = DataHandler(storage=AlmacenamientoMemoria())
+                    elif self.config['STORAGE'] == 'binary':
+                        storage = AlmacenamientoBinario(self.config['DATA_FILE'])
+                        self._data_handler = DataHandler(storage=storage)
+                    else:
+                        self._data_handler = DataHandler(self.config['DATA_FILE'])
+        return self._data_handler
+
+    def preload(self):
+        """Carga los datos ahora, por ejemplo en el proceso maestro antes de crear los workers"""
+        return self.data_handler
+
+
+def _services():
+    return current_app.extensions['task_system']
+
+# Se resuelven en cada solicitud contra la aplicación actual
+data_handler = LocalProxy(lambda: _services().data_handler)
+write_admission = LocalProxy(lambda: _services().write_admission)
 
 class TaskController:
     def __init__(self, data_handler):
@@ -12,14 +78,167 @@ class TaskController:
 # Instanciar el controlador
 task_controller = TaskController(data_handler)
 
-@app.route('/usuarios/mialias=<alias>', methods=['GET'])
+api = Blueprint('api', __name__)
+
+def create_app(config=None):
+    """
+    Crea la aplicación. Configuración (también por variables de entorno):
+    DATA_FILE (TASKS_DATA_FILE), STORAGE (TASKS_STORAGE: 'file' detecta el formato
+    del archivo, 'binary' escribe el formato binario y 'memory' sirve para
+    ejecuciones efímeras), DATA_HANDLER (instancia ya creada), PRELOAD,
+    WRITE_CONCURRENCY, WRITE_QUEUE_DEPTH, WRITE_QUEUE_TIMEOUT, FEED_MAX_CLIENTS
+    (long-polls y streams simultáneos) y STREAM_MAX_SECONDS (duración de cada
+    stream SSE), y COMPRESS_MIN_SIZE y COMPRESS_LEVEL para la compresión de respuestas
+    """
+    app = Flask(__name__)
+    app.config.update(
+        DATA_FILE=os.environ.get('TASKS_DATA_FILE', 'data.json'),
+        STORAGE=os.environ.get('TASKS_STORAGE', 'file'),
+        DATA_HANDLER=None,
+        PRELOAD=False,
+        WRITE_CONCURRENCY=int(os.environ.get('WRITE_CONCURRENCY', 1)),
+        WRITE_QUEUE_DEPTH=int(os.environ.get('WRITE_QUEUE_DEPTH', 32)),
+        WRITE_QUEUE_TIMEOUT=float(os.environ.get('WRITE_QUEUE_TIMEOUT', 5)),
+        FEED_MAX_CLIENTS=int(os.environ.get('FEED_MAX_CLIENTS', 4)),
+        STREAM_MAX_SECONDS=float(os.environ.get('STREAM_MAX_SECONDS', 300)),
+        COMPRESS_MIN_SIZE=int(os.environ.get('COMPRESS_MIN_SIZE', 1024)),
+        COMPRESS_LEVEL=int(os.environ.get('COMPRESS_LEVEL', 6))
+    )
+    app.config.update(config or {})
+
+    services = TaskSystem(app.config)
+    app.extensions['task_system'] = services
+    if app.config['PRELOAD']:
+        services.preload()
+
+    app.register_blueprint(api)
+    return app
+
+def _saturado(error):
+    """Respuesta 503 con Retry-After para una cola de admisión saturada"""
+    respuesta = jsonify({"error": str(error)})
+    respuesta.status_code = 503
+    respuesta.headers['Retry-After'] = str(error.retry_after)
+    return respuesta
+
+def escritura(vista):
+    """Pasa la escritura por la cola de admisión; si está saturada responde 503 con Retry-After"""
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        try:
+            with write_admission.admitir():
+                return vista(*args, **kwargs)
+        except ColaSaturada as e:
+            return _saturado(e)
+
+    return envoltura
+
+def _admitir_feed():
+    """
+    Toma un lugar para un long-poll o un stream y retorna un ExitStack que lo
+    suelta al cerrarse; lanza ColaSaturada si no quedan lugares
+    """
+    admision = _services().feed_admission
+    if admision is None:
+        raise ColaSaturada(SSE_HEARTBEAT)
+    lugar = ExitStack()
+    lugar.enter_context(admision.admitir())
+    return lugar
+
+def idempotente(vista):
+    """
+    Permite reintentar un POST con el header Idempotency-Key: si la clave ya
+    produjo una respuesta exitosa, se repite esa respuesta sin volver a ejecutar la operación
+    """
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        clave = request.headers.get('Idempotency-Key')
+        if not clave:
+            return vista(*args, **kwargs)
+
+        huella = hashlib.sha256(
+            request.method.encode() + request.path.encode() + request.get_data()
+        ).hexdigest()
+
+        # El lote serializa los reintentos concurrentes y guarda la respuesta
+        # en la misma escritura que la operación
+        with data_handler.batch():
+            guardada = data_handler.idempotency.obtener(clave)
+            if guardada:
+                if guardada['huella'] != huella:
+                    return jsonify({"error": "Idempotency-Key ya fue usada con otra solicitud"}), 422
+                respuesta = make_response(guardada['cuerpo'], guardada['status'])
+                respuesta.mimetype = 'application/json'
+                respuesta.headers['Idempotent-Replayed'] = 'true'
+                return respuesta
+
+            respuesta = make_response(vista(*args, **kwargs))
+            if 200 <= respuesta.status_code < 300:
+                data_handler.idempotency.guardar(
+                    clave, huella, respuesta.status_code, respuesta.get_data(as_text=True)
+                )
+                data_handler.mark_dirty()
+            return respuesta
+
+    return envoltura
+
+def _parse_fields(validos):
+    """
+    Lee ?fields=a,b,c y retorna la lista de campos pedidos, o None si no se
+    indicó; lanza ValueError si alguno no existe
+    """
+    fields = request.args.get('fields')
+    if fields is None:
+        return None
+    campos = [campo.strip() for campo in fields.split(',') if campo.strip()]
+    if not campos:
+        raise ValueError("Debe indicar al menos un campo en fields")
+    invalidos = [campo for campo in campos if campo not in validos]
+    if invalidos:
+        raise ValueError(f"Campos no válidos: {', '.join(invalidos)}. Válidos: {', '.join(validos)}")
+    return campos
+
+@api.after_app_request
+def comprimir_respuesta(response):
+    """
+    Comprime con gzip o deflate las respuestas que superan COMPRESS_MIN_SIZE
+    si el cliente lo acepta. Los streams (SSE) se envían sin comprimir
+    """
+    response.vary.add('Accept-Encoding')
+    if (response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or not 200 <= response.status_code < 300):
+        return response
+
+    codificacion = request.accept_encodings.best_match(['gzip', 'deflate'])
+    if codificacion is None:
+        return response
+
+    datos = response.get_data()
+    if len(datos) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    nivel = current_app.config['COMPRESS_LEVEL']
+    if codificacion == 'gzip':
+        response.set_data(gzip.compress(datos, nivel, mtime=0))
+    else:
+        response.set_data(zlib.compress(datos, nivel))
+    response.headers['Content-Encoding'] = codificacion
+    return response
+
+@api.route('/usuarios/mialias=<alias>', methods=['GET'])
 def get_user_with_tasks(alias):
     """
-    GET /usuarios/mialias=XXXX
-    Retorna datos de usuario y sus tareas asignadas
+    GET /usuarios/mialias=XXXX?fields=id,estado
+    Retorna datos de usuario y sus tareas asignadas; fields limita los campos de cada tarea
     """
     try:
-        user_data = data_handler.get_user_with_tasks(alias)
+        try:
+            campos = _parse_fields(Tarea.CAMPOS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 422
+
+        user_data = data_handler.get_user_with_tasks(alias, campos)
         if not user_data:
             return jsonify({"error": "Usuario no encontrado"}), 404
         
@@ -27,7 +246,9 @@ def get_user_with_tasks(alias):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/usuarios', methods=['POST'])
+@api.route('/usuarios', methods=['POST'])
+@escritura
+@idempotente
 def create_user():
     """
     POST /usuarios
@@ -61,7 +282,9 @@ def create_user():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/tasks', methods=['POST'])
+@api.route('/tasks', methods=['POST'])
+@escritura
+@idempotente
 def create_task():
     """
     POST /tasks
@@ -104,7 +327,62 @@ def create_task():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/tasks/<int:task_id>', methods=['POST'])
+@api.route('/tasks/search', methods=['GET'])
+def search_tasks():
+    """
+    GET /tasks/search?q=texto&limit=20&prefijo=true
+    Busca tareas por palabras en su nombre y descripción (sin distinguir tildes)
+    """
+    try:
+        consulta = request.args.get('q', '')
+
+        # Validar que la consulta no esté vacía
+        if not consulta.strip():
+            return jsonify({"error": "El parámetro 'q' es requerido"}), 400
+
+        try:
+            limite = int(request.args.get('limit', 20))
+        except ValueError:
+            return jsonify({"error": "limit debe ser un número"}), 422
+
+        if limite < 1:
+            return jsonify({"error": "limit debe ser mayor que cero"}), 422
+
+        prefijo = request.args.get('prefijo', 'true').lower() != 'false'
+
+        resultados = data_handler.search_tasks(consulta, limite, prefijo)
+
+        return jsonify({
+            "resultados": [
+                {"puntaje": round(puntaje, 4), "tarea": task.to_dict()}
+                for task, puntaje in resultados
+            ],
+            "total": len(resultados)
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/tasks/ready', methods=['GET'])
+def list_ready_tasks():
+    """
+    GET /tasks/ready?rol=programador&usuario=alias
+    Lista las tareas sin finalizar cuyas dependencias están todas finalizadas
+    """
+    try:
+        rol = request.args.get('rol')
+        usuario = request.args.get('usuario')
+
+        # Validar rol
+        if rol and rol not in ['programador', 'pruebas', 'infra']:
+            return jsonify({"error": "Rol debe ser 'programador', 'pruebas' o 'infra'"}), 422
+
+        tareas = data_handler.get_ready_tasks(rol, usuario)
+        return jsonify({"tareas": [task.to_dict() for task in tareas]}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/tasks/<int:task_id>', methods=['POST'])
+@escritura
 def update_task_status(task_id):
     """
     POST /tasks/{id}
@@ -141,7 +419,114 @@ def update_task_status(task_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/tasks/<int:task_id>/users', methods=['POST'])
+@api.route('/tasks/state/batch', methods=['POST'])
+@escritura
+def update_task_states():
+    """
+    POST /tasks/state/batch
+    Body: {"cambios": [{"id": 1, "estado": "finalizada"}, ...]}
+    Actualiza el estado de varias tareas con una sola escritura, aplicando primero
+    las dependencias. Retorna el resultado de cada cambio en el orden recibido
+    """
+    try:
+        data = request.get_json()
+
+        # Validar campo requerido
+        if not data or 'cambios' not in data:
+            return jsonify({"error": "Campo 'cambios' es requerido"}), 400
+
+        cambios = data['cambios']
+        if not isinstance(cambios, list) or not cambios:
+            return jsonify({"error": "El campo 'cambios' debe ser una lista no vacía"}), 400
+
+        resultados = data_handler.update_task_states(cambios)
+        aplicados = sum(1 for resultado in resultados if resultado['ok'])
+
+        return jsonify({
+            "message": f"{aplicados} de {len(resultados)} cambios de estado aplicados",
+            "aplicados": aplicados,
+            "fallidos": len(resultados) - aplicados,
+            "resultados": resultados
+        }), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 422
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/tasks/<int:task_id>/blockers', methods=['GET'])
+def get_task_blockers(task_id):
+    """
+    GET /tasks/{id}/blockers
+    Retorna todas las dependencias transitivas sin finalizar de la tarea con su profundidad
+    """
+    try:
+        bloqueantes = data_handler.get_blockers(task_id)
+        if bloqueantes is None:
+            return jsonify({"error": "Tarea no encontrada"}), 404
+
+        resultado = []
+        for dep_id, profundidad in bloqueantes:
+            task = data_handler.get_task_by_id(dep_id)
+            resultado.append({
+                "id": dep_id,
+                "profundidad": profundidad,
+                # Una dependencia inexistente también impide finalizar
+                "nombre": task.nombre if task else None,
+                "estado": task.estado if task else None
+            })
+
+        return jsonify({"task_id": task_id, "bloqueantes": resultado, "total": len(resultado)}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/tasks/<int:task_id>/dependents', methods=['GET'])
+def get_task_dependents(task_id):
+    """
+    GET /tasks/{id}/dependents?transitive=true
+    Retorna las tareas que dependen de la tarea, con conteos por rol y por usuario asignado
+    """
+    try:
+        transitive = request.args.get('transitive', 'false').lower() == 'true'
+
+        impacto = data_handler.get_impact(task_id, transitive)
+        if impacto is None:
+            return jsonify({"error": "Tarea no encontrada"}), 404
+
+        return jsonify(impacto), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/tasks/<int:task_id>/suggested-assignees', methods=['GET'])
+def suggest_task_assignees(task_id):
+    """
+    GET /tasks/{id}/suggested-assignees?rol=pruebas&limit=5
+    Sugiere usuarios para la tarea según su carga de tareas sin finalizar en ese rol
+    """
+    try:
+        task = data_handler.get_task_by_id(task_id)
+        if not task:
+            return jsonify({"error": "Tarea no encontrada"}), 404
+
+        rol = request.args.get('rol') or task.rol
+        if rol not in ['programador', 'pruebas', 'infra']:
+            return jsonify({"error": "Rol debe ser 'programador', 'pruebas' o 'infra'"}), 422
+
+        try:
+            limite = int(request.args.get('limit', 5))
+        except ValueError:
+            return jsonify({"error": "limit debe ser un número"}), 422
+
+        if limite < 1:
+            return jsonify({"error": "limit debe ser mayor que cero"}), 422
+
+        sugeridos = data_handler.suggest_assignees(task_id, rol, limite)
+        return jsonify({"task_id": task_id, "rol": rol, "sugeridos": sugeridos}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/tasks/<int:task_id>/users', methods=['POST'])
+@escritura
 def manage_task_users(task_id):
     """
     POST /tasks/{id}/users
@@ -196,7 +581,8 @@ def manage_task_users(task_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/tasks/<int:task_id>/dependencies', methods=['POST'])
+@api.route('/tasks/<int:task_id>/dependencies', methods=['POST'])
+@escritura
 def manage_task_dependencies(task_id):
     """
     POST /tasks/{id}/dependencies
@@ -250,47 +636,245 @@ def manage_task_dependencies(task_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@api.route('/tasks/archive', methods=['POST'])
+@escritura
+def archive_tasks():
+    """
+    POST /tasks/archive
+    Body opcional: {"edad_minima": segundos desde la finalización}
+    Mueve las tareas finalizadas al almacén frío
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+
+        edad_minima = data.get('edad_minima')
+        if edad_minima is not None:
+            try:
+                edad_minima = float(edad_minima)
+            except (ValueError, TypeError):
+                return jsonify({"error": "edad_minima debe ser un número"}), 422
+            if edad_minima < 0:
+                return jsonify({"error": "edad_minima no puede ser negativa"}), 422
+
+        archivadas = data_handler.archive_finalized(edad_minima)
+
+        return jsonify({
+            "message": "Tareas archivadas exitosamente",
+            "archivadas": archivadas
+        }), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 422
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/tasks/archived/<int:task_id>', methods=['GET'])
+def get_archived_task(task_id):
+    """GET /tasks/archived/{id} - Consulta una tarea archivada"""
+    try:
+        task_data = data_handler.get_archived_task(task_id)
+        if not task_data:
+            return jsonify({"error": "Tarea archivada no encontrada"}), 404
+
+        return jsonify(task_data), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/transactions', methods=['POST'])
+@escritura
+@idempotente
+def apply_transaction():
+    """
+    POST /transactions
+    Body: {"operaciones": [{"op": "create_task", "nombre": ..., "descripcion": ..., "usuario": ..., "rol": ...},
+                           {"op": "assign_user", "id": "$0", "usuario": "alias", "rol": "pruebas"}, ...]}
+    Aplica las operaciones en orden de forma atómica. "$N" referencia la tarea creada por la operación N
+    """
+    try:
+        data = request.get_json()
+
+        # Validar campo requerido
+        if not data or 'operaciones' not in data:
+            return jsonify({"error": "Campo 'operaciones' es requerido"}), 400
+
+        operaciones = data['operaciones']
+        if not isinstance(operaciones, list) or not operaciones:
+            return jsonify({"error": "El campo 'operaciones' debe ser una lista no vacía"}), 400
+
+        resultados = data_handler.apply_operations(operaciones)
+
+        return jsonify({
+            "message": "Transacción aplicada exitosamente",
+            "resultados": resultados
+        }), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 422
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # Manejadores de errores
-@app.errorhandler(404)
+@api.app_errorhandler(404)
 def not_found(error):
     return jsonify({"error": "Recurso no encontrado"}), 404
 
-@app.errorhandler(400)
+@api.app_errorhandler(400)
 def bad_request(error):
     return jsonify({"error": "Solicitud inválida"}), 400
 
-@app.errorhandler(500)
+@api.app_errorhandler(500)
 def internal_server_error(error):
     return jsonify({"error": "Error interno del servidor"}), 500
 
 # Endpoint dummy original (mantener para compatibilidad)
-@app.route('/dummy', methods=['GET'])
+@api.route('/dummy', methods=['GET'])
 def dummy_endpoint():
     return jsonify({"message": "This is a dummy endpoint!"})
 
 # Endpoint adicional para listar todos los usuarios (útil para debugging)
-@app.route('/usuarios', methods=['GET'])
+@api.route('/usuarios', methods=['GET'])
 def list_users():
-    """GET /usuarios - Lista todos los usuarios"""
+    """GET /usuarios?fields=alias,nombre - Lista todos los usuarios"""
     try:
+        try:
+            campos = _parse_fields(Usuario.CAMPOS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 422
+
         users_data = []
         for user in data_handler.users:
-            users_data.append(user.to_dict())
+            users_data.append(user.to_dict(campos))
         return jsonify({"usuarios": users_data}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 # Endpoint adicional para listar todas las tareas (útil para debugging)
-@app.route('/tasks', methods=['GET'])
+@api.route('/tasks', methods=['GET'])
 def list_tasks():
-    """GET /tasks - Lista todas las tareas"""
+    """GET /tasks?fields=id,estado,dependencias - Lista todas las tareas"""
     try:
+        try:
+            campos = _parse_fields(Tarea.CAMPOS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 422
+
         tasks_data = []
         for task in data_handler.tasks:
-            tasks_data.append(task.to_dict())
+            tasks_data.append(task.to_dict(campos))
         return jsonify({"tareas": tasks_data}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@api.route('/stats', methods=['GET'])
+def get_stats():
+    """GET /stats - Estadísticas de tareas por estado, rol y usuario"""
+    try:
+        return jsonify(data_handler.get_stats()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Tiempo máximo de espera de un long-poll y latido del stream SSE, en segundos
+MAX_LONG_POLL = 60
+SSE_HEARTBEAT = 15
+
+def _parse_since():
+    """Obtiene el número de secuencia desde el cual se piden cambios"""
+    since = request.args.get('since', request.headers.get('Last-Event-ID', 0))
+    since = int(since)
+    if since < 0:
+        raise ValueError("since no puede ser negativo")
+    return since
+
+@api.route('/changes', methods=['GET'])
+def list_changes():
+    """
+    GET /changes?since=N&timeout=S
+    Retorna los cambios posteriores a la secuencia N. Con timeout, espera
+    hasta S segundos a que ocurra algún cambio (long-poll)
+    """
+    try:
+        try:
+            since = _parse_since()
+            timeout = min(float(request.args.get('timeout', 0)), MAX_LONG_POLL)
+        except ValueError:
+            return jsonify({"error": "since y timeout deben ser números no negativos"}), 422
+
+        if timeout > 0:
+            with _admitir_feed():
+                cambios = data_handler.changes.esperar(since, timeout)
+        else:
+            cambios = data_handler.changes.desde(since)
+
+        return jsonify({
+            "cambios": cambios,
+            "ultimo_seq": cambios[-1]["seq"] if cambios else max(since, data_handler.changes.ultimo_seq)
+        }), 200
+    except HistorialExpirado as e:
+        return jsonify({"error": str(e), "ultimo_seq": data_handler.changes.ultimo_seq}), 410
+    except ColaSaturada as e:
+        return _saturado(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/changes/stream', methods=['GET'])
+def stream_changes():
+    """
+    GET /changes/stream?since=N
+    Envía los cambios como Server-Sent Events. Acepta el header Last-Event-ID para reanudar.
+    Cada stream dura a lo sumo STREAM_MAX_SECONDS: al terminar, el cliente se reconecta
+    con Last-Event-ID y vuelve a competir por un lugar con los demás
+    """
+    try:
+        since = _parse_since()
+    except ValueError:
+        return jsonify({"error": "since debe ser un número no negativo"}), 422
+
+    feed = data_handler.changes
+    duracion_maxima = current_app.config['STREAM_MAX_SECONDS']
+    try:
+        lugar = _admitir_feed()
+    except ColaSaturada as e:
+        return _saturado(e)
+
+    def generar(since):
+        fin = time.monotonic() + duracion_maxima
+        while True:
+            restante = fin - time.monotonic()
+            if restante <= 0:
+                return
+            try:
+                cambios = feed.esperar(since, min(SSE_HEARTBEAT, restante))
+            except HistorialExpirado as e:
+                yield f"event: historial_expirado\ndata: {json.dumps({'error': str(e)})}\n\n"
+                return
+
+            if not cambios:
+                yield ": keepalive\n\n"
+                continue
+
+            for cambio in cambios:
+                yield f"id: {cambio['seq']}\nevent: {cambio['tipo']}\ndata: {json.dumps(cambio)}\n\n"
+            since = cambios[-1]["seq"]
+
+    respuesta = Response(
+        stream_with_context(generar(since)),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    # El lugar se suelta cuando el servidor cierra la respuesta, aunque el cliente se desconecte
+    respuesta.call_on_close(lugar.close)
+    return respuesta
+
+@api.route('/metrics/writes', methods=['GET'])
+def write_metrics():
+    """GET /metrics/writes - Profundidad de la cola de escrituras y tiempos de espera"""
+    try:
+        return jsonify(write_admission.metricas()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Aplicación por defecto (python src/controller.py o un servidor WSGI apuntando a controller:app)
+app = create_app()
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
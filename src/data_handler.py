@@ -1,65 +1,530 @@
-import json
+import copy
+import hashlib
+import heapq
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
 from models.usuario import Usuario
 from models.tarea import Tarea
-from models.asignacion import Asignacion
+from models.asignacion import Asignacion, TablaAsignaciones
+from utils.search import IndiceBusqueda
+from utils.changes import FeedCambios
+from utils.idempotency import CacheIdempotencia
+from utils.archive import AlmacenFrio
+from utils.sidecar import cargar_sidecar, guardar_sidecar
+from utils.storage import abrir_almacenamiento
+
+
+def synchronized(method):
+    """Ejecuta el método con el lock del DataHandler tomado"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class DataHandler:
-    def __init__(self, filename='data.json'):
-        self.filename = filename
+    # Antigüedad por defecto (en segundos) para archivar tareas finalizadas
+    ARCHIVE_AFTER = 7 * 24 * 60 * 60
+    # Versión del formato de los índices persistidos; cambiarla invalida los archivos existentes
+    INDEX_VERSION = 2
+
+    def __init__(self, filename='data.json', archive_filename=None, storage=None):
+        # Almacenamiento de los datos: por defecto el archivo, en JSON o en el formato
+        # binario según su contenido; con AlmacenamientoMemoria no se escribe nada en disco
+        self.storage = storage if storage is not None else abrir_almacenamiento(filename)
+        self.filename = self.storage.filename
+        # Tareas finalizadas archivadas fuera del conjunto de trabajo. Índices derivados
+        # persistidos junto al archivo de datos para reinicios rápidos (solo con archivo)
+        if self.filename is not None:
+            self.archive = AlmacenFrio(archive_filename or os.path.splitext(self.filename)[0] + '.archive')
+            self.index_filename = self.filename + '.idx'
+        else:
+            self.archive = AlmacenFrio(buffer=self.storage.archivo_frio)
+            self.index_filename = None
+        self._finalized_at = {}
+        self.index_source = None
+        self._data_signature = None
         self.tasks = []
         self.users = []
-        self.assignments = []
+        self.assignments = TablaAsignaciones()
         self.next_task_id = 1
+        self._tasks_by_id = {}
+        self._users_by_alias = {}
+        self.search_index = IndiceBusqueda()
+        # Contadores para estadísticas, mantenidos en cada mutación
+        self._count_by_estado = Counter()
+        self._count_by_rol = Counter()
+        self._blocked_count = 0
+        # Grafo de dependencias: pendientes por tarea y adyacencia inversa
+        self._pending_deps = {}
+        self._dependents = {}
+        # Tareas sin finalizar cuyas dependencias están todas finalizadas
+        self._ready = set()
+        # Cierre transitivo de dependencias sin finalizar, memoizado por tarea
+        self._blockers_cache = {}
+        # Carga abierta (asignaciones en tareas sin finalizar) por usuario y rol
+        self._open_load = {}
+        self._listeners = []
+        # Feed de cambios para clientes que solo quieren recibir deltas
+        self.changes = FeedCambios()
+        self.subscribe(self.changes.registrar)
+        # Respuestas ya enviadas por Idempotency-Key, persistidas junto con los datos
+        self.idempotency = CacheIdempotencia()
+        # Control de lotes y transacciones: las escrituras se difieren hasta el final
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._dirty = False
+        self._pending_events = None
+        # Operaciones inversas de lo aplicado en la transacción en curso, para el rollback
+        self._undo_log = None
         self.load_data()
 
-    def save_data(self):
-        data = {
-            'tasks': [task.to_dict() for task in self.tasks],
-            'users': [user.to_dict() for user in self.users],
+    def _serialize(self):
+        """
+        Construye el diccionario que se persiste. La relación tarea-usuario se
+        guarda una sola vez en 'assignments', no dentro de tareas y usuarios
+        """
+        tasks = []
+        for task in self.tasks:
+            task_data = task.to_dict()
+            del task_data['usuarios_asignados']
+            tasks.append(task_data)
+
+        users = []
+        for user in self.users:
+            user_data = user.to_dict()
+            del user_data['tareas_asignadas']
+            users.append(user_data)
+
+        return {
+            'tasks': tasks,
+            'users': users,
             'assignments': [assignment.to_dict() for assignment in self.assignments],
-            'next_task_id': self.next_task_id
+            'next_task_id': self.next_task_id,
+            'finalized_at': {str(task_id): ts for task_id, ts in self._finalized_at.items()},
+            'idempotency_keys': self.idempotency.to_dict()
         }
-        with open(self.filename, 'w') as f:
-            json.dump(data, f, indent=2)
+
+    def save_data(self):
+        self.storage.escribir(self._serialize())
 
     def load_data(self):
-        try:
-            with open(self.filename, 'r') as f:
-                data = json.load(f)
-                
-                # Cargar usuarios
-                self.users = [Usuario.from_dict(user_data) for user_data in data.get('users', [])]
-                
-                # Cargar tareas
-                self.tasks = [Tarea.from_dict(task_data) for task_data in data.get('tasks', [])]
-                
-                # Cargar asignaciones
-                self.assignments = [Asignacion.from_dict(assign_data) for assign_data in data.get('assignments', [])]
-                
-                # Cargar next_task_id
-                self.next_task_id = data.get('next_task_id', 1)
-                
-        except FileNotFoundError:
-            self.tasks = []
-            self.users = []
-            self.assignments = []
-            self.next_task_id = 1
+        raw = self.storage.leer()
+        data = self.storage.decodificar(raw) if raw is not None else {}
+        self._data_signature = self._signature(raw)
+
+        index_state = None
+        if self._data_signature is not None and self.index_filename is not None:
+            index_state = cargar_sidecar(self.index_filename, self.INDEX_VERSION, self._data_signature)
+        self._load_from_dict(data, index_state)
+
+    def _signature(self, raw):
+        """Firma de los datos cargados y del almacén frío, que también alimenta los índices"""
+        if raw is None:
+            return None
+        firma = hashlib.sha256(raw)
+        firma.update(str(len(self.archive)).encode())
+        return firma.digest()
+
+    def _index_state(self):
+        """Estructuras derivadas que se pueden persistir en el archivo de índices, como datos planos"""
+        return {
+            'search_index': self.search_index.to_dict(),
+            'count_by_estado': dict(self._count_by_estado),
+            'count_by_rol': dict(self._count_by_rol),
+            'blocked_count': self._blocked_count,
+            'pending_deps': self._pending_deps,
+            'dependents': self._dependents,
+            'ready': self._ready,
+            'open_load': {alias: dict(carga) for alias, carga in self._open_load.items()}
+        }
+
+    def _restore_index_state(self, estado):
+        """
+        Restaura las estructuras derivadas leídas del archivo de índices. Lanza
+        KeyError, TypeError o ValueError si el contenido no tiene la forma esperada
+        """
+        search_index = IndiceBusqueda.from_dict(estado['search_index'])
+        count_by_estado = Counter(estado['count_by_estado'])
+        count_by_rol = Counter(estado['count_by_rol'])
+        blocked_count = int(estado['blocked_count'])
+        pending_deps = dict(estado['pending_deps'])
+        dependents = {dep_id: set(ids) for dep_id, ids in estado['dependents'].items()}
+        ready = set(estado['ready'])
+        open_load = {alias: Counter(carga) for alias, carga in estado['open_load'].items()}
+
+        self.search_index = search_index
+        self._count_by_estado = count_by_estado
+        self._count_by_rol = count_by_rol
+        self._blocked_count = blocked_count
+        self._pending_deps = pending_deps
+        self._dependents = dependents
+        self._ready = ready
+        self._open_load = open_load
+        self._blockers_cache = {}
+
+    @synchronized
+    def save_index(self):
+        """
+        Escribe los índices derivados junto al archivo de datos, firmados con el
+        contenido actual de éste. Solo sirven mientras los datos no cambien, por lo
+        que se escriben al cerrar y no en cada mutación.
+        """
+        raw = self.storage.leer() if self.index_filename is not None else None
+        if raw is None:
+            return False
+        firma = self._signature(raw)
+        guardar_sidecar(self.index_filename, self.INDEX_VERSION, firma, self._index_state())
+        return True
+
+    @synchronized
+    def close(self):
+        """Guarda lo pendiente y los índices derivados antes de terminar el proceso"""
+        if self._dirty:
+            self._dirty = False
+            self.save_data()
+        self.save_index()
+
+    def _load_from_dict(self, data, index_state=None):
+        """Carga el estado desde un diccionario y reconstruye los índices"""
+        # Cargar usuarios
+        self.users = [Usuario.from_dict(user_data) for user_data in data.get('users', [])]
+        
+        # Cargar tareas. Si una tarea ya está en el archivo (escritura interrumpida
+        # durante el archivado) se completa su archivado
+        self.tasks = [
+            Tarea.from_dict(task_data) for task_data in data.get('tasks', [])
+            if task_data['id'] not in self.archive
+        ]
+        
+        # Cargar asignaciones. Los archivos anteriores no tienen 'assignments' y
+        # guardan la relación dentro de cada tarea: en ese caso se deriva de ellas
+        self.assignments = TablaAsignaciones()
+        for assign_data in data.get('assignments', []):
+            if assign_data['task_id'] not in self.archive:
+                self.assignments.agregar(Asignacion.from_dict(assign_data))
+        for task in self.tasks:
+            self.assignments.vincular_tarea(task)
+        for user in self.users:
+            self.assignments.vincular_usuario(user)
+        
+        # Cargar next_task_id
+        self.next_task_id = data.get('next_task_id', 1)
+
+        # Cargar fechas de finalización; si no se conoce, se cuenta desde ahora
+        finalized_at = {int(task_id): ts for task_id, ts in data.get('finalized_at', {}).items()}
+        ahora = time.time()
+        self._finalized_at = {
+            task.id: finalized_at.get(task.id, ahora) for task in self.tasks if task.estado == 'finalizada'
+        }
+
+        # Cargar respuestas de Idempotency-Key
+        self.idempotency = CacheIdempotencia.from_dict(
+            data.get('idempotency_keys', []), self.idempotency.capacidad, self.idempotency.ttl
+        )
+
+        if index_state is not None:
+            self._tasks_by_id = {task.id: task for task in self.tasks}
+            self._users_by_alias = {user.alias: user for user in self.users}
+            try:
+                self._restore_index_state(index_state)
+                self.index_source = 'sidecar'
+            except (KeyError, TypeError, ValueError, AttributeError):
+                index_state = None
+        if index_state is None:
+            self._rebuild_indexes()
+            self.index_source = 'rebuild'
+
+    @synchronized
+    def snapshot(self):
+        """
+        Retorna una copia del estado persistible, para restaurarlo después con
+        restore. No incluye el almacén frío, que es de solo-agregado
+        """
+        return copy.deepcopy(self._serialize())
+
+    @synchronized
+    def restore(self, snapshot):
+        """Reemplaza el estado por el de un snapshot y lo persiste"""
+        if self._undo_log is not None:
+            self._log_undo(self._load_from_dict, self.snapshot())
+        self._load_from_dict(copy.deepcopy(snapshot))
+        self._persist()
+
+    def _persist(self):
+        """Guarda los datos, o los marca como pendientes si hay un lote en curso"""
+        if self._batch_depth:
+            self._dirty = True
+        else:
+            self.save_data()
+
+    def mark_dirty(self):
+        """Indica que hay cambios por guardar fuera de las operaciones de dominio"""
+        self._persist()
+
+    @contextmanager
+    def batch(self):
+        """
+        Agrupa varias mutaciones y las persiste con una sola escritura al final.
+        No es atómico: lo aplicado antes de un error se conserva.
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._dirty:
+                    self._dirty = False
+                    self.save_data()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Aplica varias mutaciones de forma atómica: si ocurre un error se deshacen las
+        ya aplicadas y se descartan los eventos; si no, se persiste una sola vez.
+        Cada mutación registra su operación inversa, así que el costo del rollback
+        depende de lo aplicado y no del tamaño de los datos
+        """
+        with self._lock:
+            if self._pending_events is not None:
+                # Transacción anidada: la externa se encarga del rollback
+                yield self
+                return
+
+            dirty_antes = self._dirty
+            self._pending_events = []
+            self._undo_log = []
+            try:
+                with self.batch():
+                    try:
+                        yield self
+                    except BaseException:
+                        self._rollback()
+                        self._dirty = dirty_antes
+                        raise
+            finally:
+                eventos, self._pending_events = self._pending_events, None
+                self._undo_log = None
+
+            for evento, datos in eventos:
+                self._notify(evento, datos)
+
+    def _log_undo(self, deshacer, *args):
+        """Registra la operación inversa de una mutación si hay una transacción en curso"""
+        if self._undo_log is not None:
+            self._undo_log.append((deshacer, args))
+
+    def _rollback(self):
+        """Aplica las operaciones inversas registradas, de la última a la primera"""
+        registro, self._undo_log = self._undo_log, None
+        for deshacer, args in reversed(registro):
+            deshacer(*args)
+
+    def _undo_create_user(self, user):
+        # Las inversas se aplican en orden inverso: el usuario es el último de la lista
+        self.users.pop()
+        del self._users_by_alias[user.alias]
+        self.assignments.remover_usuario(user.alias)
+
+    def _undo_create_task(self, task, next_task_id):
+        self._unindex_task(task)
+        self.assignments.remover_tarea(task.id)
+        del self._tasks_by_id[task.id]
+        self.tasks.pop()
+        self.next_task_id = next_task_id
+
+    def _undo_state_change(self, task, estado_anterior):
+        if task.estado == 'finalizada':
+            for dependent_id in self._dependents.get(task.id, ()):
+                self._change_pending(dependent_id, 1)
+            for asignacion in task.usuarios_asignados:
+                self._change_open_load(asignacion['usuario'], asignacion['rol'], 1)
+            del self._finalized_at[task.id]
+            self._invalidate_blockers(task.id)
+            # Solo se finaliza sin dependencias pendientes, así que volvía a estar lista
+            self._ready.add(task.id)
+        self._count_by_estado[task.estado] -= 1
+        self._count_by_estado[estado_anterior] += 1
+        task.estado = estado_anterior
+
+    def _undo_assign(self, task, usuario_alias, rol):
+        task.remover_usuario(usuario_alias)
+        if task.estado != 'finalizada':
+            self._change_open_load(usuario_alias, rol, -1)
+
+    def _undo_remove_user(self, task, asignacion, posicion):
+        # Solo se repone la asignación removida, en su lugar: las demás no se tocan
+        self.assignments.reinsertar(asignacion, posicion)
+        if task.estado != 'finalizada':
+            self._change_open_load(asignacion.user_alias, asignacion.rol, 1)
+
+    def _undo_add_dependency(self, task, dependency_task_id):
+        task.remover_dependencia(dependency_task_id)
+        self._dependents[dependency_task_id].discard(task.id)
+        self._invalidate_blockers(task.id)
+        if not self._is_finished(dependency_task_id):
+            self._change_pending(task.id, -1)
+
+    def _undo_remove_dependency(self, task, dependency_task_id, posicion):
+        task.dependencias.insert(posicion, dependency_task_id)
+        self._dependents.setdefault(dependency_task_id, set()).add(task.id)
+        self._invalidate_blockers(task.id)
+        if not self._is_finished(dependency_task_id):
+            self._change_pending(task.id, 1)
+
+    def _undo_import(self, cantidad_usuarios, cantidad_tareas, next_task_id):
+        for task in self.tasks[cantidad_tareas:]:
+            self.assignments.remover_tarea(task.id)
+            self._finalized_at.pop(task.id, None)
+        for user in self.users[cantidad_usuarios:]:
+            self.assignments.remover_usuario(user.alias)
+        del self.tasks[cantidad_tareas:]
+        del self.users[cantidad_usuarios:]
+        self.next_task_id = next_task_id
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        """Reconstruye los índices en memoria a partir de las listas cargadas"""
+        self._tasks_by_id = {task.id: task for task in self.tasks}
+        self._users_by_alias = {user.alias: user for user in self.users}
+        self.search_index = IndiceBusqueda()
+        self._count_by_estado = Counter()
+        self._count_by_rol = Counter()
+        self._blocked_count = 0
+        self._pending_deps = {}
+        self._dependents = {}
+        self._ready = set()
+        self._blockers_cache = {}
+        self._open_load = {}
+        for task in self.tasks:
+            self._index_task(task)
+
+        # Las tareas archivadas siguen contando como finalizadas en las estadísticas
+        self._count_by_estado['finalizada'] += len(self.archive)
+        for rol in self.archive.roles().values():
+            self._count_by_rol[rol] += 1
+
+    def _index_task(self, task):
+        """Registra una tarea en los índices y contadores"""
+        self.search_index.agregar(task)
+        self._count_by_estado[task.estado] += 1
+        self._count_by_rol[task.rol] += 1
+
+        pendientes = 0
+        for dep_id in task.dependencias:
+            self._dependents.setdefault(dep_id, set()).add(task.id)
+            if not self._is_finished(dep_id):
+                pendientes += 1
+        self._pending_deps[task.id] = pendientes
+        if task.estado != 'finalizada':
+            if pendientes:
+                self._blocked_count += 1
+            else:
+                self._ready.add(task.id)
+            for asignacion in task.usuarios_asignados:
+                self._change_open_load(asignacion['usuario'], asignacion['rol'], 1)
+
+    def _unindex_task(self, task):
+        """Quita una tarea de los índices y contadores; inversa de _index_task"""
+        self.search_index.remover(task)
+        self._count_by_estado[task.estado] -= 1
+        self._count_by_rol[task.rol] -= 1
+        for dep_id in task.dependencias:
+            self._dependents[dep_id].discard(task.id)
+        pendientes = self._pending_deps.pop(task.id)
+        self._blockers_cache.pop(task.id, None)
+        if task.estado != 'finalizada':
+            if pendientes:
+                self._blocked_count -= 1
+            else:
+                self._ready.discard(task.id)
+            for asignacion in task.usuarios_asignados:
+                self._change_open_load(asignacion['usuario'], asignacion['rol'], -1)
+
+    def _change_open_load(self, alias, rol, delta):
+        """Ajusta la carga abierta de un usuario en un rol"""
+        carga = self._open_load.setdefault(alias, Counter())
+        carga[rol] += delta
+
+    def _is_finished(self, task_id):
+        """Indica si la tarea existe y está finalizada (las archivadas lo están)"""
+        task = self._tasks_by_id.get(task_id)
+        if task is None:
+            return task_id in self.archive
+        return task.estado == 'finalizada'
+
+    def _change_pending(self, task_id, delta):
+        """Ajusta las dependencias pendientes de una tarea y el contador de bloqueadas"""
+        antes = self._pending_deps.get(task_id, 0)
+        despues = antes + delta
+        self._pending_deps[task_id] = despues
+
+        task = self._tasks_by_id.get(task_id)
+        if task is None or task.estado == 'finalizada':
+            return
+        if antes == 0 and despues > 0:
+            self._blocked_count += 1
+            self._ready.discard(task_id)
+        elif antes > 0 and despues == 0:
+            self._blocked_count -= 1
+            self._ready.add(task_id)
+            self._notify('tarea_desbloqueada', {'task_id': task_id})
+
+    def _invalidate_blockers(self, task_id):
+        """
+        Descarta los bloqueantes memoizados de la tarea y de las tareas que dependen
+        de ella, que son las únicas cuyo cierre transitivo puede haber cambiado
+        """
+        pendientes = [task_id]
+        visitadas = {task_id}
+        while pendientes:
+            actual = pendientes.pop()
+            self._blockers_cache.pop(actual, None)
+            for dependent_id in self._dependents.get(actual, ()):
+                if dependent_id not in visitadas:
+                    visitadas.add(dependent_id)
+                    pendientes.append(dependent_id)
+
+    def subscribe(self, listener):
+        """Registra una función listener(evento, datos) que recibe las notificaciones"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Elimina un listener registrado con subscribe"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, evento, datos):
+        """Envía una notificación a todos los listeners"""
+        if self._pending_events is not None:
+            # Dentro de una transacción se notifica solo al confirmar
+            self._pending_events.append((evento, copy.deepcopy(datos)))
+            return
+        for listener in list(self._listeners):
+            listener(evento, datos)
 
     def get_user_by_alias(self, alias):
         """Obtiene un usuario por su alias"""
-        for user in self.users:
-            if user.alias == alias:
-                return user
-        return None
+        # Un alias que no es hashable (una lista u objeto recibido en JSON) no es de ningún usuario
+        try:
+            return self._users_by_alias.get(alias)
+        except TypeError:
+            return None
 
     def get_task_by_id(self, task_id):
         """Obtiene una tarea por su ID"""
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
+        try:
+            return self._tasks_by_id.get(task_id)
+        except TypeError:
+            return None
 
+    @synchronized
     def create_user(self, alias, nombre):
         """Crea un nuevo usuario"""
         if self.get_user_by_alias(alias):
@@ -67,25 +532,35 @@ class DataHandler:
         
         user = Usuario(alias, nombre)
         self.users.append(user)
-        self.save_data()
+        self._users_by_alias[user.alias] = user
+        self.assignments.vincular_usuario(user)
+        self._log_undo(self._undo_create_user, user)
+        self._notify('usuario_creado', user.to_dict())
+        self._persist()
         return user
 
+    @synchronized
     def create_task(self, nombre, descripcion, usuario_alias, rol):
         """Crea una nueva tarea"""
         user = self.get_user_by_alias(usuario_alias)
         if not user:
             raise ValueError(f"Usuario '{usuario_alias}' no existe")
         
+        # La tarea se valida y el ID se reserva antes de modificar cualquier índice
         task = Tarea(self.next_task_id, nombre, descripcion, usuario_alias, rol)
+        self.next_task_id += 1
         self.tasks.append(task)
+        self._tasks_by_id[task.id] = task
+        # La asignación del creador pasa a la tabla de asignaciones
+        self.assignments.vincular_tarea(task)
+        self._index_task(task)
+        self._log_undo(self._undo_create_task, task, task.id)
         
-        # Actualizar lista de tareas del usuario
-        user.tareas_asignadas.append(self.next_task_id)
-        
-        self.next_task_id += 1
-        self.save_data()
+        self._notify('tarea_creada', task.to_dict())
+        self._persist()
         return task
 
+    @synchronized
     def update_task_state(self, task_id, nuevo_estado):
         """Actualiza el estado de una tarea"""
         task = self.get_task_by_id(task_id)
@@ -93,13 +568,100 @@ class DataHandler:
             raise ValueError(f"Tarea con ID {task_id} no existe")
         
         # Verificar si puede finalizar (si el nuevo estado es finalizada)
-        if nuevo_estado == 'finalizada' and not task.puede_finalizar(self.tasks):
+        if nuevo_estado == 'finalizada' and self._pending_deps.get(task_id, 0) > 0:
             raise ValueError("No se puede finalizar la tarea porque tiene dependencias sin finalizar")
         
+        estado_anterior = task.estado
         task.cambiar_estado(nuevo_estado)
-        self.save_data()
+        self._log_undo(self._undo_state_change, task, estado_anterior)
+
+        # Actualizar contadores
+        self._count_by_estado[estado_anterior] -= 1
+        self._count_by_estado[nuevo_estado] += 1
+        self._notify('estado_actualizado', {
+            'task_id': task_id,
+            'estado_anterior': estado_anterior,
+            'estado': nuevo_estado
+        })
+        if nuevo_estado == 'finalizada':
+            self._finalized_at[task_id] = time.time()
+            self._invalidate_blockers(task_id)
+            self._ready.discard(task_id)
+            for asignacion in task.usuarios_asignados:
+                self._change_open_load(asignacion['usuario'], asignacion['rol'], -1)
+            for dependent_id in self._dependents.get(task_id, ()):
+                self._change_pending(dependent_id, -1)
+
+        self._persist()
         return task
 
+    def _topological_order(self, posiciones):
+        """
+        Ordena los IDs de tareas (task_id -> posición en la solicitud) para que cada
+        dependencia quede antes que las tareas que dependen de ella; entre las que
+        no dependen unas de otras se respeta la posición
+        """
+        pendientes = {}
+        for task_id in posiciones:
+            task = self._tasks_by_id.get(task_id)
+            dependencias = task.dependencias if task else ()
+            pendientes[task_id] = sum(1 for dep_id in dependencias if dep_id in posiciones)
+
+        listos = [(posiciones[task_id], task_id) for task_id, cantidad in pendientes.items() if cantidad == 0]
+        heapq.heapify(listos)
+        orden = []
+        while listos:
+            _, task_id = heapq.heappop(listos)
+            orden.append(task_id)
+            for dependent_id in self._dependents.get(task_id, ()):
+                if dependent_id in pendientes:
+                    pendientes[dependent_id] -= 1
+                    if pendientes[dependent_id] == 0:
+                        heapq.heappush(listos, (posiciones[dependent_id], dependent_id))
+
+        if len(orden) < len(posiciones):
+            # Ciclo en las dependencias: el resto se aplica en el orden recibido
+            ordenadas = set(orden)
+            orden.extend(sorted((t for t in posiciones if t not in ordenadas), key=posiciones.get))
+        return orden
+
+    @synchronized
+    def update_task_states(self, cambios):
+        """
+        Aplica varios cambios de estado [{'id': ..., 'estado': ...}] con una sola
+        escritura. Las dependencias se aplican antes que las tareas que dependen de
+        ellas. No es atómico: retorna un resultado por cambio, en el orden recibido
+        """
+        resultados = [None] * len(cambios)
+        posiciones = {}
+        for i, cambio in enumerate(cambios):
+            if not isinstance(cambio, dict) or 'id' not in cambio or not cambio.get('estado'):
+                task_id = cambio.get('id') if isinstance(cambio, dict) else None
+                resultados[i] = {'id': task_id, 'ok': False, 'error': "Campos 'id' y 'estado' son requeridos"}
+                continue
+            try:
+                task_id = int(cambio['id'])
+            except (ValueError, TypeError):
+                resultados[i] = {'id': cambio['id'], 'ok': False,
+                                 'error': f"ID de tarea '{cambio['id']}' debe ser un número"}
+                continue
+            if task_id in posiciones:
+                resultados[i] = {'id': task_id, 'ok': False,
+                                 'error': f"La tarea {task_id} aparece más de una vez en el lote"}
+                continue
+            posiciones[task_id] = i
+
+        with self.batch():
+            for task_id in self._topological_order(posiciones):
+                i = posiciones[task_id]
+                try:
+                    task = self.update_task_state(task_id, cambios[i]['estado'])
+                    resultados[i] = {'id': task_id, 'ok': True, 'estado': task.estado}
+                except ValueError as e:
+                    resultados[i] = {'id': task_id, 'ok': False, 'error': str(e)}
+        return resultados
+
+    @synchronized
     def assign_user_to_task(self, task_id, usuario_alias, rol):
         """Asigna un usuario a una tarea"""
         task = self.get_task_by_id(task_id)
@@ -110,15 +672,17 @@ class DataHandler:
         if not user:
             raise ValueError(f"Usuario '{usuario_alias}' no existe")
         
+        # La tarea está ligada a la tabla de asignaciones, que actualiza la vista del usuario
         task.asignar_usuario(usuario_alias, rol)
+        if task.estado != 'finalizada':
+            self._change_open_load(usuario_alias, rol, 1)
+        self._log_undo(self._undo_assign, task, usuario_alias, rol)
+        self._notify('usuario_asignado', {'task_id': task_id, 'usuario': usuario_alias, 'rol': rol})
         
-        # Actualizar lista de tareas del usuario
-        if task_id not in user.tareas_asignadas:
-            user.tareas_asignadas.append(task_id)
-        
-        self.save_data()
+        self._persist()
         return task
 
+    @synchronized
     def remove_user_from_task(self, task_id, usuario_alias):
         """Remueve un usuario de una tarea"""
         task = self.get_task_by_id(task_id)
@@ -129,15 +693,22 @@ class DataHandler:
         if not user:
             raise ValueError(f"Usuario '{usuario_alias}' no existe")
         
+        rol = task.rol_asignado(usuario_alias)
+        asignacion = self.assignments.de_tarea(task_id).get(usuario_alias)
+        # Buscar la posición recorre la tabla: solo se paga dentro de una transacción
+        posicion = None
+        if asignacion is not None and self._undo_log is not None:
+            posicion = self.assignments.posicion(asignacion)
         task.remover_usuario(usuario_alias)
+        if task.estado != 'finalizada':
+            self._change_open_load(usuario_alias, rol, -1)
+        self._log_undo(self._undo_remove_user, task, asignacion, posicion)
+        self._notify('usuario_removido', {'task_id': task_id, 'usuario': usuario_alias})
         
-        # Actualizar lista de tareas del usuario
-        if task_id in user.tareas_asignadas:
-            user.tareas_asignadas.remove(task_id)
-        
-        self.save_data()
+        self._persist()
         return task
 
+    @synchronized
     def add_task_dependency(self, task_id, dependency_task_id):
         """Agrega una dependencia a una tarea"""
         task = self.get_task_by_id(task_id)
@@ -145,25 +716,41 @@ class DataHandler:
             raise ValueError(f"Tarea con ID {task_id} no existe")
         
         dependency_task = self.get_task_by_id(dependency_task_id)
-        if not dependency_task:
+        if not dependency_task and dependency_task_id not in self.archive:
             raise ValueError(f"Tarea de dependencia con ID {dependency_task_id} no existe")
         
         task.agregar_dependencia(dependency_task_id)
-        self.save_data()
+        self._dependents.setdefault(dependency_task_id, set()).add(task_id)
+        self._invalidate_blockers(task_id)
+        if not self._is_finished(dependency_task_id):
+            self._change_pending(task_id, 1)
+        self._log_undo(self._undo_add_dependency, task, dependency_task_id)
+        self._notify('dependencia_agregada', {'task_id': task_id, 'dependencia': dependency_task_id})
+        self._persist()
         return task
 
+    @synchronized
     def remove_task_dependency(self, task_id, dependency_task_id):
         """Remueve una dependencia de una tarea"""
         task = self.get_task_by_id(task_id)
         if not task:
             raise ValueError(f"Tarea con ID {task_id} no existe")
         
+        # Posición original, para que el rollback de una transacción la restaure
+        posicion = task.dependencias.index(dependency_task_id) if dependency_task_id in task.dependencias else 0
         task.remover_dependencia(dependency_task_id)
-        self.save_data()
+        self._dependents.get(dependency_task_id, set()).discard(task_id)
+        self._invalidate_blockers(task_id)
+        if not self._is_finished(dependency_task_id):
+            self._change_pending(task_id, -1)
+        self._log_undo(self._undo_remove_dependency, task, dependency_task_id, posicion)
+        self._notify('dependencia_removida', {'task_id': task_id, 'dependencia': dependency_task_id})
+        self._persist()
         return task
 
-    def get_user_with_tasks(self, alias):
-        """Obtiene un usuario con todas sus tareas asignadas"""
+    @synchronized
+    def get_user_with_tasks(self, alias, campos=None):
+        """Obtiene un usuario con todas sus tareas asignadas; campos limita los de cada tarea"""
         user = self.get_user_by_alias(alias)
         if not user:
             return None
@@ -172,10 +759,430 @@ class DataHandler:
         for task_id in user.tareas_asignadas:
             task = self.get_task_by_id(task_id)
             if task:
-                user_tasks.append(task.to_dict())
+                user_tasks.append(task.to_dict(campos))
         
         return {
             "alias": user.alias,
             "nombre": user.nombre,
             "tareas": user_tasks
-        }
\ No newline at end of file
+        }
+
+    @synchronized
+    def search_tasks(self, consulta, limite=20, prefijo=True):
+        """Busca tareas por palabras en su nombre y descripción"""
+        resultados = []
+        for task_id, puntaje in self.search_index.buscar(consulta, limite, prefijo):
+            task = self.get_task_by_id(task_id)
+            if task:
+                resultados.append((task, puntaje))
+        return resultados
+
+    @synchronized
+    def get_stats(self):
+        """Retorna las estadísticas de tareas a partir de los contadores mantenidos"""
+        total = len(self._tasks_by_id) + len(self.archive)
+        finalizadas = self._count_by_estado['finalizada']
+        return {
+            "total_tareas": total,
+            "por_estado": {estado: self._count_by_estado[estado] for estado in Tarea.ESTADOS_VALIDOS},
+            "por_rol": {rol: self._count_by_rol[rol] for rol in Tarea.ROLES_VALIDOS},
+            "por_usuario": self.assignments.conteo_por_usuario(),
+            "bloqueadas": self._blocked_count,
+            "archivadas": len(self.archive),
+            "tasa_finalizacion": finalizadas / total if total else 0.0
+        }
+
+    @synchronized
+    def get_ready_tasks(self, rol=None, usuario_alias=None):
+        """
+        Retorna las tareas sin finalizar cuyas dependencias están todas finalizadas,
+        opcionalmente filtradas por rol y/o por usuario asignado
+        """
+        tareas = []
+        for task_id in sorted(self._ready):
+            task = self._tasks_by_id[task_id]
+            if usuario_alias:
+                rol_usuario = task.rol_asignado(usuario_alias)
+                if rol_usuario is None or (rol and rol_usuario != rol):
+                    continue
+            elif rol and not any(a['rol'] == rol for a in task.usuarios_asignados):
+                continue
+            tareas.append(task)
+        return tareas
+
+    # Operaciones aceptadas por apply_operations: nombre -> (método, campos requeridos)
+    OPERACIONES = {
+        'create_user': ('create_user', ['contacto', 'nombre']),
+        'create_task': ('create_task', ['nombre', 'descripcion', 'usuario', 'rol']),
+        'update_task_state': ('update_task_state', ['id', 'estado']),
+        'assign_user': ('assign_user_to_task', ['id', 'usuario', 'rol']),
+        'remove_user': ('remove_user_from_task', ['id', 'usuario']),
+        'add_dependency': ('add_task_dependency', ['id', 'dependencytaskid']),
+        'remove_dependency': ('remove_task_dependency', ['id', 'dependencytaskid'])
+    }
+
+    def _resolve_task_ref(self, valor, resultados):
+        """
+        Resuelve un ID de tarea. Acepta un entero o una referencia "$N" a la
+        tarea creada por la operación N de la misma transacción
+        """
+        if isinstance(valor, str) and valor.startswith('$'):
+            try:
+                resultado = resultados[int(valor[1:])]
+            except (ValueError, IndexError):
+                raise ValueError(f"Referencia '{valor}' no es válida")
+            if not isinstance(resultado, Tarea):
+                raise ValueError(f"Referencia '{valor}' no corresponde a una tarea creada")
+            return resultado.id
+        try:
+            return int(valor)
+        except (ValueError, TypeError):
+            raise ValueError(f"ID de tarea '{valor}' debe ser un número")
+
+    def apply_operations(self, operaciones):
+        """
+        Aplica una lista ordenada de operaciones de forma atómica con una sola escritura.
+        Si alguna falla, se revierten todas y se lanza ValueError indicando cuál falló.
+        Retorna el diccionario de cada resultado tal como quedó al aplicar su operación.
+        """
+        objetos = []  # Resultados vivos, para resolver las referencias "$N"
+        resultados = []
+        with self.transaction():
+            for indice, operacion in enumerate(operaciones):
+                try:
+                    if not isinstance(operacion, dict) or operacion.get('op') not in self.OPERACIONES:
+                        raise ValueError(f"Operación debe ser una de: {', '.join(self.OPERACIONES)}")
+
+                    metodo, campos = self.OPERACIONES[operacion['op']]
+                    for campo in campos:
+                        if campo not in operacion:
+                            raise ValueError(f"Campo '{campo}' es requerido")
+
+                    argumentos = [operacion[campo] for campo in campos]
+                    if campos[0] == 'id':
+                        argumentos[0] = self._resolve_task_ref(argumentos[0], objetos)
+                    if 'dependencytaskid' in campos:
+                        argumentos[1] = self._resolve_task_ref(argumentos[1], objetos)
+                        if argumentos[1] == argumentos[0]:
+                            raise ValueError("Una tarea no puede depender de sí misma")
+
+                    resultado = getattr(self, metodo)(*argumentos)
+                    # Se copia ya: las operaciones siguientes pueden modificar el mismo objeto,
+                    # y to_dict comparte listas como dependencias con él
+                    objetos.append(resultado)
+                    resultados.append(copy.deepcopy(resultado.to_dict()))
+                except ValueError as e:
+                    raise ValueError(f"Operación {indice}: {e}") from e
+        return resultados
+
+    @synchronized
+    def get_blockers(self, task_id):
+        """
+        Retorna las dependencias transitivas sin finalizar de una tarea como una lista
+        de (task_id, profundidad), o None si la tarea no existe. Una dependencia
+        finalizada ya no bloquea, así que no se recorren sus propias dependencias.
+        """
+        if task_id not in self._tasks_by_id:
+            return None
+
+        bloqueantes = self._blockers_cache.get(task_id)
+        if bloqueantes is None:
+            bloqueantes = []
+            visitadas = {task_id}
+            nivel = [task_id]
+            profundidad = 0
+            # Recorrido en anchura: cada bloqueante aparece con su profundidad mínima
+            while nivel:
+                profundidad += 1
+                siguiente = []
+                for actual in nivel:
+                    task = self._tasks_by_id.get(actual)
+                    for dep_id in (task.dependencias if task else ()):
+                        if dep_id in visitadas or self._is_finished(dep_id):
+                            continue
+                        visitadas.add(dep_id)
+                        bloqueantes.append((dep_id, profundidad))
+                        siguiente.append(dep_id)
+                nivel = siguiente
+            self._blockers_cache[task_id] = bloqueantes
+        return list(bloqueantes)
+
+    @synchronized
+    def get_dependents(self, task_id, transitive=False):
+        """
+        Retorna las tareas que dependen de la tarea como una lista de (task_id, profundidad),
+        solo las directas o todas las transitivas, o None si la tarea no existe.
+        Usa la adyacencia inversa, así que el costo es proporcional al resultado.
+        """
+        if task_id not in self._tasks_by_id:
+            return None
+
+        dependientes = []
+        visitadas = {task_id}
+        nivel = [task_id]
+        profundidad = 0
+        while nivel:
+            profundidad += 1
+            siguiente = []
+            for actual in nivel:
+                for dependent_id in sorted(self._dependents.get(actual, ())):
+                    if dependent_id in visitadas:
+                        continue
+                    visitadas.add(dependent_id)
+                    dependientes.append((dependent_id, profundidad))
+                    siguiente.append(dependent_id)
+            nivel = siguiente if transitive else []
+        return dependientes
+
+    @synchronized
+    def get_impact(self, task_id, transitive=False):
+        """
+        Resume el impacto de retrasar una tarea: sus dependientes y los conteos
+        por rol y por usuario asignado. Retorna None si la tarea no existe.
+        """
+        dependientes = self.get_dependents(task_id, transitive)
+        if dependientes is None:
+            return None
+
+        por_rol = Counter()
+        por_usuario = Counter()
+        tareas = []
+        for dependent_id, profundidad in dependientes:
+            task = self._tasks_by_id[dependent_id]
+            por_rol[task.rol] += 1
+            for asignacion in task.usuarios_asignados:
+                por_usuario[asignacion['usuario']] += 1
+            tareas.append({
+                "id": task.id,
+                "profundidad": profundidad,
+                "nombre": task.nombre,
+                "estado": task.estado
+            })
+
+        return {
+            "task_id": task_id,
+            "dependientes": tareas,
+            "total": len(tareas),
+            "por_rol": dict(por_rol),
+            "por_usuario": dict(por_usuario)
+        }
+
+    @synchronized
+    def suggest_assignees(self, task_id, rol, limite=5):
+        """
+        Sugiere usuarios para una tarea ordenados por su carga abierta en el rol
+        (y luego por su carga abierta total). Excluye a los ya asignados.
+        Retorna None si la tarea no existe.
+        """
+        task = self._tasks_by_id.get(task_id)
+        if task is None:
+            return None
+
+        def clave(user):
+            carga = self._open_load.get(user.alias, {})
+            return (carga.get(rol, 0), sum(carga.values()), user.alias)
+
+        candidatos = (user for user in self.users if task.rol_asignado(user.alias) is None)
+        sugeridos = []
+        for user in heapq.nsmallest(limite, candidatos, key=clave):
+            carga_rol, carga_total, _ = clave(user)
+            sugeridos.append({
+                "alias": user.alias,
+                "nombre": user.nombre,
+                "carga_rol": carga_rol,
+                "carga_total": carga_total
+            })
+        return sugeridos
+
+    @synchronized
+    def archive_finalized(self, edad_minima=None):
+        """
+        Mueve al almacén frío las tareas finalizadas hace al menos edad_minima segundos.
+        Las estadísticas y las verificaciones de dependencias las siguen viendo como
+        finalizadas. Retorna los IDs archivados.
+        """
+        if self._undo_log is not None:
+            raise ValueError("No se puede archivar dentro de una transacción: el almacén frío no se revierte")
+        edad_minima = self.ARCHIVE_AFTER if edad_minima is None else edad_minima
+        limite = time.time() - edad_minima
+        archivadas = [
+            self._tasks_by_id[task_id] for task_id, ts in sorted(self._finalized_at.items())
+            if ts <= limite
+        ]
+        if not archivadas:
+            return []
+
+        # Primero se escribe el almacén frío: si el proceso se interrumpe antes de
+        # guardar los datos, load_data completa el archivado
+        self.archive.agregar([task.to_dict() for task in archivadas])
+
+        ids = {task.id for task in archivadas}
+        self.tasks = [task for task in self.tasks if task.id not in ids]
+        for task in archivadas:
+            del self._tasks_by_id[task.id]
+            del self._finalized_at[task.id]
+            self.assignments.remover_tarea(task.id)
+            self.search_index.remover(task)
+            self._pending_deps.pop(task.id, None)
+            self._blockers_cache.pop(task.id, None)
+            for dep_id in task.dependencias:
+                self._dependents.get(dep_id, set()).discard(task.id)
+            self._notify('tarea_archivada', {'task_id': task.id})
+
+        self._persist()
+        return sorted(ids)
+
+    def get_archived_task(self, task_id):
+        """Obtiene una tarea archivada como diccionario, o None si no está archivada"""
+        return self.archive.obtener(task_id)
+
+    def _validate_import(self, usuarios, tareas):
+        """
+        Valida en una sola pasada los registros a importar: tipos, campos, roles,
+        estados e integridad referencial de usuarios y dependencias. Asigna IDs a
+        las tareas que no lo traen y convierte a número los IDs de dependencias.
+        Retorna la lista de errores encontrados.
+        """
+        errores = []
+        aliases = set(self._users_by_alias)
+        for i, usuario in enumerate(usuarios):
+            if not isinstance(usuario, dict):
+                errores.append(f"Usuario {i}: debe ser un objeto")
+            elif not usuario.get('alias') or not usuario.get('nombre'):
+                errores.append(f"Usuario {i}: los campos 'alias' y 'nombre' son requeridos")
+            elif not isinstance(usuario['alias'], str) or not isinstance(usuario['nombre'], str):
+                errores.append(f"Usuario {i}: los campos 'alias' y 'nombre' deben ser texto")
+            elif usuario['alias'] in aliases:
+                errores.append(f"Usuario {i}: alias '{usuario['alias']}' ya existe")
+            else:
+                aliases.add(usuario['alias'])
+
+        validas = []
+        for i, tarea in enumerate(tareas):
+            if isinstance(tarea, dict):
+                validas.append((i, tarea))
+            else:
+                errores.append(f"Tarea {i}: debe ser un objeto")
+
+        ids = set(self._tasks_by_id)
+        siguiente_id = self.next_task_id
+        for i, tarea in validas:
+            if tarea.get('id') is not None:
+                try:
+                    tarea['id'] = int(tarea['id'])
+                except (ValueError, TypeError):
+                    errores.append(f"Tarea {i}: id '{tarea['id']}' debe ser un número")
+                    continue
+                if tarea['id'] in ids or tarea['id'] in self.archive:
+                    errores.append(f"Tarea {i}: id {tarea['id']} ya existe")
+                ids.add(tarea['id'])
+                siguiente_id = max(siguiente_id, tarea['id'] + 1)
+        for _, tarea in validas:
+            if tarea.get('id') is None:
+                tarea['id'] = siguiente_id
+                ids.add(siguiente_id)
+                siguiente_id += 1
+
+        for i, tarea in validas:
+            dependencias = tarea.get('dependencias') or []
+            if not isinstance(dependencias, list):
+                errores.append(f"Tarea {i}: 'dependencias' debe ser una lista")
+                dependencias = []
+            convertidas = []
+            for dep_id in dependencias:
+                try:
+                    convertidas.append(int(dep_id))
+                except (ValueError, TypeError):
+                    errores.append(f"Tarea {i}: dependencia '{dep_id}' debe ser un número")
+            tarea['dependencias'] = convertidas
+
+        estados = {task.id: task.estado for task in self.tasks}
+        estados.update((tarea['id'], tarea.get('estado') or 'nueva') for _, tarea in validas)
+        for i, tarea in validas:
+            for campo in ['nombre', 'descripcion', 'usuario_creador', 'rol']:
+                if not tarea.get(campo):
+                    errores.append(f"Tarea {i}: campo '{campo}' es requerido")
+                elif not isinstance(tarea[campo], str):
+                    errores.append(f"Tarea {i}: campo '{campo}' debe ser texto")
+            if isinstance(tarea.get('rol'), str) and tarea['rol'] not in Tarea.ROLES_VALIDOS:
+                errores.append(f"Tarea {i}: rol '{tarea['rol']}' no es válido")
+            estado = tarea.get('estado') or 'nueva'
+            if estado not in Tarea.ESTADOS_VALIDOS:
+                errores.append(f"Tarea {i}: estado '{estado}' no es válido")
+            if isinstance(tarea.get('usuario_creador'), str) and tarea['usuario_creador'] not in aliases:
+                errores.append(f"Tarea {i}: usuario '{tarea['usuario_creador']}' no existe")
+
+            asignaciones = tarea.get('usuarios_asignados') or []
+            if not isinstance(asignaciones, list):
+                errores.append(f"Tarea {i}: 'usuarios_asignados' debe ser una lista")
+                asignaciones = []
+            asignados = set()
+            for asignacion in asignaciones:
+                if not isinstance(asignacion, dict) or not isinstance(asignacion.get('usuario'), str):
+                    errores.append(f"Tarea {i}: cada usuario asignado debe ser un objeto con 'usuario' y 'rol'")
+                    continue
+                if asignacion['usuario'] not in aliases:
+                    errores.append(f"Tarea {i}: usuario asignado '{asignacion['usuario']}' no existe")
+                elif asignacion['usuario'] in asignados:
+                    errores.append(f"Tarea {i}: usuario '{asignacion['usuario']}' asignado más de una vez")
+                asignados.add(asignacion['usuario'])
+                if asignacion.get('rol') not in Tarea.ROLES_VALIDOS:
+                    errores.append(f"Tarea {i}: rol asignado '{asignacion.get('rol')}' no es válido")
+
+            for dep_id in tarea['dependencias']:
+                if dep_id == tarea['id']:
+                    errores.append(f"Tarea {i}: una tarea no puede depender de sí misma")
+                elif dep_id not in ids and dep_id not in self.archive:
+                    errores.append(f"Tarea {i}: dependencia {dep_id} no existe")
+                elif estado == 'finalizada' and dep_id not in self.archive and estados.get(dep_id) != 'finalizada':
+                    errores.append(f"Tarea {i}: está finalizada pero su dependencia {dep_id} no")
+            if len(set(tarea['dependencias'])) < len(tarea['dependencias']):
+                errores.append(f"Tarea {i}: tiene dependencias repetidas")
+        return errores
+
+    @synchronized
+    def import_records(self, usuarios, tareas):
+        """
+        Importa usuarios y tareas en bloque sin pasar por create_user/create_task:
+        valida todo en una pasada, construye los registros, los agrega, reconstruye
+        los índices una vez y escribe el almacenamiento una sola vez. Si hay errores
+        no se importa nada y se lanza ValueError con el detalle.
+        """
+        usuarios = list(usuarios)
+        tareas = [dict(tarea) if isinstance(tarea, dict) else tarea for tarea in tareas]
+        errores = self._validate_import(usuarios, tareas)
+        if errores:
+            detalle = '; '.join(errores[:20])
+            if len(errores) > 20:
+                detalle += f" (y {len(errores) - 20} errores más)"
+            raise ValueError(f"Importación rechazada: {detalle}")
+
+        # Se construyen todos los registros antes de modificar el estado: si alguno
+        # falla, el almacén queda como estaba
+        nuevos_usuarios = [Usuario(usuario_data['alias'], usuario_data['nombre']) for usuario_data in usuarios]
+        nuevas_tareas = []
+        for task_data in tareas:
+            task_data['estado'] = task_data.get('estado') or 'nueva'
+            if not task_data.get('usuarios_asignados'):
+                task_data['usuarios_asignados'] = [
+                    {'usuario': task_data['usuario_creador'], 'rol': task_data['rol']}
+                ]
+            nuevas_tareas.append(Tarea.from_dict(task_data))
+
+        self._log_undo(self._undo_import, len(self.users), len(self.tasks), self.next_task_id)
+        for user in nuevos_usuarios:
+            self.users.append(user)
+            self.assignments.vincular_usuario(user)
+
+        ahora = time.time()
+        for task in nuevas_tareas:
+            self.tasks.append(task)
+            self.assignments.vincular_tarea(task)
+            if task.estado == 'finalizada':
+                self._finalized_at[task.id] = ahora
+            self.next_task_id = max(self.next_task_id, task.id + 1)
+
+        self._rebuild_indexes()
+        self._notify('importacion', {'usuarios': len(usuarios), 'tareas': len(tareas)})
+        self._persist()
+        return len(usuarios), len(tareas)
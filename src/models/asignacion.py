@@ -1,8 +1,14 @@
+import sys
+
+
 class Asignacion:
+    # Hay una instancia por cada par tarea-usuario: sin __dict__ ocupan menos memoria
+    __slots__ = ('task_id', 'user_alias', 'rol')
+
     def __init__(self, task_id, user_alias, rol):
         self.task_id = task_id
-        self.user_alias = user_alias
-        self.rol = rol
+        self.user_alias = sys.intern(user_alias)
+        self.rol = sys.intern(rol)
     
     def get_assignment_details(self):
         return {
@@ -24,4 +30,121 @@ class Asignacion:
             data["task_id"],
             data["user_alias"],
             data["rol"]
-        )
\ No newline at end of file
+        )
+
+def _insertar_en(indice, posicion, clave, valor):
+    """Inserta clave en la posición dada de un dict, sin recrear ni reordenar el resto"""
+    # Se usan los métodos de dict para no disparar la reindexación de _AsignacionesDeTarea
+    siguientes = [(k, dict.pop(indice, k)) for k in list(indice)[posicion:]]
+    dict.__setitem__(indice, clave, valor)
+    for k, v in siguientes:
+        dict.__setitem__(indice, k, v)
+
+
+class _AsignacionesDeTarea(dict):
+    """
+    Vista alias -> Asignacion de una tarea, ligada a la tabla de asignaciones.
+    Escribir con [] o borrar con del mantiene actualizados los demás índices.
+    """
+
+    def __init__(self, tabla, task_id):
+        super().__init__()
+        self._tabla = tabla
+        self._task_id = task_id
+
+    def __setitem__(self, alias, asignacion):
+        if alias in self:
+            self._tabla._desindexar(self[alias])
+        super().__setitem__(alias, asignacion)
+        self._tabla._indexar(asignacion)
+
+    def __delitem__(self, alias):
+        asignacion = self[alias]
+        super().__delitem__(alias)
+        self._tabla._desindexar(asignacion)
+
+
+class TablaAsignaciones:
+    """
+    Relación tarea-usuario normalizada, indexada por task_id y por user_alias.
+    Es la única fuente de verdad: las tareas y los usuarios ligados a la tabla
+    leen sus asignaciones de estos índices.
+    """
+
+    def __init__(self):
+        self._todas = {}  # (task_id, user_alias) -> Asignacion, en orden de asignación
+        self._por_tarea = {}  # task_id -> {user_alias: Asignacion}
+        self._por_usuario = {}  # user_alias -> {task_id: Asignacion}
+
+    def __iter__(self):
+        return iter(list(self._todas.values()))
+
+    def __len__(self):
+        return len(self._todas)
+
+    def _indexar(self, asignacion):
+        self._todas[(asignacion.task_id, asignacion.user_alias)] = asignacion
+        self.de_usuario(asignacion.user_alias)[asignacion.task_id] = asignacion
+
+    def _desindexar(self, asignacion):
+        del self._todas[(asignacion.task_id, asignacion.user_alias)]
+        del self._por_usuario[asignacion.user_alias][asignacion.task_id]
+
+    def agregar(self, asignacion):
+        """Registra una asignación"""
+        self.de_tarea(asignacion.task_id)[asignacion.user_alias] = asignacion
+
+    def de_tarea(self, task_id):
+        """Asignaciones de la tarea, como dict user_alias -> Asignacion"""
+        asignaciones = self._por_tarea.get(task_id)
+        if asignaciones is None:
+            asignaciones = self._por_tarea[task_id] = _AsignacionesDeTarea(self, task_id)
+        return asignaciones
+
+    def de_usuario(self, user_alias):
+        """Asignaciones del usuario, como dict task_id -> Asignacion"""
+        asignaciones = self._por_usuario.get(user_alias)
+        if asignaciones is None:
+            asignaciones = self._por_usuario[user_alias] = {}
+        return asignaciones
+
+    def posicion(self, asignacion):
+        """Posición de la asignación en el índice de su tarea, en el de su usuario y en la tabla"""
+        return (
+            list(self._por_tarea[asignacion.task_id]).index(asignacion.user_alias),
+            list(self._por_usuario[asignacion.user_alias]).index(asignacion.task_id),
+            list(self._todas).index((asignacion.task_id, asignacion.user_alias))
+        )
+
+    def reinsertar(self, asignacion, posicion):
+        """Vuelve a registrar una asignación removida en la posición que ocupaba en cada índice"""
+        en_tarea, en_usuario, en_tabla = posicion
+        _insertar_en(self.de_tarea(asignacion.task_id), en_tarea, asignacion.user_alias, asignacion)
+        _insertar_en(self.de_usuario(asignacion.user_alias), en_usuario, asignacion.task_id, asignacion)
+        _insertar_en(self._todas, en_tabla, (asignacion.task_id, asignacion.user_alias), asignacion)
+
+    def conteo_por_usuario(self):
+        """Cantidad de tareas asignadas a cada usuario"""
+        return {alias: len(tareas) for alias, tareas in self._por_usuario.items() if tareas}
+
+    def vincular_tarea(self, tarea):
+        """Mueve las asignaciones propias de la tarea a la tabla y la liga a su índice"""
+        asignaciones = self.de_tarea(tarea.id)
+        for asignacion in list(tarea._asignados.values()):
+            asignaciones[asignacion.user_alias] = asignacion
+        tarea._asignados = asignaciones
+
+    def vincular_usuario(self, usuario):
+        """Liga el usuario a su índice de tareas asignadas"""
+        usuario._tareas = self.de_usuario(usuario.alias)
+        usuario._ligado = True
+
+    def remover_usuario(self, user_alias):
+        """Elimina el índice de un usuario, que ya no debe tener asignaciones"""
+        self._por_usuario.pop(user_alias, None)
+
+    def remover_tarea(self, task_id):
+        """Elimina todas las asignaciones de una tarea"""
+        asignaciones = self._por_tarea.pop(task_id, None)
+        for alias in list(asignaciones or ()):
+            del asignaciones[alias]
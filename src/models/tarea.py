@@ -1,3 +1,8 @@
+import sys
+
+from models.asignacion import Asignacion
+
+
 class Tarea:
     ESTADOS_VALIDOS = ['nueva', 'en_progreso', 'finalizada']
     TRANSICIONES_VALIDAS = {
@@ -6,6 +11,8 @@ class Tarea:
         'finalizada': []
     }
     ROLES_VALIDOS = ['programador', 'pruebas', 'infra']
+    CAMPOS = ['id', 'nombre', 'descripcion', 'usuario_creador', 'rol', 'estado',
+              'dependencias', 'usuarios_asignados']
     
     def __init__(self, id, nombre, descripcion, usuario_creador, rol):
         # Validar rol al crear la tarea
@@ -15,14 +22,35 @@ class Tarea:
         self.id = id
         self.nombre = nombre
         self.descripcion = descripcion
-        self.usuario_creador = usuario_creador
-        self.rol = rol
+        # Alias, rol y estado se internan: todas las tareas comparten una sola
+        # copia de cada texto y las comparaciones se resuelven por identidad
+        self.usuario_creador = usuario_creador = sys.intern(usuario_creador)
+        self.rol = sys.intern(rol)
         self.estado = 'nueva'
         self.dependencias = []  # Lista de IDs de tareas de las que depende
-        self.usuarios_asignados = []  # Lista de diccionarios {'usuario': alias, 'rol': rol}
+        self._asignados = {}  # alias -> Asignacion, en orden de asignación
         
         # Asignar automáticamente al usuario creador
-        self.usuarios_asignados.append({'usuario': usuario_creador, 'rol': rol})
+        self._asignados[usuario_creador] = Asignacion(id, usuario_creador, rol)
+    
+    @property
+    def usuarios_asignados(self):
+        """Lista de diccionarios {'usuario': alias, 'rol': rol} en orden de asignación"""
+        return [{'usuario': a.user_alias, 'rol': a.rol} for a in self._asignados.values()]
+    
+    @usuarios_asignados.setter
+    def usuarios_asignados(self, asignaciones):
+        # Se modifica el dict existente para que una tarea ligada a la tabla de asignaciones la actualice
+        for alias in list(self._asignados):
+            del self._asignados[alias]
+        for asignacion in asignaciones:
+            alias = sys.intern(asignacion['usuario'])
+            self._asignados[alias] = Asignacion(self.id, alias, asignacion['rol'])
+    
+    def rol_asignado(self, usuario_alias):
+        """Retorna el rol con el que el usuario está asignado, o None si no lo está"""
+        asignacion = self._asignados.get(usuario_alias)
+        return asignacion.rol if asignacion else None
     
     def cambiar_estado(self, nuevo_estado):
         """Cambia el estado de la tarea si la transición es válida"""
@@ -32,7 +60,7 @@ class Tarea:
         if nuevo_estado not in self.TRANSICIONES_VALIDAS[self.estado]:
             raise ValueError(f"No se puede cambiar de '{self.estado}' a '{nuevo_estado}'")
         
-        self.estado = nuevo_estado
+        self.estado = sys.intern(nuevo_estado)
     
     def asignar_usuario(self, usuario_alias, rol):
         """Asigna un usuario a la tarea con un rol específico"""
@@ -40,30 +68,23 @@ class Tarea:
             raise ValueError(f"Rol '{rol}' no es válido")
         
         # Verificar si el usuario ya está asignado
-        for asignacion in self.usuarios_asignados:
-            if asignacion['usuario'] == usuario_alias:
-                raise ValueError(f"Usuario '{usuario_alias}' ya está asignado a esta tarea")
+        if usuario_alias in self._asignados:
+            raise ValueError(f"Usuario '{usuario_alias}' ya está asignado a esta tarea")
         
-        self.usuarios_asignados.append({'usuario': usuario_alias, 'rol': rol})
+        usuario_alias = sys.intern(usuario_alias)
+        self._asignados[usuario_alias] = Asignacion(self.id, usuario_alias, rol)
     
     def remover_usuario(self, usuario_alias):
         """Remueve un usuario de la tarea"""
         # Verificar que el usuario esté asignado
-        usuario_encontrado = False
-        for i, asignacion in enumerate(self.usuarios_asignados):
-            if asignacion['usuario'] == usuario_alias:
-                usuario_encontrado = True
-                asignacion_index = i
-                break
-        
-        if not usuario_encontrado:
+        if usuario_alias not in self._asignados:
             raise ValueError(f"Usuario '{usuario_alias}' no está asignado a esta tarea")
         
         # Verificar que no sea el último usuario (siempre debe haber al menos uno)
-        if len(self.usuarios_asignados) <= 1:
+        if len(self._asignados) <= 1:
             raise ValueError("Una tarea debe tener al menos un usuario asignado")
         
-        self.usuarios_asignados.pop(asignacion_index)
+        del self._asignados[usuario_alias]
     
     def agregar_dependencia(self, tarea_id):
         """Agrega una dependencia a la tarea"""
@@ -93,7 +114,10 @@ class Tarea:
         
         return True
     
-    def to_dict(self):
+    def to_dict(self, campos=None):
+        """Serializa la tarea; con campos solo se calculan los indicados"""
+        if campos is not None:
+            return {campo: getattr(self, campo) for campo in campos}
         return {
             "id": self.id,
             "nombre": self.nombre,
@@ -114,7 +138,7 @@ class Tarea:
             data["usuario_creador"],
             data["rol"]
         )
-        tarea.estado = data.get("estado", "nueva")
+        tarea.estado = sys.intern(data.get("estado", "nueva"))
         tarea.dependencias = data.get("dependencias", [])
         # Esta línea debe ejecutarse para cubrir la línea 66
         usuarios_asignados_data = data.get("usuarios_asignados", [])
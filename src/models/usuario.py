@@ -1,8 +1,29 @@
+import sys
+
+
 class Usuario:
+    CAMPOS = ['alias', 'nombre', 'tareas_asignadas']
+
     def __init__(self, alias, nombre):
-        self.alias = alias
+        if not isinstance(alias, str):
+            raise ValueError("El alias debe ser un texto")
+        # Alias internado: las tareas y asignaciones comparten la misma copia
+        self.alias = sys.intern(alias)
         self.nombre = nombre
-        self.tareas_asignadas = []
+        self._tareas = {}  # IDs de tareas como claves de un dict ordenado
+        self._ligado = False  # True cuando _tareas es el índice de la tabla de asignaciones
+    
+    @property
+    def tareas_asignadas(self):
+        """Lista de IDs de las tareas asignadas, en orden de asignación"""
+        return list(self._tareas)
+    
+    @tareas_asignadas.setter
+    def tareas_asignadas(self, task_ids):
+        # Ligado a la tabla de asignaciones, la relación solo se modifica desde la tarea
+        if self._ligado:
+            raise ValueError("Las tareas de un usuario se asignan desde la tarea")
+        self._tareas = dict.fromkeys(task_ids)
     
     def get_user_info(self):
         return {
@@ -11,7 +32,10 @@ class Usuario:
             "tareas_asignadas": self.tareas_asignadas
         }
     
-    def to_dict(self):
+    def to_dict(self, campos=None):
+        """Serializa el usuario; con campos solo se calculan los indicados"""
+        if campos is not None:
+            return {campo: getattr(self, campo) for campo in campos}
         return {
             "alias": self.alias,
             "nombre": self.nombre,
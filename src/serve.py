@@ -0,0 +1,151 @@
+"""
+Servidor de producción: ejecuta la aplicación con gunicorn y workers de hilos (gthread).
+
+Uso:
+    python src/serve.py --bind 0.0.0.0:8000 --threads 8 --data data.json
+
+Los datos viven en la memoria del worker, así que se usa un único worker y la
+concurrencia se obtiene con --threads: con varios workers las escrituras de uno
+no se verían en los otros y el último en guardar sobrescribiría el archivo.
+
+El worker toma un bloqueo sobre el archivo de datos antes de cargarlo y lo
+suelta al terminar, después de guardar lo pendiente y los índices derivados.
+En una recarga con SIGHUP gunicorn inicia el worker nuevo antes de detener el
+anterior: el nuevo espera el bloqueo, de modo que carga los datos recién cuando
+el anterior terminó sus solicitudes y guardó.
+
+Cada long-poll (GET /changes?timeout=) y cada stream SSE ocupa un hilo mientras
+está abierto. --feed-clients los limita (por defecto a la mitad de --threads) y
+debe quedar por debajo de --threads; por encima del límite responden 503.
+"""
+import argparse
+import fcntl
+import logging
+import os
+import sys
+import time
+
+from gunicorn.app.base import BaseApplication
+
+
+logger = logging.getLogger('gunicorn.error')
+
+
+def _servicios(worker):
+    return worker.wsgi.extensions['task_system']
+
+
+def _tomar_bloqueo(filename, worker):
+    """Espera el bloqueo exclusivo del archivo de datos, avisando a gunicorn que el worker sigue vivo"""
+    archivo = open(filename + '.lock', 'a')
+    while True:
+        try:
+            fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return archivo
+        except BlockingIOError:
+            worker.notify()
+            time.sleep(0.1)
+
+
+def post_worker_init(worker):
+    """Espera a que el worker anterior suelte los datos y los carga antes de atender solicitudes"""
+    servicios = _servicios(worker)
+    if servicios.config['DATA_HANDLER'] is None and servicios.config['STORAGE'] != 'memory':
+        worker.bloqueo_datos = _tomar_bloqueo(servicios.config['DATA_FILE'], worker)
+        logger.info("Worker %s cargando %s", worker.pid, servicios.config['DATA_FILE'])
+    servicios.preload()
+
+
+def worker_exit(server, worker):
+    """Guarda lo pendiente y los índices al terminar el worker, y luego suelta el bloqueo"""
+    wsgi = getattr(worker, 'wsgi', None)
+    if wsgi is not None:
+        servicios = _servicios(worker)
+        if servicios.loaded:
+            servicios.data_handler.close()
+            logger.info("Datos guardados al terminar el worker %s", worker.pid)
+
+    bloqueo = getattr(worker, 'bloqueo_datos', None)
+    if bloqueo is not None:
+        fcntl.flock(bloqueo, fcntl.LOCK_UN)
+        bloqueo.close()
+
+
+class ServidorProduccion(BaseApplication):
+    """Aplicación de gunicorn que crea la aplicación Flask dentro de cada worker"""
+
+    def __init__(self, opciones, config_app=None):
+        self.opciones = opciones
+        self.config_app = config_app or {}
+        super().__init__()
+
+    def load_config(self):
+        for clave, valor in self.opciones.items():
+            self.cfg.set(clave, valor)
+        self.cfg.set('post_worker_init', post_worker_init)
+        self.cfg.set('worker_exit', worker_exit)
+
+    def load(self):
+        # Se importa aquí para que una recarga con SIGHUP tome el código nuevo
+        from controller import create_app
+        return create_app(self.config_app)
+
+
+def construir_opciones(args):
+    """Traduce los argumentos de la línea de comandos a la configuración de gunicorn"""
+    return {
+        'bind': args.bind,
+        'workers': args.workers,
+        'worker_class': 'gthread',
+        'threads': args.threads,
+        'keepalive': args.keep_alive,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10,
+        'preload_app': args.preload,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de producción del sistema de tareas")
+    parser.add_argument('--bind', default=os.environ.get('BIND', '127.0.0.1:8000'),
+                        help="dirección en la que escuchar (host:puerto)")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', 1)),
+                        help="procesos worker; solo se admite 1 porque los datos viven en su memoria")
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('THREADS', 8)),
+                        help="hilos por worker")
+    parser.add_argument('--feed-clients', type=int, default=None,
+                        help="long-polls y streams SSE simultáneos (por defecto la mitad de --threads)")
+    parser.add_argument('--keep-alive', type=int, default=5,
+                        help="segundos que se mantiene abierta una conexión inactiva")
+    parser.add_argument('--timeout', type=int, default=30,
+                        help="segundos sin responder antes de reiniciar un worker")
+    parser.add_argument('--graceful-timeout', type=int, default=30,
+                        help="segundos para terminar las solicitudes en curso al apagar o recargar")
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help="reiniciar cada worker tras esta cantidad de solicitudes (0 desactiva)")
+    parser.add_argument('--preload', action='store_true',
+                        help="importar la aplicación en el proceso maestro (SIGHUP ya no recarga el código)")
+    parser.add_argument('--data', help="archivo de datos (por defecto TASKS_DATA_FILE o data.json)")
+    args = parser.parse_args(argv)
+
+    if args.workers != 1:
+        parser.error("--workers debe ser 1: cada worker tendría su propia copia de los datos y "
+                     "se perderían escrituras. Use --threads para más concurrencia")
+    if args.threads < 1:
+        parser.error("--threads debe ser al menos 1")
+    if args.feed_clients is None:
+        args.feed_clients = args.threads // 2
+    if not 0 <= args.feed_clients < args.threads:
+        parser.error("--feed-clients debe ser menor que --threads: cada stream ocupa un hilo")
+
+    config_app = {'FEED_MAX_CLIENTS': args.feed_clients}
+    if args.data:
+        config_app['DATA_FILE'] = args.data
+    ServidorProduccion(construir_opciones(args), config_app).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ColaSaturada(Exception):
+    """La cola de escrituras está llena o la espera superó el máximo permitido"""
+
+    def __init__(self, retry_after):
+        super().__init__("Servicio saturado, intente nuevamente más tarde")
+        self.retry_after = retry_after
+
+
+class ControlAdmision:
+    """
+    Cola acotada delante de las escrituras: limita cuántas se ejecutan a la vez
+    y cuántas pueden esperar. Cuando está saturada rechaza de inmediato.
+    """
+
+    def __init__(self, concurrencia=1, profundidad_cola=32, espera_maxima=5.0):
+        if concurrencia < 1:
+            raise ValueError("La concurrencia debe ser al menos 1")
+        if profundidad_cola < 0:
+            raise ValueError("La profundidad de la cola no puede ser negativa")
+
+        self.concurrencia = concurrencia
+        self.profundidad_cola = profundidad_cola
+        self.espera_maxima = espera_maxima
+        self._condicion = threading.Condition()
+        self._activos = 0
+        self._en_cola = 0
+        # Métricas
+        self._admitidas = 0
+        self._rechazadas = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._servicio_promedio = 0.0
+
+    def _retry_after(self):
+        """Estima en segundos cuándo habrá capacidad, según el tiempo de servicio promedio"""
+        pendientes = self._en_cola + self._activos
+        return max(1, math.ceil(self._servicio_promedio * pendientes / self.concurrencia))
+
+    @contextmanager
+    def admitir(self):
+        """Espera un turno para escribir o lanza ColaSaturada"""
+        inicio = time.monotonic()
+        with self._condicion:
+            if self._activos >= self.concurrencia:
+                if self._en_cola >= self.profundidad_cola:
+                    self._rechazadas += 1
+                    raise ColaSaturada(self._retry_after())
+
+                self._en_cola += 1
+                try:
+                    admitida = self._condicion.wait_for(
+                        lambda: self._activos < self.concurrencia, self.espera_maxima
+                    )
+                finally:
+                    self._en_cola -= 1
+
+                if not admitida:
+                    self._rechazadas += 1
+                    raise ColaSaturada(self._retry_after())
+
+            self._activos += 1
+            espera = time.monotonic() - inicio
+            self._admitidas += 1
+            self._espera_total += espera
+            self._espera_max = max(self._espera_max, espera)
+
+        inicio_servicio = time.monotonic()
+        try:
+            yield
+        finally:
+            servicio = time.monotonic() - inicio_servicio
+            with self._condicion:
+                self._activos -= 1
+                # Promedio móvil exponencial del tiempo de servicio
+                self._servicio_promedio = 0.8 * self._servicio_promedio + 0.2 * servicio
+                self._condicion.notify()
+
+    def metricas(self):
+        """Retorna el estado de la cola y los tiempos de espera"""
+        with self._condicion:
+            return {
+                "concurrencia": self.concurrencia,
+                "profundidad_maxima": self.profundidad_cola,
+                "activas": self._activos,
+                "en_cola": self._en_cola,
+                "admitidas": self._admitidas,
+                "rechazadas": self._rechazadas,
+                "espera_promedio": self._espera_total / self._admitidas if self._admitidas else 0.0,
+                "espera_maxima": self._espera_max,
+                "servicio_promedio": self._servicio_promedio
+            }
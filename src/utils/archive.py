@@ -0,0 +1,127 @@
+import io
+import json
+import os
+import struct
+import zlib
+
+
+class AlmacenFrio:
+    """
+    Almacén de solo-agregado y comprimido para tareas archivadas.
+
+    Cada lote se escribe como un registro: longitud de la cabecera y del cuerpo
+    (dos enteros de 4 bytes), una cabecera JSON con los IDs y roles del lote y el
+    cuerpo NDJSON comprimido con zlib. Al abrir solo se leen las cabeceras, así que
+    consultar una tarea por ID descomprime únicamente su lote.
+
+    Sin filename los registros se guardan en memoria, en el bytearray indicado.
+    """
+
+    _PREFIJO = struct.Struct('>II')
+
+    def __init__(self, filename=None, buffer=None):
+        self.filename = filename
+        self._buffer = buffer if buffer is not None else bytearray()
+        self._ubicaciones = {}  # task_id -> (offset del cuerpo, longitud del cuerpo)
+        self._roles = {}  # task_id -> rol, para las estadísticas
+        self._cargar_indice()
+
+    def __contains__(self, task_id):
+        return task_id in self._ubicaciones
+
+    def __len__(self):
+        return len(self._ubicaciones)
+
+    def roles(self):
+        """Rol de cada tarea archivada"""
+        return dict(self._roles)
+
+    def _abrir(self):
+        """Abre el almacén para lectura, sea el archivo o el buffer en memoria"""
+        if self.filename is None:
+            return io.BytesIO(self._buffer)
+        return open(self.filename, 'rb')
+
+    def _existe(self):
+        return os.path.exists(self.filename) if self.filename is not None else bool(self._buffer)
+
+    def _cargar_indice(self):
+        """Recorre las cabeceras del almacén; un registro final incompleto se descarta"""
+        if not self._existe():
+            return
+
+        with self._abrir() as f:
+            tamano = f.seek(0, io.SEEK_END)
+            offset = 0
+            while offset + self._PREFIJO.size <= tamano:
+                f.seek(offset)
+                largo_cabecera, largo_cuerpo = self._PREFIJO.unpack(f.read(self._PREFIJO.size))
+                inicio_cuerpo = offset + self._PREFIJO.size + largo_cabecera
+                if inicio_cuerpo + largo_cuerpo > tamano:
+                    break
+                cabecera = json.loads(f.read(largo_cabecera))
+                for task_id, rol in cabecera['tareas']:
+                    self._ubicaciones[task_id] = (inicio_cuerpo, largo_cuerpo)
+                    self._roles[task_id] = rol
+                offset = inicio_cuerpo + largo_cuerpo
+
+        if offset < tamano:
+            # Escritura interrumpida: se descarta el registro incompleto
+            if self.filename is None:
+                del self._buffer[offset:]
+            else:
+                with open(self.filename, 'r+b') as escritura:
+                    escritura.truncate(offset)
+
+    def agregar(self, tareas):
+        """Agrega un lote de tareas (diccionarios) al final del archivo"""
+        if not tareas:
+            return
+
+        cabecera = json.dumps({'tareas': [[t['id'], t['rol']] for t in tareas]}).encode('utf-8')
+        cuerpo = zlib.compress(
+            '\n'.join(json.dumps(t, ensure_ascii=False) for t in tareas).encode('utf-8')
+        )
+
+        registro = self._PREFIJO.pack(len(cabecera), len(cuerpo)) + cabecera + cuerpo
+        if self.filename is None:
+            offset = len(self._buffer)
+            self._buffer += registro
+        else:
+            with open(self.filename, 'ab') as f:
+                offset = f.tell()
+                f.write(registro)
+                f.flush()
+                os.fsync(f.fileno())
+
+        inicio_cuerpo = offset + self._PREFIJO.size + len(cabecera)
+        for tarea in tareas:
+            self._ubicaciones[tarea['id']] = (inicio_cuerpo, len(cuerpo))
+            self._roles[tarea['id']] = tarea['rol']
+
+    def __iter__(self):
+        """Recorre las tareas archivadas descomprimiendo un lote a la vez"""
+        lotes = sorted(set(self._ubicaciones.values()))
+        for offset, largo in lotes:
+            with self._abrir() as f:
+                f.seek(offset)
+                lineas = zlib.decompress(f.read(largo)).decode('utf-8').split('\n')
+            for linea in lineas:
+                yield json.loads(linea)
+
+    def obtener(self, task_id):
+        """Retorna el diccionario de una tarea archivada, o None si no está"""
+        ubicacion = self._ubicaciones.get(task_id)
+        if ubicacion is None:
+            return None
+
+        offset, largo = ubicacion
+        with self._abrir() as f:
+            f.seek(offset)
+            lineas = zlib.decompress(f.read(largo)).decode('utf-8').split('\n')
+
+        for linea in lineas:
+            tarea = json.loads(linea)
+            if tarea['id'] == task_id:
+                return tarea
+        return None
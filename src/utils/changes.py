@@ -0,0 +1,63 @@
+import copy
+import itertools
+import threading
+import time
+from collections import deque
+
+
+class HistorialExpirado(Exception):
+    """El número de secuencia pedido ya salió del buffer de cambios"""
+
+
+class FeedCambios:
+    """Buffer circular en memoria de eventos de cambio con número de secuencia global"""
+
+    def __init__(self, capacidad=1000):
+        self._eventos = deque(maxlen=capacidad)
+        self._seq = 0
+        self._condicion = threading.Condition()
+
+    @property
+    def ultimo_seq(self):
+        return self._seq
+
+    def registrar(self, tipo, datos):
+        """Agrega un evento al buffer y despierta a los clientes en espera"""
+        with self._condicion:
+            self._seq += 1
+            evento = {
+                "seq": self._seq,
+                "tipo": tipo,
+                # Copia para que mutaciones posteriores no alteren el evento
+                "datos": copy.deepcopy(datos),
+                "timestamp": time.time()
+            }
+            self._eventos.append(evento)
+            self._condicion.notify_all()
+            return evento
+
+    def desde(self, since):
+        """Retorna los eventos con número de secuencia mayor que since"""
+        with self._condicion:
+            if since > self._seq:
+                # El feed se reinició (por ejemplo, tras reiniciar el proceso)
+                raise HistorialExpirado(f"La secuencia {since} es posterior a la última ({self._seq})")
+            if since == self._seq:
+                return []
+
+            primero = self._eventos[0]["seq"] if self._eventos else self._seq + 1
+            if since < primero - 1:
+                raise HistorialExpirado(
+                    f"Los cambios posteriores a {since} ya no están disponibles (más antiguo: {primero})"
+                )
+
+            # Las secuencias son contiguas, así que el desplazamiento es directo
+            return list(itertools.islice(self._eventos, since - primero + 1, None))
+
+    def esperar(self, since, timeout):
+        """Espera hasta timeout segundos a que haya eventos posteriores a since (long-poll)"""
+        with self._condicion:
+            if since > self._seq:
+                return self.desde(since)
+            self._condicion.wait_for(lambda: self._seq > since, timeout)
+            return self.desde(since)
@@ -0,0 +1,58 @@
+import time
+from collections import OrderedDict
+
+
+class CacheIdempotencia:
+    """Cache LRU con expiración de las respuestas asociadas a cada Idempotency-Key"""
+
+    def __init__(self, capacidad=1000, ttl=24 * 60 * 60):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # clave -> {huella, status, cuerpo, creado}
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _expirada(self, entrada, ahora):
+        return ahora - entrada["creado"] > self.ttl
+
+    def obtener(self, clave, ahora=None):
+        """Retorna la respuesta guardada para la clave, o None si no existe o expiró"""
+        ahora = time.time() if ahora is None else ahora
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            return None
+        if self._expirada(entrada, ahora):
+            del self._entradas[clave]
+            return None
+        self._entradas.move_to_end(clave)
+        return entrada
+
+    def guardar(self, clave, huella, status, cuerpo, ahora=None):
+        """Guarda la respuesta de una solicitud, desalojando las expiradas y las menos usadas"""
+        ahora = time.time() if ahora is None else ahora
+        self._entradas[clave] = {
+            "huella": huella,
+            "status": status,
+            "cuerpo": cuerpo,
+            "creado": ahora
+        }
+        self._entradas.move_to_end(clave)
+
+        # Las más antiguas están al inicio: se eliminan mientras estén expiradas o sobre la capacidad
+        while self._entradas:
+            clave_antigua, entrada = next(iter(self._entradas.items()))
+            if len(self._entradas) <= self.capacidad and not self._expirada(entrada, ahora):
+                break
+            del self._entradas[clave_antigua]
+
+    def to_dict(self):
+        return [dict(entrada, clave=clave) for clave, entrada in self._entradas.items()]
+
+    @classmethod
+    def from_dict(cls, data, capacidad=1000, ttl=24 * 60 * 60):
+        cache = cls(capacidad, ttl)
+        for entrada in data:
+            entrada = dict(entrada)
+            cache._entradas[entrada.pop("clave")] = entrada
+        return cache
@@ -0,0 +1,137 @@
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+
+
+_PATRON_TOKEN = re.compile(r'\w+')
+
+
+def normalizar(texto):
+    """Pasa el texto a minúsculas y elimina tildes y diacríticos"""
+    descompuesto = unicodedata.normalize('NFKD', (texto or '').lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto):
+    """Divide el texto normalizado en términos"""
+    return _PATRON_TOKEN.findall(normalizar(texto))
+
+
+def _texto_del_campo(valor):
+    """Texto a indexar de un campo; la API acepta nombres y descripciones que no son texto"""
+    if valor is None or isinstance(valor, str):
+        return valor
+    return str(valor)
+
+
+class IndiceBusqueda:
+    """Índice invertido en memoria sobre el nombre y la descripción de las tareas"""
+
+    # Peso de cada campo al puntuar: una coincidencia en el nombre vale más
+    PESOS_CAMPOS = {'nombre': 2.0, 'descripcion': 1.0}
+    # Máximo de términos a los que se expande un prefijo
+    MAX_EXPANSIONES = 50
+
+    def __init__(self):
+        self._postings = {}  # término -> {task_id: peso}
+        self._terminos = []  # términos ordenados, para búsqueda por prefijo
+        self._total_documentos = 0
+
+    def to_dict(self):
+        """Serializa el índice como datos planos"""
+        return {'postings': self._postings, 'total_documentos': self._total_documentos}
+
+    @classmethod
+    def from_dict(cls, data):
+        indice = cls()
+        indice._postings = data['postings']
+        indice._terminos = sorted(indice._postings)
+        indice._total_documentos = data['total_documentos']
+        return indice
+
+    def agregar(self, tarea):
+        """Indexa una tarea"""
+        pesos = {}
+        for campo, peso_campo in self.PESOS_CAMPOS.items():
+            for termino in tokenizar(_texto_del_campo(getattr(tarea, campo))):
+                pesos[termino] = pesos.get(termino, 0.0) + peso_campo
+
+        for termino, peso in pesos.items():
+            postings = self._postings.get(termino)
+            if postings is None:
+                postings = self._postings[termino] = {}
+                bisect.insort(self._terminos, termino)
+            postings[tarea.id] = peso
+
+        self._total_documentos += 1
+
+    def remover(self, tarea):
+        """Quita una tarea del índice"""
+        terminos = set()
+        for campo in self.PESOS_CAMPOS:
+            terminos.update(tokenizar(_texto_del_campo(getattr(tarea, campo))))
+
+        for termino in terminos:
+            postings = self._postings.get(termino)
+            if postings is None or postings.pop(tarea.id, None) is None:
+                continue
+            if not postings:
+                del self._postings[termino]
+                del self._terminos[bisect.bisect_left(self._terminos, termino)]
+
+        self._total_documentos -= 1
+
+    def _expandir(self, termino, prefijo):
+        """Retorna los términos indexados que coinciden con el término de la consulta"""
+        if not prefijo:
+            return [termino] if termino in self._postings else []
+
+        inicio = bisect.bisect_left(self._terminos, termino)
+        expansiones = []
+        for i in range(inicio, len(self._terminos)):
+            candidato = self._terminos[i]
+            if not candidato.startswith(termino) or len(expansiones) >= self.MAX_EXPANSIONES:
+                break
+            expansiones.append(candidato)
+        return expansiones
+
+    def _puntajes_termino(self, termino, prefijo):
+        """Calcula el puntaje tf-idf de cada tarea para un término de la consulta"""
+        puntajes = {}
+        for expansion in self._expandir(termino, prefijo):
+            postings = self._postings[expansion]
+            idf = math.log(1 + self._total_documentos / len(postings))
+            for task_id, peso in postings.items():
+                puntaje = peso * idf
+                if puntaje > puntajes.get(task_id, 0.0):
+                    puntajes[task_id] = puntaje
+        return puntajes
+
+    def buscar(self, consulta, limite=20, prefijo=True):
+        """
+        Busca tareas que contengan todos los términos de la consulta.
+        Retorna una lista de (task_id, puntaje) ordenada por relevancia.
+        """
+        terminos = tokenizar(consulta)
+        if not terminos:
+            return []
+
+        resultado = None
+        for termino in terminos:
+            puntajes = self._puntajes_termino(termino, prefijo)
+            if resultado is None:
+                resultado = puntajes
+            else:
+                # Se recorre el conjunto más pequeño para intersectar
+                menor, mayor = sorted((resultado, puntajes), key=len)
+                resultado = {
+                    task_id: puntaje + mayor[task_id]
+                    for task_id, puntaje in menor.items()
+                    if task_id in mayor
+                }
+            if not resultado:
+                return []
+
+        return heapq.nlargest(limite, resultado.items(), key=lambda item: (item[1], -item[0]))
@@ -0,0 +1,50 @@
+import hashlib
+import marshal
+import struct
+
+from utils.storage import escribir_atomico
+
+
+# Cabecera: marca, versión del formato, firma de los datos y checksum del contenido.
+# El contenido se serializa con marshal y solo admite datos planos (dict, list, set,
+# números y textos): a diferencia de pickle, cargar el archivo no ejecuta código
+_MARCA = b'TSKIDX'
+_CABECERA = struct.Struct('>6sH32s32s')
+
+
+def guardar_sidecar(filename, version, firma, estado):
+    """
+    Escribe los índices derivados, como datos planos, en un archivo auxiliar. La
+    firma identifica los datos a partir de los cuales se construyeron; se escribe
+    de forma atómica para no dejar nunca un archivo a medias.
+    """
+    contenido = marshal.dumps(estado)
+    checksum = hashlib.sha256(contenido).digest()
+    escribir_atomico(filename, _CABECERA.pack(_MARCA, version, firma, checksum) + contenido)
+
+
+def cargar_sidecar(filename, version, firma):
+    """
+    Retorna los índices guardados si el archivo existe, es de la misma versión,
+    corresponde a la firma de los datos actuales y su checksum es correcto;
+    en cualquier otro caso retorna None para que se reconstruyan
+    """
+    try:
+        with open(filename, 'rb') as f:
+            cabecera = f.read(_CABECERA.size)
+            if len(cabecera) < _CABECERA.size:
+                return None
+            marca, version_archivo, firma_archivo, checksum = _CABECERA.unpack(cabecera)
+            if marca != _MARCA or version_archivo != version or firma_archivo != firma:
+                return None
+            contenido = f.read()
+    except FileNotFoundError:
+        return None
+
+    if hashlib.sha256(contenido).digest() != checksum:
+        return None
+    try:
+        estado = marshal.loads(contenido)
+    except (EOFError, ValueError, TypeError):
+        return None
+    return estado if isinstance(estado, dict) else None
@@ -0,0 +1,243 @@
+import gzip
+import json
+import os
+import stat
+import struct
+import tempfile
+import zlib
+
+
+# os.umask solo se puede leer cambiándolo, y el cambio afecta a todos los hilos:
+# se lee una vez al importar el módulo
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _modo_destino(filename):
+    """Permisos del archivo existente, o los de un archivo nuevo creado con open()"""
+    try:
+        return stat.S_IMODE(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def escribir_atomico(filename, contenido):
+    """
+    Escribe el archivo completo o no lo modifica: el contenido va a un temporal en
+    el mismo directorio, se sincroniza a disco y reemplaza al original con
+    os.replace. Una interrupción a mitad de escritura deja intacta la versión anterior.
+    El temporal toma los permisos del archivo que reemplaza (mkstemp lo crea con 0600)
+    """
+    directorio = os.path.dirname(os.path.abspath(filename))
+    descriptor, temporal = tempfile.mkstemp(
+        dir=directorio, prefix=os.path.basename(filename) + '.', suffix='.tmp'
+    )
+    try:
+        os.fchmod(descriptor, _modo_destino(filename))
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(contenido)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, filename)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except FileNotFoundError:
+            pass
+        raise
+
+    # Sincronizar el directorio para que el reemplazo también sea durable
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+class AlmacenamientoArchivo:
+    """Persiste los datos del DataHandler en un archivo JSON"""
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def leer(self):
+        """Retorna el contenido guardado en bytes, o None si todavía no existe"""
+        try:
+            with open(self.filename, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def decodificar(self, raw):
+        """Convierte el contenido leído en el diccionario de datos"""
+        return json.loads(raw)
+
+    def codificar(self, data):
+        return json.dumps(data, indent=2).encode('utf-8')
+
+    def escribir(self, data):
+        escribir_atomico(self.filename, self.codificar(data))
+
+
+# Formato binario: cabecera con marca, versión y compresión, seguida de un
+# registro por cada clave de los datos: nombre (2 bytes de longitud) y valor
+# en JSON compacto (4 bytes de longitud). Los registros se comprimen juntos.
+_MARCA_DATOS = b'TSKDAT'
+_CABECERA_DATOS = struct.Struct('>6sHB')
+_LARGO_CLAVE = struct.Struct('>H')
+_LARGO_VALOR = struct.Struct('>I')
+VERSION_FORMATO = 1
+COMPRESIONES = {'ninguna': 0, 'zlib': 1, 'gzip': 2}
+
+
+def es_binario(raw):
+    """Indica si el contenido está en el formato binario"""
+    return raw is not None and raw[:len(_MARCA_DATOS)] == _MARCA_DATOS
+
+
+def codificar_binario(data, compresion='zlib'):
+    """Serializa el diccionario de datos en el formato binario"""
+    if compresion not in COMPRESIONES:
+        raise ValueError(f"Compresión '{compresion}' no es válida")
+
+    partes = []
+    for clave, valor in data.items():
+        nombre = clave.encode('utf-8')
+        contenido = json.dumps(valor, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        partes.append(_LARGO_CLAVE.pack(len(nombre)))
+        partes.append(nombre)
+        partes.append(_LARGO_VALOR.pack(len(contenido)))
+        partes.append(contenido)
+    cuerpo = b''.join(partes)
+
+    if compresion == 'zlib':
+        cuerpo = zlib.compress(cuerpo, 6)
+    elif compresion == 'gzip':
+        cuerpo = gzip.compress(cuerpo, 6, mtime=0)
+    return _CABECERA_DATOS.pack(_MARCA_DATOS, VERSION_FORMATO, COMPRESIONES[compresion]) + cuerpo
+
+
+def decodificar_binario(raw):
+    """Lee el formato binario; la compresión se toma de la cabecera"""
+    if len(raw) < _CABECERA_DATOS.size or not es_binario(raw):
+        raise ValueError("El contenido no está en el formato binario de datos")
+    _, version, codigo = _CABECERA_DATOS.unpack_from(raw)
+    if version != VERSION_FORMATO:
+        raise ValueError(f"Versión de formato {version} no soportada")
+
+    cuerpo = memoryview(raw)[_CABECERA_DATOS.size:]
+    if codigo == COMPRESIONES['zlib']:
+        cuerpo = zlib.decompress(cuerpo)
+    elif codigo == COMPRESIONES['gzip']:
+        cuerpo = gzip.decompress(cuerpo)
+    elif codigo != COMPRESIONES['ninguna']:
+        raise ValueError(f"Compresión {codigo} no soportada")
+
+    data = {}
+    offset = 0
+    try:
+        while offset < len(cuerpo):
+            (largo,) = _LARGO_CLAVE.unpack_from(cuerpo, offset)
+            offset += _LARGO_CLAVE.size
+            clave = bytes(cuerpo[offset:offset + largo]).decode('utf-8')
+            offset += largo
+            (largo,) = _LARGO_VALOR.unpack_from(cuerpo, offset)
+            offset += _LARGO_VALOR.size
+            if offset + largo > len(cuerpo):
+                raise ValueError("Registro incompleto")
+            data[clave] = json.loads(bytes(cuerpo[offset:offset + largo]))
+            offset += largo
+    except struct.error:
+        raise ValueError("Registro incompleto")
+    return data
+
+
+class AlmacenamientoBinario(AlmacenamientoArchivo):
+    """Persiste los datos en el formato binario, opcionalmente comprimido"""
+
+    def __init__(self, filename, compresion='zlib'):
+        if compresion not in COMPRESIONES:
+            raise ValueError(f"Compresión '{compresion}' no es válida")
+        super().__init__(filename)
+        self.compresion = compresion
+
+    def decodificar(self, raw):
+        # Un archivo que todavía está en JSON se lee igual y pasa a binario al guardar
+        if es_binario(raw):
+            return decodificar_binario(raw)
+        try:
+            return super().decodificar(raw)
+        except ValueError:
+            raise ValueError(f"El archivo '{self.filename}' no está en JSON ni en el formato binario")
+
+    def codificar(self, data):
+        return codificar_binario(data, self.compresion)
+
+
+def abrir_almacenamiento(filename, formato=None):
+    """
+    Retorna el almacenamiento para un archivo de datos. Sin formato se detecta
+    por el contenido; un archivo que todavía no existe se crea en JSON
+    """
+    if formato is None:
+        try:
+            with open(filename, 'rb') as f:
+                formato = 'binary' if es_binario(f.read(len(_MARCA_DATOS))) else 'json'
+        except FileNotFoundError:
+            formato = 'json'
+    if formato == 'binary':
+        return AlmacenamientoBinario(filename)
+    if formato == 'json':
+        return AlmacenamientoArchivo(filename)
+    raise ValueError(f"Formato '{formato}' no es válido")
+
+
+def convertir(origen, destino, formato='binary', compresion='zlib'):
+    """Convierte un archivo de datos entre JSON y el formato binario"""
+    entrada = abrir_almacenamiento(origen)
+    raw = entrada.leer()
+    if raw is None:
+        raise ValueError(f"No existe el archivo '{origen}'")
+    data = entrada.decodificar(raw)
+
+    if formato == 'binary':
+        salida = AlmacenamientoBinario(destino, compresion)
+    else:
+        salida = abrir_almacenamiento(destino, formato)
+    salida.escribir(data)
+    return data
+
+
+class AlmacenamientoMemoria:
+    """
+    Mantiene los datos en memoria, sin tocar el disco. Guarda el JSON serializado
+    para que cada carga parta de una copia independiente, igual que con un archivo.
+    Pensado para pruebas y ejecuciones efímeras: los datos se pierden con el proceso.
+    """
+
+    filename = None
+
+    def __init__(self, contenido=None):
+        self._contenido = contenido
+        # Contenido del almacén frío, compartido por los DataHandler que usen este almacenamiento
+        self.archivo_frio = bytearray()
+
+    def leer(self):
+        return self._contenido
+
+    def decodificar(self, raw):
+        return json.loads(raw)
+
+    def escribir(self, data):
+        self._contenido = json.dumps(data).encode('utf-8')
+
+    def copia(self):
+        """Retorna otro almacenamiento en memoria con el mismo contenido"""
+        copia = AlmacenamientoMemoria(self._contenido)
+        copia.archivo_frio = bytearray(self.archivo_frio)
+        return copia
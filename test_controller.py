@@ -0,0 +1,1002 @@
+import gzip
+import json
+import pytest
+import sys
+import os
+import threading
+import time
+import zlib
+
+# Agregar el directorio src al path para importar los módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import controller
+import serve
+from data_handler import DataHandler
+from utils.changes import FeedCambios
+from utils.idempotency import CacheIdempotencia
+from utils.admission import ColaSaturada, ControlAdmision
+
+
+@pytest.fixture
+def handler(memory_storage):
+    """DataHandler en memoria con un usuario"""
+    data_handler = DataHandler(storage=memory_storage)
+    data_handler.create_user("dev1", "Juan Pérez")
+    return data_handler
+
+
+@pytest.fixture
+def app(handler):
+    """Aplicación creada con la fábrica sobre el DataHandler de prueba"""
+    return controller.create_app({"DATA_HANDLER": handler})
+
+
+@pytest.fixture
+def client(app):
+    """Cliente de pruebas de Flask"""
+    return app.test_client()
+
+
+class TestIdempotencia:
+
+    def test_reintento_repite_respuesta(self, client, handler):
+        """Caso de éxito: Un reintento con la misma Idempotency-Key no crea otra tarea
+
+        Caso de prueba: CP-IDE-001
+        Descripción: Verificar que el segundo POST /tasks repite la respuesta guardada
+        Entrada: dos POST /tasks idénticos con Idempotency-Key "abc"
+        Resultado esperado: Mismo task_id, una sola tarea y la respuesta sobrevive a un reinicio
+        """
+        # Arrange
+        body = {"nombre": "Login", "descripcion": "Formulario", "usuario": "dev1", "rol": "programador"}
+        headers = {"Idempotency-Key": "abc"}
+
+        # Act
+        primera = client.post('/tasks', json=body, headers=headers)
+        segunda = client.post('/tasks', json=body, headers=headers)
+
+        # Assert
+        assert primera.status_code == segunda.status_code == 201
+        assert primera.get_json() == segunda.get_json()
+        assert segunda.headers["Idempotent-Replayed"] == "true"
+        assert len(handler.tasks) == 1
+
+        recargado = DataHandler(storage=handler.storage)
+        assert recargado.idempotency.obtener("abc")["status"] == 201
+
+    def test_clave_reusada_con_otro_cuerpo(self, client, handler):
+        """Caso de error: Reusar una Idempotency-Key con otra solicitud
+
+        Caso de prueba: CP-IDE-002
+        Descripción: Verificar que la huella de la solicitud se compara al repetir
+        Entrada: POST /usuarios con la misma clave y distinto cuerpo
+        Resultado esperado: 422 y el segundo usuario no se crea
+        """
+        # Arrange
+        headers = {"Idempotency-Key": "xyz"}
+        client.post('/usuarios', json={"contacto": "dev2", "nombre": "María"}, headers=headers)
+
+        # Act
+        respuesta = client.post('/usuarios', json={"contacto": "dev3", "nombre": "Ana"}, headers=headers)
+
+        # Assert
+        assert respuesta.status_code == 422
+        assert handler.get_user_by_alias("dev3") is None
+
+    def test_cache_lru_con_expiracion(self):
+        """Caso de éxito: La cache desaloja por capacidad y por antigüedad
+
+        Caso de prueba: CP-IDE-003
+        Descripción: Verificar el desalojo LRU y el TTL de CacheIdempotencia
+        Entrada: capacidad 2, ttl 10 segundos
+        Resultado esperado: Se desaloja la menos usada y las expiradas no se retornan
+        """
+        # Arrange
+        cache = CacheIdempotencia(capacidad=2, ttl=10)
+        cache.guardar("a", "h", 201, "{}", ahora=0)
+        cache.guardar("b", "h", 201, "{}", ahora=1)
+
+        # Act
+        cache.obtener("a", ahora=2)
+        cache.guardar("c", "h", 201, "{}", ahora=3)
+
+        # Assert
+        assert cache.obtener("b", ahora=3) is None
+        assert cache.obtener("a", ahora=4) is not None
+        assert cache.obtener("c", ahora=20) is None
+
+
+class TestControlAdmision:
+
+    def test_cola_saturada_rechaza(self):
+        """Caso de error: Sin lugar en la cola la escritura se rechaza de inmediato
+
+        Caso de prueba: CP-ADM-001
+        Descripción: Verificar que ControlAdmision rechaza cuando la concurrencia y la cola están llenas
+        Entrada: concurrencia 1, profundidad de cola 0 y una escritura activa
+        Resultado esperado: ColaSaturada con retry_after >= 1 y el rechazo contabilizado
+        """
+        # Arrange
+        admision = ControlAdmision(concurrencia=1, profundidad_cola=0)
+
+        # Act & Assert
+        with admision.admitir():
+            with pytest.raises(ColaSaturada) as error:
+                with admision.admitir():
+                    pass
+            assert error.value.retry_after >= 1
+            assert admision.metricas()["activas"] == 1
+
+        metricas = admision.metricas()
+        assert metricas["admitidas"] == 1
+        assert metricas["rechazadas"] == 1
+        assert metricas["activas"] == 0
+
+    def test_escritura_saturada_responde_503(self, handler):
+        """Caso de error: Una escritura con la cola saturada responde 503 con Retry-After
+
+        Caso de prueba: CP-ADM-002
+        Descripción: Verificar la respuesta HTTP del decorador de escrituras
+        Entrada: POST /usuarios mientras otra escritura ocupa el único turno
+        Resultado esperado: 503, header Retry-After y el usuario no se crea
+        """
+        # Arrange
+        app = controller.create_app({"DATA_HANDLER": handler, "WRITE_QUEUE_DEPTH": 0})
+        client = app.test_client()
+        admision = app.extensions['task_system'].write_admission
+
+        # Act
+        with admision.admitir():
+            respuesta = client.post('/usuarios', json={"contacto": "dev2", "nombre": "María"})
+
+        # Assert
+        assert respuesta.status_code == 503
+        assert int(respuesta.headers["Retry-After"]) >= 1
+        assert handler.get_user_by_alias("dev2") is None
+        assert client.get('/metrics/writes').get_json()["rechazadas"] == 1
+
+
+class TestFabricaAplicacion:
+
+    def test_carga_diferida_de_datos(self, tmp_path):
+        """Caso de éxito: Crear la aplicación no lee el archivo de datos
+
+        Caso de prueba: CP-APP-001
+        Descripción: Verificar que el DataHandler se crea en la primera solicitud y sobre el archivo configurado
+        Entrada: create_app con DATA_FILE temporal
+        Resultado esperado: Sin cargar tras create_app; cargado y usando ese archivo tras una solicitud
+        """
+        # Arrange
+        filename = str(tmp_path / "otra.json")
+        app = controller.create_app({"DATA_FILE": filename})
+        servicios = app.extensions['task_system']
+
+        # Act & Assert
+        assert not servicios.loaded
+        respuesta = app.test_client().post('/usuarios', json={"contacto": "dev9", "nombre": "Ana"})
+        assert respuesta.status_code == 201
+        assert servicios.loaded
+        assert servicios.data_handler.filename == filename
+        assert os.path.exists(filename)
+
+    def test_precarga(self, tmp_path):
+        """Caso de éxito: Con PRELOAD los datos se cargan al crear la aplicación
+
+        Caso de prueba: CP-APP-002
+        Descripción: Verificar la carga anticipada para servidores que crean workers después
+        Entrada: create_app con PRELOAD=True
+        Resultado esperado: DataHandler cargado sin ninguna solicitud
+        """
+        # Act
+        app = controller.create_app({"DATA_FILE": str(tmp_path / "data.json"), "PRELOAD": True})
+
+        # Assert
+        assert app.extensions['task_system'].loaded
+
+    def test_almacenamiento_en_memoria(self, tmp_path, monkeypatch):
+        """Caso de éxito: Con STORAGE='memory' la aplicación no escribe archivos
+
+        Caso de prueba: CP-APP-003
+        Descripción: Verificar la configuración para ejecuciones efímeras
+        Entrada: create_app con STORAGE='memory' y un POST /usuarios
+        Resultado esperado: 201, el usuario existe y no se crea ningún archivo
+        """
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        app = controller.create_app({"STORAGE": "memory"})
+        client = app.test_client()
+
+        # Act
+        respuesta = client.post('/usuarios', json={"contacto": "dev9", "nombre": "Ana"})
+
+        # Assert
+        assert respuesta.status_code == 201
+        assert client.get('/usuarios/mialias=dev9').status_code == 200
+        assert list(tmp_path.iterdir()) == []
+
+    def test_almacenamiento_binario_sobre_archivo_json(self, tmp_path):
+        """Caso de éxito: STORAGE='binary' lee un archivo JSON existente y lo migra al guardar
+
+        Caso de prueba: CP-APP-004
+        Descripción: Verificar que cambiar a STORAGE='binary' no rompe un archivo de datos en JSON
+        Entrada: data.json con el usuario dev1, create_app con STORAGE='binary' y un POST /usuarios
+        Resultado esperado: 200 al consultar dev1, 201 al crear dev2 y el archivo queda en binario
+        """
+        # Arrange
+        filename = str(tmp_path / "data.json")
+        DataHandler(filename).create_user("dev1", "Juan Pérez")
+        app = controller.create_app({"DATA_FILE": filename, "STORAGE": "binary"})
+        client = app.test_client()
+
+        # Act
+        consulta = client.get('/usuarios/mialias=dev1')
+        creacion = client.post('/usuarios', json={"contacto": "dev2", "nombre": "Ana"})
+
+        # Assert
+        assert consulta.status_code == 200
+        assert creacion.status_code == 201
+        with open(filename, "rb") as f:
+            assert f.read(6) == b"TSKDAT"
+        assert [user.alias for user in DataHandler(filename).users] == ["dev1", "dev2"]
+
+        with open(filename, "wb") as f:
+            f.write(b"no es json")
+        with pytest.raises(ValueError, match="ni en el formato binario"):
+            controller.create_app({"DATA_FILE": filename, "STORAGE": "binary", "PRELOAD": True})
+
+
+class TestProyeccionYCompresion:
+
+    def test_proyeccion_de_campos(self, client, handler):
+        """Caso de éxito: ?fields= limita los campos de cada elemento listado
+
+        Caso de prueba: CP-PRY-001
+        Descripción: Verificar la proyección en GET /tasks, GET /usuarios y GET /usuarios/mialias
+        Entrada: fields=id,estado,dependencias; fields=alias; fields=id; y un campo inexistente
+        Resultado esperado: Solo los campos pedidos y 422 para el campo inexistente
+        """
+        # Arrange
+        task = handler.create_task("Login", "Formulario", "dev1", "programador")
+
+        # Act
+        tareas = client.get('/tasks?fields=id,estado,dependencias').get_json()["tareas"]
+        usuarios = client.get('/usuarios?fields=alias').get_json()["usuarios"]
+        usuario = client.get('/usuarios/mialias=dev1?fields=id').get_json()
+        invalida = client.get('/tasks?fields=id,clave')
+
+        # Assert
+        assert tareas == [{"id": task.id, "estado": "nueva", "dependencias": []}]
+        assert usuarios == [{"alias": "dev1"}]
+        assert usuario["tareas"] == [{"id": task.id}]
+        assert invalida.status_code == 422
+        assert "clave" in invalida.get_json()["error"]
+
+    def test_compresion_con_umbral(self, handler):
+        """Caso de éxito: Las respuestas grandes se comprimen según Accept-Encoding
+
+        Caso de prueba: CP-PRY-002
+        Descripción: Verificar gzip, deflate y el umbral de tamaño del after_request
+        Entrada: COMPRESS_MIN_SIZE 200, listado de 20 tareas y un GET /dummy pequeño
+        Resultado esperado: Listado comprimido y decodificable; /dummy y clientes sin gzip sin comprimir
+        """
+        # Arrange
+        for i in range(20):
+            handler.create_task(f"Tarea {i}", "Descripción larga de la tarea", "dev1", "programador")
+        client = controller.create_app({"DATA_HANDLER": handler, "COMPRESS_MIN_SIZE": 200}).test_client()
+
+        # Act
+        con_gzip = client.get('/tasks', headers={"Accept-Encoding": "gzip"})
+        con_deflate = client.get('/tasks', headers={"Accept-Encoding": "deflate"})
+        sin_compresion = client.get('/tasks')
+        pequena = client.get('/dummy', headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        assert con_gzip.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(con_gzip.data) == sin_compresion.data
+        assert con_deflate.headers["Content-Encoding"] == "deflate"
+        assert zlib.decompress(con_deflate.data) == sin_compresion.data
+        assert "Content-Encoding" not in sin_compresion.headers
+        assert "Content-Encoding" not in pequena.headers
+        assert "Accept-Encoding" in con_gzip.headers["Vary"]
+
+
+class TestServidor:
+
+    def test_opciones_de_gunicorn(self):
+        """Caso de éxito: Los argumentos se traducen a la configuración de gunicorn
+
+        Caso de prueba: CP-SRV-001
+        Descripción: Verificar workers, hilos, keep-alive y recarga ordenada del servidor de producción
+        Entrada: --threads 16 --keep-alive 10 --max-requests 1000; y --workers 2
+        Resultado esperado: Worker gthread con los valores indicados y jitter del 10%; más de un worker se rechaza
+        """
+        # Act
+        opciones = serve.construir_opciones(serve.argparse.Namespace(
+            bind="0.0.0.0:9000", workers=1, threads=16, keep_alive=10, timeout=30,
+            graceful_timeout=20, max_requests=1000, preload=False
+        ))
+
+        # Assert
+        assert opciones["worker_class"] == "gthread"
+        assert (opciones["workers"], opciones["threads"], opciones["keepalive"]) == (1, 16, 10)
+        assert opciones["graceful_timeout"] == 20
+        assert opciones["max_requests_jitter"] == 100
+        with pytest.raises(SystemExit):
+            serve.main(["--workers", "2"])
+
+    def test_limite_de_clientes_del_feed(self, monkeypatch):
+        """Caso de éxito: serve.py deja hilos libres para la API aunque haya clientes del feed
+
+        Caso de prueba: CP-SRV-004
+        Descripción: Verificar el valor por defecto y la validación de --feed-clients
+        Entrada: --threads 8; --threads 2 --feed-clients 1; y --threads 2 --feed-clients 2
+        Resultado esperado: FEED_MAX_CLIENTS 4 y 1; igualar los hilos se rechaza
+        """
+        # Arrange
+        configuraciones = []
+
+        class Servidor:
+            def __init__(self, opciones, config_app):
+                configuraciones.append(config_app)
+
+            def run(self):
+                pass
+
+        monkeypatch.setattr(serve, "ServidorProduccion", Servidor)
+
+        # Act
+        serve.main(["--threads", "8"])
+        serve.main(["--threads", "2", "--feed-clients", "1"])
+
+        # Assert
+        assert [c["FEED_MAX_CLIENTS"] for c in configuraciones] == [4, 1]
+        with pytest.raises(SystemExit):
+            serve.main(["--threads", "2", "--feed-clients", "2"])
+
+    def test_salida_del_worker_guarda_pendientes(self, app, handler):
+        """Caso de éxito: Al terminar un worker se guardan los cambios de un lote pendiente
+
+        Caso de prueba: CP-SRV-002
+        Descripción: Verificar que el hook worker_exit cierra el DataHandler del worker
+        Entrada: usuario creado dentro de un lote sin cerrar y worker_exit
+        Resultado esperado: El usuario queda persistido
+        """
+        # Arrange
+        class Worker:
+            pid = 1
+            wsgi = app
+        handler._batch_depth += 1
+        handler.create_user("dev2", "María")
+        handler._batch_depth -= 1
+
+        # Act
+        serve.worker_exit(None, Worker())
+
+        # Assert
+        assert DataHandler(storage=handler.storage).get_user_by_alias("dev2") is not None
+
+    def test_recarga_espera_al_worker_anterior(self, tmp_path):
+        """Caso de éxito: En una recarga el worker nuevo carga los datos después de que el anterior guardó
+
+        Caso de prueba: CP-SRV-003
+        Descripción: Verificar el bloqueo del archivo de datos entre post_worker_init y worker_exit
+        Entrada: worker anterior con un usuario sin guardar; worker nuevo iniciado antes de que el anterior salga
+        Resultado esperado: El nuevo espera y, al salir el anterior, carga el usuario
+        """
+        # Arrange
+        filename = str(tmp_path / "data.json")
+
+        class Worker:
+            pid = 1
+
+            def __init__(self):
+                self.wsgi = controller.create_app({"DATA_FILE": filename})
+
+            def notify(self):
+                pass
+
+        anterior, nuevo = Worker(), Worker()
+        serve.post_worker_init(anterior)
+        datos = anterior.wsgi.extensions['task_system'].data_handler
+        with datos.batch():
+            datos.create_user("dev2", "María")
+
+            # Act
+            hilo = threading.Thread(target=serve.post_worker_init, args=(nuevo,))
+            hilo.start()
+            hilo.join(0.3)
+            assert hilo.is_alive()
+            assert not nuevo.wsgi.extensions['task_system'].loaded
+            serve.worker_exit(None, anterior)
+        hilo.join(5)
+
+        # Assert
+        assert not hilo.is_alive()
+        assert nuevo.wsgi.extensions['task_system'].data_handler.get_user_by_alias("dev2") is not None
+        serve.worker_exit(None, nuevo)
+
+
+class TestCambiosDeEstadoEnLote:
+
+    def test_endpoint_de_lote(self, client, handler):
+        """Caso de éxito: POST /tasks/state/batch reporta el resultado de cada cambio
+
+        Caso de prueba: CP-LOT-002
+        Descripción: Verificar la respuesta del endpoint con un cambio válido y otro inválido
+        Entrada: tarea 1 a 'en_progreso' y tarea inexistente 99; luego un cuerpo sin 'cambios'
+        Resultado esperado: 200 con aplicados 1 y fallidos 1; 400 sin 'cambios'
+        """
+        # Arrange
+        task = handler.create_task("Login", "Formulario", "dev1", "programador")
+
+        # Act
+        respuesta = client.post('/tasks/state/batch', json={"cambios": [
+            {"id": task.id, "estado": "en_progreso"},
+            {"id": 99, "estado": "en_progreso"}
+        ]})
+        invalida = client.post('/tasks/state/batch', json={"estado": "finalizada"})
+
+        # Assert
+        data = respuesta.get_json()
+        assert respuesta.status_code == 200
+        assert (data["aplicados"], data["fallidos"]) == (1, 1)
+        assert data["resultados"][0] == {"id": task.id, "ok": True, "estado": "en_progreso"}
+        assert data["resultados"][1]["error"] == "Tarea con ID 99 no existe"
+        assert invalida.status_code == 400
+
+
+class TestBusquedaRutas:
+
+    def test_nombre_no_textual_no_deja_tarea_a_medias(self, client, handler):
+        """Caso de éxito: Un nombre que no es texto se guarda sin cambios, se indexa y no repite IDs
+
+        Caso de prueba: CP-BUS-004
+        Descripción: Verificar que create_task valida la tarea y reserva el ID antes de indexarla
+        Entrada: tres POST /tasks, con nombre 123, con nombre {"a": 1} y con nombre "Login"
+        Resultado esperado: 201 en todos, IDs 1 a 3, nombres guardados tal cual y la tarea 1 encontrable por "123"
+        """
+        # Act
+        primera = client.post('/tasks', json={"nombre": 123, "descripcion": "Numérica", "usuario": "dev1", "rol": "programador"})
+        objeto = client.post('/tasks', json={"nombre": {"a": 1}, "descripcion": "Objeto", "usuario": "dev1", "rol": "programador"})
+        tercera = client.post('/tasks', json={"nombre": "Login", "descripcion": "Formulario", "usuario": "dev1", "rol": "programador"})
+
+        # Assert
+        assert primera.status_code == objeto.status_code == tercera.status_code == 201
+        tareas = client.get('/tasks').get_json()["tareas"]
+        assert [t["id"] for t in tareas] == [1, 2, 3]
+        assert [t["nombre"] for t in tareas] == [123, {"a": 1}, "Login"]
+        assert [t.id for t, _ in handler.search_tasks("123")] == [1]
+        handler.update_task_state(1, "en_progreso")
+        handler.update_task_state(1, "finalizada")
+        handler.archive_finalized(0)
+        assert handler.search_tasks("123") == []
+
+    def test_alias_no_textual_responde_422(self, client, handler):
+        """Caso de error: Un alias que llega como lista u objeto JSON se rechaza con 422
+
+        Caso de prueba: CP-BUS-006
+        Descripción: Verificar que las búsquedas por alias no fallan con valores no hashables
+        Entrada: "usuario" o "contacto" como lista u objeto en POST /tasks, /usuarios, /tasks/{id}/users y /transactions
+        Resultado esperado: 422 en todos los casos y ningún cambio en los datos
+        """
+        # Arrange
+        task = handler.create_task("Login", "Formulario", "dev1", "programador")
+        antes = handler.snapshot()
+
+        # Act
+        respuestas = [
+            client.post('/tasks', json={"nombre": "A", "descripcion": "D", "usuario": ["dev1"], "rol": "programador"}),
+            client.post('/usuarios', json={"contacto": ["dev9"], "nombre": "Ana"}),
+            client.post(f'/tasks/{task.id}/users', json={"usuario": {"a": 1}, "rol": "pruebas", "accion": "adicionar"}),
+            client.post(f'/tasks/{task.id}/users', json={"usuario": ["dev1"], "accion": "remover"}),
+            client.post('/transactions', json={"operaciones": [
+                {"op": "assign_user", "id": task.id, "usuario": ["dev1"], "rol": "pruebas"}
+            ]})
+        ]
+
+        # Assert
+        assert [r.status_code for r in respuestas] == [422] * 5
+        assert handler.snapshot() == antes
+
+    def test_busqueda_por_ruta(self, client, handler):
+        """Caso de éxito: GET /tasks/search busca sin distinguir tildes y valida sus parámetros
+
+        Caso de prueba: CP-BUS-005
+        Descripción: Verificar la respuesta y los errores de GET /tasks/search
+        Entrada: tareas "Migración de datos" y "Migrar servidor"; q=migracion, q=migr con limit=1 y prefijo=false, y parámetros inválidos
+        Resultado esperado: 200 con resultados y puntaje; 400 sin q; 422 con limit no numérico o cero
+        """
+        # Arrange
+        migracion = handler.create_task("Migración de datos", "Copiar tablas", "dev1", "infra")
+        handler.create_task("Migrar servidor", "Nuevo hosting", "dev1", "infra")
+
+        # Act
+        exacta = client.get('/tasks/search?q=migracion')
+        limitada = client.get('/tasks/search?q=migr&limit=1')
+        sin_prefijo = client.get('/tasks/search?q=migr&prefijo=false')
+        errores = [client.get(f'/tasks/search?{consulta}') for consulta in ["q=", "q=migr&limit=x", "q=migr&limit=0"]]
+
+        # Assert
+        data = exacta.get_json()
+        assert exacta.status_code == 200
+        assert data["total"] == 1
+        assert data["resultados"][0]["tarea"]["id"] == migracion.id
+        assert data["resultados"][0]["puntaje"] > 0
+        assert limitada.get_json()["total"] == 1
+        assert sin_prefijo.get_json() == {"resultados": [], "total": 0}
+        assert [r.status_code for r in errores] == [400, 422, 422]
+
+
+class TestCambiosRutas:
+
+    def test_long_poll_espera_y_despierta(self, client, handler):
+        """Caso de éxito: GET /changes con timeout espera un cambio o responde vacío al vencer
+
+        Caso de prueba: CP-CAM-003
+        Descripción: Verificar el long-poll de GET /changes con y sin cambios durante la espera
+        Entrada: timeout=0.05 sin cambios; luego timeout=5 con una tarea creada desde otro hilo
+        Resultado esperado: 200 vacío tras el timeout; 200 con el evento tarea_creada antes de vencer
+        """
+        # Arrange
+        since = handler.changes.ultimo_seq
+        escritor = threading.Timer(0.05, handler.create_task, ("Login", "Formulario", "dev1", "programador"))
+
+        # Act
+        inicio = time.perf_counter()
+        vacia = client.get(f'/changes?since={since}&timeout=0.05')
+        espera_vacia = time.perf_counter() - inicio
+
+        escritor.start()
+        inicio = time.perf_counter()
+        con_cambio = client.get(f'/changes?since={since}&timeout=5')
+        espera_con_cambio = time.perf_counter() - inicio
+        escritor.join()
+
+        # Assert
+        assert vacia.status_code == 200
+        assert vacia.get_json() == {"cambios": [], "ultimo_seq": since}
+        assert espera_vacia >= 0.05
+        data = con_cambio.get_json()
+        assert con_cambio.status_code == 200
+        assert [c["tipo"] for c in data["cambios"]] == ["tarea_creada"]
+        assert data["ultimo_seq"] == since + 1
+        assert espera_con_cambio < 5
+
+    def test_historial_expirado_y_since_invalido(self, client, handler):
+        """Caso de error: GET /changes responde 410 si el historial expiró y 422 si since no es válido
+
+        Caso de prueba: CP-CAM-004
+        Descripción: Verificar los errores de GET /changes
+        Entrada: feed de capacidad 2 con 3 eventos y since=0; since posterior al último; since=abc, -1 y timeout=x
+        Resultado esperado: 410 con ultimo_seq en ambos casos de historial; 422 en los parámetros inválidos
+        """
+        # Arrange
+        handler.unsubscribe(handler.changes.registrar)
+        handler.changes = FeedCambios(capacidad=2)
+        handler.subscribe(handler.changes.registrar)
+        for i in range(3):
+            handler.create_task(f"Tarea {i}", "Desc", "dev1", "programador")
+
+        # Act
+        expirada = client.get('/changes?since=0')
+        futura = client.get('/changes?since=99')
+        vigente = client.get('/changes?since=1')
+        invalidas = [client.get(f'/changes?{consulta}') for consulta in ["since=abc", "since=-1", "timeout=x"]]
+
+        # Assert
+        assert expirada.status_code == futura.status_code == 410
+        assert expirada.get_json()["ultimo_seq"] == 3
+        assert [c["seq"] for c in vigente.get_json()["cambios"]] == [2, 3]
+        assert [r.status_code for r in invalidas] == [422, 422, 422]
+
+    def test_stream_sse_y_reanudacion(self, client, handler):
+        """Caso de éxito: GET /changes/stream envía eventos SSE y se reanuda con Last-Event-ID
+
+        Caso de prueba: CP-CAM-005
+        Descripción: Verificar el formato de los eventos SSE y la reanudación desde el último recibido
+        Entrada: dos tareas creadas; stream desde since; luego Last-Event-ID con la secuencia de la primera
+        Resultado esperado: Bloques id/event/data por cambio; la reanudación empieza en la segunda tarea
+        """
+        # Arrange
+        since = handler.changes.ultimo_seq
+        t1 = handler.create_task("Login", "Formulario", "dev1", "programador")
+        t2 = handler.create_task("Servidor", "Desplegar", "dev1", "infra")
+
+        # Act
+        stream = client.get(f'/changes/stream?since={since}', buffered=False)
+        bloques = [next(stream.response), next(stream.response)]
+        stream.close()
+        reanudado = client.get('/changes/stream', headers={"Last-Event-ID": str(since + 1)}, buffered=False)
+        bloque_reanudado = next(reanudado.response)
+        reanudado.close()
+
+        # Assert
+        assert stream.status_code == 200
+        assert stream.mimetype == "text/event-stream"
+        assert stream.headers["Cache-Control"] == "no-cache"
+        for bloque, seq, task in zip(bloques, [since + 1, since + 2], [t1, t2]):
+            texto = bloque.decode()
+            lineas = texto.split("\n")
+            assert texto.endswith("\n\n")
+            assert lineas[0] == f"id: {seq}"
+            assert lineas[1] == "event: tarea_creada"
+            assert json.loads(lineas[2][len("data: "):])["datos"]["id"] == task.id
+        assert bloque_reanudado.decode().startswith(f"id: {since + 2}\n")
+
+    def test_stream_since_invalido_o_futuro(self, client, handler):
+        """Caso de error: GET /changes/stream rechaza since inválido y avisa si el historial expiró
+
+        Caso de prueba: CP-CAM-006
+        Descripción: Verificar los errores del stream SSE
+        Entrada: since=abc; y since posterior a la última secuencia
+        Resultado esperado: 422; y un evento historial_expirado que termina el stream
+        """
+        # Act
+        invalida = client.get('/changes/stream?since=abc')
+        futura = client.get(f'/changes/stream?since={handler.changes.ultimo_seq + 5}')
+
+        # Assert
+        assert invalida.status_code == 422
+        assert futura.status_code == 200
+        assert futura.get_data(as_text=True).startswith("event: historial_expirado\ndata: ")
+
+    def test_limite_de_streams_y_long_polls(self, handler):
+        """Caso de error: Por encima de FEED_MAX_CLIENTS los streams y long-polls responden 503
+
+        Caso de prueba: CP-CAM-007
+        Descripción: Verificar que los clientes del feed no ocupan todos los hilos del servidor
+        Entrada: FEED_MAX_CLIENTS=1 con un stream abierto; otro stream, un long-poll y GET /stats
+        Resultado esperado: 503 con Retry-After para el stream y el long-poll, 200 para lo demás;
+                            al cerrar el primer stream se admite uno nuevo
+        """
+        # Arrange
+        client = controller.create_app({"DATA_HANDLER": handler, "FEED_MAX_CLIENTS": 1}).test_client()
+        abierto = client.get('/changes/stream', buffered=False)
+
+        # Act
+        segundo = client.get('/changes/stream', buffered=False)
+        long_poll = client.get('/changes?timeout=5')
+        sin_espera = client.get('/changes')
+        stats = client.get('/stats')
+        abierto.close()
+        tras_cerrar = client.get('/changes/stream', buffered=False)
+        tras_cerrar.close()
+
+        # Assert
+        assert abierto.status_code == 200
+        assert segundo.status_code == long_poll.status_code == 503
+        assert int(segundo.headers["Retry-After"]) >= 1
+        assert sin_espera.status_code == stats.status_code == 200
+        assert tras_cerrar.status_code == 200
+
+    def test_stream_termina_tras_la_duracion_maxima(self, handler):
+        """Caso de éxito: Un stream se cierra tras STREAM_MAX_SECONDS y sin lugares no se abre
+
+        Caso de prueba: CP-CAM-008
+        Descripción: Verificar la duración acotada de los streams y FEED_MAX_CLIENTS=0
+        Entrada: STREAM_MAX_SECONDS=0.05 con un cambio pendiente; y FEED_MAX_CLIENTS=0
+        Resultado esperado: El stream envía el cambio y termina; con 0 lugares, 503
+        """
+        # Arrange
+        since = handler.changes.ultimo_seq
+        handler.create_user("dev2", "María García")
+        client = controller.create_app({"DATA_HANDLER": handler, "STREAM_MAX_SECONDS": 0.05}).test_client()
+        sin_lugares = controller.create_app({"DATA_HANDLER": handler, "FEED_MAX_CLIENTS": 0}).test_client()
+
+        # Act
+        inicio = time.perf_counter()
+        cuerpo = client.get(f'/changes/stream?since={since}').get_data(as_text=True)
+        transcurrido = time.perf_counter() - inicio
+
+        # Assert
+        assert cuerpo.startswith(f"id: {since + 1}\nevent: usuario_creado\n")
+        assert transcurrido < controller.SSE_HEARTBEAT
+        assert sin_lugares.get('/changes/stream').status_code == 503
+        assert sin_lugares.get('/changes?timeout=1').status_code == 503
+
+
+class TestEstadisticasRutas:
+
+    def test_estadisticas_por_ruta(self, client, handler):
+        """Caso de éxito: GET /stats refleja las tareas creadas, asignadas, bloqueadas y finalizadas
+
+        Caso de prueba: CP-EST-005
+        Descripción: Verificar el cuerpo de GET /stats tras operaciones hechas por la API
+        Entrada: dos tareas creadas por POST /tasks, una dependencia, una asignación y una tarea finalizada
+        Resultado esperado: 200 con conteos por estado, rol y usuario, bloqueadas y tasa de finalización
+        """
+        # Arrange
+        handler.create_user("dev2", "María García")
+        client.post('/tasks', json={"nombre": "Login", "descripcion": "Formulario", "usuario": "dev1", "rol": "programador"})
+        client.post('/tasks', json={"nombre": "Servidor", "descripcion": "Desplegar", "usuario": "dev2", "rol": "infra"})
+        client.post('/tasks/1/dependencies', json={"dependencytaskid": 2, "accion": "adicionar"})
+        client.post('/tasks/1/users', json={"usuario": "dev2", "rol": "pruebas", "accion": "adicionar"})
+
+        # Act
+        bloqueada = client.get('/stats').get_json()
+        client.post('/tasks/2', json={"estado": "en_progreso"})
+        client.post('/tasks/2', json={"estado": "finalizada"})
+        respuesta = client.get('/stats')
+
+        # Assert
+        data = respuesta.get_json()
+        assert bloqueada["bloqueadas"] == 1
+        assert respuesta.status_code == 200
+        assert data["total_tareas"] == 2
+        assert data["por_estado"] == {"nueva": 1, "en_progreso": 0, "finalizada": 1}
+        assert data["por_rol"] == {"programador": 1, "pruebas": 0, "infra": 1}
+        assert data["por_usuario"] == {"dev1": 1, "dev2": 2}
+        assert data["bloqueadas"] == 0
+        assert data["archivadas"] == 0
+        assert data["tasa_finalizacion"] == 0.5
+
+
+class TestTareasListasRutas:
+
+    def test_tareas_listas_por_ruta(self, client, handler):
+        """Caso de éxito: GET /tasks/ready lista las tareas desbloqueadas y filtra por rol y usuario
+
+        Caso de prueba: CP-LIS-003
+        Descripción: Verificar los filtros de GET /tasks/ready y que finalizar una dependencia desbloquea
+        Entrada: tarea 1 depende de la 2; tarea 3 con dev2 asignado como pruebas; luego se finaliza la 2
+        Resultado esperado: Listas por filtro correctas, 422 con rol inválido y la tarea 1 lista al final
+        """
+        # Arrange
+        handler.create_user("dev2", "María García")
+        t1 = handler.create_task("Login", "Formulario", "dev1", "programador")
+        t2 = handler.create_task("Servidor", "Desplegar", "dev2", "infra")
+        t3 = handler.create_task("Reportes", "Exportar", "dev1", "programador")
+        handler.add_task_dependency(t1.id, t2.id)
+        handler.assign_user_to_task(t3.id, "dev2", "pruebas")
+
+        def ids(consulta=""):
+            return [t["id"] for t in client.get(f'/tasks/ready{consulta}').get_json()["tareas"]]
+
+        # Act & Assert
+        assert ids() == [t2.id, t3.id]
+        assert ids("?rol=programador") == [t3.id]
+        assert ids("?usuario=dev2") == [t2.id, t3.id]
+        assert ids("?usuario=dev2&rol=pruebas") == [t3.id]
+        assert client.get('/tasks/ready?rol=gerente').status_code == 422
+
+        client.post(f'/tasks/{t2.id}', json={"estado": "en_progreso"})
+        client.post(f'/tasks/{t2.id}', json={"estado": "finalizada"})
+        assert ids() == [t1.id, t3.id]
+
+
+class TestBloqueantesRutas:
+
+    def test_bloqueantes_por_ruta(self, client, handler):
+        """Caso de éxito: GET /tasks/{id}/blockers retorna los bloqueantes transitivos con profundidad
+
+        Caso de prueba: CP-BLQ-004
+        Descripción: Verificar el cuerpo de GET /tasks/{id}/blockers, su actualización y el 404
+        Entrada: cadena 1 -> 2 -> 3; luego se finaliza la tarea 3; y una tarea inexistente
+        Resultado esperado: Bloqueantes 2 (profundidad 1) y 3 (profundidad 2), luego solo 2; 404 para 99
+        """
+        # Arrange
+        t1, t2, t3 = [handler.create_task(f"Tarea {i}", "Desc", "dev1", "programador") for i in range(3)]
+        handler.add_task_dependency(t1.id, t2.id)
+        handler.add_task_dependency(t2.id, t3.id)
+
+        # Act
+        respuesta = client.get(f'/tasks/{t1.id}/blockers')
+        client.post(f'/tasks/{t3.id}', json={"estado": "en_progreso"})
+        client.post(f'/tasks/{t3.id}', json={"estado": "finalizada"})
+        actualizada = client.get(f'/tasks/{t1.id}/blockers')
+        inexistente = client.get('/tasks/99/blockers')
+
+        # Assert
+        assert respuesta.status_code == 200
+        assert respuesta.get_json() == {
+            "task_id": t1.id,
+            "bloqueantes": [
+                {"id": t2.id, "profundidad": 1, "nombre": "Tarea 1", "estado": "nueva"},
+                {"id": t3.id, "profundidad": 2, "nombre": "Tarea 2", "estado": "nueva"}
+            ],
+            "total": 2
+        }
+        assert [b["id"] for b in actualizada.get_json()["bloqueantes"]] == [t2.id]
+        assert inexistente.status_code == 404
+
+
+class TestDependientesRutas:
+
+    def test_dependientes_por_ruta(self, client, handler):
+        """Caso de éxito: GET /tasks/{id}/dependents retorna el impacto directo o transitivo
+
+        Caso de prueba: CP-DEP-002
+        Descripción: Verificar GET /tasks/{id}/dependents con y sin transitive y el 404
+        Entrada: 2 depende de 1 y 3 depende de 2; dev2 asignado a la tarea 3; y una tarea inexistente
+        Resultado esperado: Directos [2]; transitivos [2, 3] con conteos por rol y usuario; 404 para 99
+        """
+        # Arrange
+        handler.create_user("dev2", "María García")
+        t1 = handler.create_task("Base de datos", "Esquema", "dev1", "infra")
+        t2 = handler.create_task("API", "Endpoints", "dev1", "programador")
+        t3 = handler.create_task("Pruebas", "Integración", "dev1", "pruebas")
+        handler.add_task_dependency(t2.id, t1.id)
+        handler.add_task_dependency(t3.id, t2.id)
+        handler.assign_user_to_task(t3.id, "dev2", "pruebas")
+
+        # Act
+        directos = client.get(f'/tasks/{t1.id}/dependents')
+        transitivos = client.get(f'/tasks/{t1.id}/dependents?transitive=true')
+        inexistente = client.get('/tasks/99/dependents')
+
+        # Assert
+        assert directos.status_code == 200
+        assert [d["id"] for d in directos.get_json()["dependientes"]] == [t2.id]
+        data = transitivos.get_json()
+        assert [(d["id"], d["profundidad"]) for d in data["dependientes"]] == [(t2.id, 1), (t3.id, 2)]
+        assert data["total"] == 2
+        assert data["por_rol"] == {"programador": 1, "pruebas": 1}
+        assert data["por_usuario"] == {"dev1": 2, "dev2": 1}
+        assert inexistente.status_code == 404
+
+
+class TestSugerenciaAsignadosRutas:
+
+    def test_sugerencias_por_ruta(self, client, handler):
+        """Caso de éxito: GET /tasks/{id}/suggested-assignees ordena por carga y valida sus parámetros
+
+        Caso de prueba: CP-SUG-002
+        Descripción: Verificar las sugerencias, el rol por defecto, limit y los errores de la ruta
+        Entrada: tarea de dev1; dev2 con una tarea abierta de pruebas; dev3 sin tareas
+        Resultado esperado: dev3 antes que dev2 y dev1 excluido; 422 con rol o limit inválidos; 404 para 99
+        """
+        # Arrange
+        handler.create_user("dev2", "María García")
+        handler.create_user("dev3", "Ana Torres")
+        task = handler.create_task("Login", "Formulario", "dev1", "programador")
+        handler.create_task("Casos", "Pruebas de login", "dev2", "pruebas")
+
+        # Act
+        respuesta = client.get(f'/tasks/{task.id}/suggested-assignees?rol=pruebas')
+        por_defecto = client.get(f'/tasks/{task.id}/suggested-assignees')
+        limitada = client.get(f'/tasks/{task.id}/suggested-assignees?rol=pruebas&limit=1')
+        errores = [
+            client.get(f'/tasks/{task.id}/suggested-assignees?{consulta}')
+            for consulta in ["rol=gerente", "limit=x", "limit=0"]
+        ]
+        inexistente = client.get('/tasks/99/suggested-assignees')
+
+        # Assert
+        data = respuesta.get_json()
+        assert respuesta.status_code == 200
+        assert data["rol"] == "pruebas"
+        assert data["sugeridos"] == [
+            {"alias": "dev3", "nombre": "Ana Torres", "carga_rol": 0, "carga_total": 0},
+            {"alias": "dev2", "nombre": "María García", "carga_rol": 1, "carga_total": 1}
+        ]
+        assert por_defecto.get_json()["rol"] == "programador"
+        assert [s["alias"] for s in limitada.get_json()["sugeridos"]] == ["dev3"]
+        assert [r.status_code for r in errores] == [422, 422, 422]
+        assert inexistente.status_code == 404
+
+
+class TestArchivadoRutas:
+
+    def test_archivar_y_consultar_por_ruta(self, client, handler):
+        """Caso de éxito: POST /tasks/archive mueve las finalizadas y GET /tasks/archived/{id} las consulta
+
+        Caso de prueba: CP-ARC-003
+        Descripción: Verificar el archivado por la API, la consulta de archivadas y sus errores
+        Entrada: tarea finalizada y otra abierta; archivado con edad_minima 3600 y luego 0
+        Resultado esperado: Nada archivado con 3600; con 0 la finalizada sale de /tasks, se consulta
+                            archivada, sigue en /stats y admite dependencias; 404 y 422 en los errores
+        """
+        # Arrange
+        finalizada = handler.create_task("Login", "Formulario", "dev1", "programador")
+        abierta = handler.create_task("Servidor", "Desplegar", "dev1", "infra")
+        client.post(f'/tasks/{finalizada.id}', json={"estado": "en_progreso"})
+        client.post(f'/tasks/{finalizada.id}', json={"estado": "finalizada"})
+
+        # Act
+        reciente = client.post('/tasks/archive', json={"edad_minima": 3600})
+        respuesta = client.post('/tasks/archive', json={"edad_minima": 0})
+        archivada = client.get(f'/tasks/archived/{finalizada.id}')
+        dependencia = client.post(f'/tasks/{abierta.id}/dependencies',
+                                  json={"dependencytaskid": finalizada.id, "accion": "adicionar"})
+        errores = [client.post('/tasks/archive', json={"edad_minima": valor}) for valor in ["x", -1]]
+
+        # Assert
+        assert reciente.get_json()["archivadas"] == []
+        assert respuesta.status_code == 200
+        assert respuesta.get_json()["archivadas"] == [finalizada.id]
+        assert [t["id"] for t in client.get('/tasks').get_json()["tareas"]] == [abierta.id]
+        assert archivada.status_code == 200
+        assert archivada.get_json()["estado"] == "finalizada"
+        assert client.get(f'/tasks/archived/{abierta.id}').status_code == 404
+        stats = client.get('/stats').get_json()
+        assert (stats["total_tareas"], stats["archivadas"]) == (2, 1)
+        assert dependencia.status_code == 200
+        assert client.get(f'/tasks/{abierta.id}/blockers').get_json()["bloqueantes"] == []
+        assert [r.status_code for r in errores] == [422, 422]
+
+
+class TestTransaccionesRutas:
+
+    def test_transaccion_valida_el_cuerpo(self, client, handler):
+        """Caso de error: POST /transactions sin operaciones
+
+        Caso de prueba: CP-TRX-005
+        Descripción: Verificar la validación del campo 'operaciones'
+        Entrada: cuerpo vacío, sin 'operaciones', con lista vacía y con un objeto
+        Resultado esperado: 400 en todos los casos y ninguna tarea creada
+        """
+        # Arrange
+        cuerpos = [{}, {"otro": 1}, {"operaciones": []}, {"operaciones": {"op": "create_task"}}]
+
+        # Act
+        respuestas = [client.post('/transactions', json=cuerpo) for cuerpo in cuerpos]
+
+        # Assert
+        assert [r.status_code for r in respuestas] == [400, 400, 400, 400]
+        assert respuestas[1].get_json()["error"] == "Campo 'operaciones' es requerido"
+        assert respuestas[2].get_json()["error"] == "El campo 'operaciones' debe ser una lista no vacía"
+        assert handler.tasks == []
+
+    def test_transaccion_exitosa_por_ruta(self, client, handler, monkeypatch):
+        """Caso de éxito: POST /transactions aplica operaciones con referencias "$N"
+
+        Caso de prueba: CP-TRX-006
+        Descripción: Verificar la respuesta, las referencias "$N" y una sola escritura al confirmar
+        Entrada: crear dos tareas, asignar, agregar dependencia entre ellas y pasar la primera a en_progreso
+        Resultado esperado: 200, cada resultado con el estado tras su operación y save_data llamado una vez
+        """
+        # Arrange
+        escrituras = []
+        save_original = handler.save_data
+        monkeypatch.setattr(handler, "save_data", lambda: (escrituras.append(1), save_original()))
+        operaciones = [
+            {"op": "create_task", "nombre": "Login", "descripcion": "Formulario", "usuario": "dev1", "rol": "programador"},
+            {"op": "create_task", "nombre": "API", "descripcion": "Endpoints", "usuario": "dev1", "rol": "programador"},
+            {"op": "add_dependency", "id": "$0", "dependencytaskid": "$1"},
+            {"op": "update_task_state", "id": "$1", "estado": "en_progreso"}
+        ]
+
+        # Act
+        respuesta = client.post('/transactions', json={"operaciones": operaciones})
+
+        # Assert
+        assert respuesta.status_code == 200
+        resultados = respuesta.get_json()["resultados"]
+        login, api = resultados[0]["id"], resultados[1]["id"]
+        assert resultados[0]["dependencias"] == []
+        assert resultados[2]["id"] == login
+        assert resultados[2]["dependencias"] == [api]
+        assert [resultados[1]["estado"], resultados[3]["estado"]] == ["nueva", "en_progreso"]
+        assert len(escrituras) == 1
+        bloqueantes = client.get(f'/tasks/{login}/blockers').get_json()["bloqueantes"]
+        assert [(b["id"], b["estado"]) for b in bloqueantes] == [(api, "en_progreso")]
+
+    def test_transaccion_fallida_por_ruta(self, client, handler, monkeypatch):
+        """Caso de error: Una operación inválida en POST /transactions no deja rastro
+
+        Caso de prueba: CP-TRX-007
+        Descripción: Verificar el 422, el rollback, que no se persiste nada y que no se emiten eventos
+        Entrada: crear tarea, asignar un usuario inexistente a "$0"
+        Resultado esperado: 422 con el índice de la operación, sin tareas, sin escrituras y sin cambios en el feed
+        """
+        # Arrange
+        escrituras = []
+        monkeypatch.setattr(handler, "save_data", lambda: escrituras.append(1))
+        since = handler.changes.ultimo_seq
+        operaciones = [
+            {"op": "create_task", "nombre": "Login", "descripcion": "Formulario", "usuario": "dev1", "rol": "programador"},
+            {"op": "assign_user", "id": "$0", "usuario": "nadie", "rol": "pruebas"}
+        ]
+
+        # Act
+        respuesta = client.post('/transactions', json={"operaciones": operaciones})
+
+        # Assert
+        assert respuesta.status_code == 422
+        assert respuesta.get_json()["error"].startswith("Operación 1")
+        assert escrituras == []
+        assert handler.tasks == []
+        assert client.get('/tasks').get_json()["tareas"] == []
+        assert handler.changes.desde(since) == []
+        assert DataHandler(storage=handler.storage).tasks == []
@@ -0,0 +1,1095 @@
+import hashlib
+import json
+import marshal
+import pickle
+import pytest
+import sys
+import os
+import stat
+import threading
+
+# Agregar el directorio src al path para importar los módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import bulk
+from data_handler import DataHandler
+from utils import sidecar
+from utils.changes import FeedCambios, HistorialExpirado
+from utils.storage import AlmacenamientoBinario, AlmacenamientoMemoria
+
+
+@pytest.fixture
+def handler(memory_storage):
+    """DataHandler en memoria con dos usuarios"""
+    data_handler = DataHandler(storage=memory_storage)
+    data_handler.create_user("dev1", "Juan Pérez")
+    data_handler.create_user("dev2", "María García")
+    return data_handler
+
+
+@pytest.fixture
+def file_handler(tmp_path):
+    """DataHandler con un archivo de datos temporal y dos usuarios"""
+    data_handler = DataHandler(str(tmp_path / 'data.json'))
+    data_handler.create_user("dev1", "Juan Pérez")
+    data_handler.create_user("dev2", "María García")
+    return data_handler
+
+
+class TestBusqueda:
+
+    def test_buscar_sin_tildes(self, handler):
+        """Caso de éxito: Buscar sin distinguir tildes ni mayúsculas
+
+        Caso de prueba: CP-BUS-001
+        Descripción: Verificar que la búsqueda normaliza acentos del texto en español
+        Entrada: tarea con descripción "Crear sistema de autenticación", consulta "AUTENTICACION"
+        Resultado esperado: La tarea es encontrada
+        """
+        # Arrange
+        task = handler.create_task("Implementar login", "Crear sistema de autenticación", "dev1", "programador")
+        handler.create_task("Configurar servidor", "Preparar infraestructura", "dev2", "infra")
+
+        # Act
+        resultados = handler.search_tasks("AUTENTICACION")
+
+        # Assert
+        assert [t.id for t, _ in resultados] == [task.id]
+
+    def test_buscar_por_prefijo_y_ranking(self, handler):
+        """Caso de éxito: Buscar por prefijo con resultados ordenados por relevancia
+
+        Caso de prueba: CP-BUS-002
+        Descripción: Verificar que un prefijo encuentra tareas y que el nombre pesa más que la descripción
+        Entrada: consulta "log"
+        Resultado esperado: La tarea con "login" en el nombre aparece primero
+        """
+        # Arrange
+        en_descripcion = handler.create_task("Pantalla inicial", "Enlazar con el login", "dev1", "programador")
+        en_nombre = handler.create_task("Implementar login", "Crear formulario", "dev1", "programador")
+
+        # Act
+        resultados = handler.search_tasks("log")
+
+        # Assert
+        assert [t.id for t, _ in resultados] == [en_nombre.id, en_descripcion.id]
+        assert handler.search_tasks("log", prefijo=False) == []
+
+    def test_buscar_varios_terminos_y_recarga(self, handler):
+        """Caso de éxito: Todos los términos deben coincidir y el índice se reconstruye al cargar
+
+        Caso de prueba: CP-BUS-003
+        Descripción: Verificar la intersección de términos y la reconstrucción del índice en load_data
+        Entrada: consulta "crear autenticación" sobre un DataHandler recargado
+        Resultado esperado: Solo la tarea que contiene ambos términos
+        """
+        # Arrange
+        task = handler.create_task("Implementar login", "Crear sistema de autenticación", "dev1", "programador")
+        handler.create_task("Crear pruebas", "Pruebas de carga", "dev2", "pruebas")
+
+        # Act
+        recargado = DataHandler(storage=handler.storage)
+        resultados = recargado.search_tasks("crear autenticación")
+
+        # Assert
+        assert [t.id for t, _ in resultados] == [task.id]
+
+
+class TestEstadisticas:
+
+    def test_contadores_por_estado_rol_y_usuario(self, handler):
+        """Caso de éxito: Los contadores reflejan creación, cambios de estado y asignaciones
+
+        Caso de prueba: CP-EST-001
+        Descripción: Verificar que get_stats se mantiene al crear, asignar y cambiar estado
+        Entrada: dos tareas, una asignación adicional y una tarea finalizada
+        Resultado esperado: Conteos por estado, rol y usuario correctos y tasa de finalización 0.5
+        """
+        # Arrange
+        t1 = handler.create_task("Login", "Formulario", "dev1", "programador")
+        handler.create_task("Servidor", "Desplegar", "dev2", "infra")
+
+        # Act
+        handler.assign_user_to_task(t1.id, "dev2", "pruebas")
+        handler.update_task_state(t1.id, "en_progreso")
+        handler.update_task_state(t1.id, "finalizada")
+        stats = handler.get_stats()
+
+        # Assert
+        assert stats["total_tareas"] == 2
+        assert stats["por_estado"] == {"nueva": 1, "en_progreso": 0, "finalizada": 1}
+        assert stats["por_rol"] == {"programador": 1, "pruebas": 0, "infra": 1}
+        assert stats["por_usuario"] == {"dev1": 1, "dev2": 2}
+        assert stats["tasa_finalizacion"] == 0.5
+
+    def test_contador_bloqueadas(self, handler):
+        """Caso de éxito: El conteo de tareas bloqueadas sigue a las dependencias
+
+        Caso de prueba: CP-EST-002
+        Descripción: Verificar bloqueadas al agregar dependencias, finalizarlas y recargar
+        Entrada: tarea 1 depende de tarea 2
+        Resultado esperado: 1 bloqueada hasta que la tarea 2 se finaliza, igual tras recargar
+        """
+        # Arrange
+        t1 = handler.create_task("Login", "Formulario", "dev1", "programador")
+        t2 = handler.create_task("Base de datos", "Esquema", "dev2", "infra")
+
+        # Act & Assert
+        handler.add_task_dependency(t1.id, t2.id)
+        assert handler.get_stats()["bloqueadas"] == 1
+        assert DataHandler(storage=handler.storage).get_stats()["bloqueadas"] == 1
+
+        handler.update_task_state(t2.id, "en_progreso")
+        handler.update_task_state(t2.id, "finalizada")
+        assert handler.get_stats()["bloqueadas"] == 0
+        assert DataHandler(storage=handler.storage).get_stats()["bloqueadas"] == 0
+
+    def test_remover_dependencia_desbloquea(self, handler):
+        """Caso de éxito: Remover la dependencia pendiente desbloquea la tarea
+
+        Caso de prueba: CP-EST-003
+        Descripción: Verificar que remove_task_dependency actualiza el conteo de bloqueadas
+        Entrada: tarea 1 depende de tarea 2 (sin finalizar), luego se remueve la dependencia
+        Resultado esperado: 0 bloqueadas y la tarea 1 puede finalizarse
+        """
+        # Arrange
+        t1 = handler.create_task("Login", "Formulario", "dev1", "programador")
+        t2 = handler.create_task("Base de datos", "Esquema", "dev2", "infra")
+        handler.add_task_dependency(t1.id, t2.id)
+        handler.update_task_state(t1.id, "en_progreso")
+
+        # Act
+        with pytest.raises(ValueError):
+            handler.update_task_state(t1.id, "finalizada")
+        handler.remove_task_dependency(t1.id, t2.id)
+        handler.update_task_state(t1.id, "finalizada")
+
+        # Assert
+        assert handler.get_stats()["bloqueadas"] == 0
+
+    def test_estadisticas_con_escrituras_concurrentes(self, handler):
+        """Caso de éxito: get_stats no falla mientras otro hilo crea usuarios y tareas
+
+        Caso de prueba: CP-EST-004
+        Descripción: Verificar que los lectores de índices toman el bloqueo del DataHandler
+        Entrada: un hilo crea 200 usuarios con una tarea cada uno mientras se consulta get_stats
+        Resultado esperado: Ninguna consulta falla y el conteo final incluye a todos los usuarios
+        """
+        # Arrange
+        errores = []
+
+        def escribir():
+            for i in range(200):
+                handler.create_user(f"concurrente{i}", "Usuario concurrente")
+                handler.create_task("Tarea", "Concurrente", f"concurrente{i}", "programador")
+
+        escritor = threading.Thread(target=escribir)
+
+        # Act
+        escritor.start()
+        while escritor.is_alive():
+            try:
+                handler.get_stats()
+                handler.search_tasks("tarea")
+                handler.get_ready_tasks()
+            except Exception as e:
+                errores.append(e)
+        escritor.join()
+
+        # Assert
+        assert errores == []
+        assert len(handler.get_stats()["por_usuario"]) == 200
+
+
+class TestTareasListas:
+
+    def test_tarea_lista_al_finalizar_dependencia(self, handler):
+        """Caso de éxito: Una tarea pasa a la cola de listas cuando su dependencia finaliza
+
+        Caso de prueba: CP-LIS-001
+        Descripción: Verificar la cola de tareas listas y la notificación de desbloqueo
+        Entrada: tarea 1 depende de tarea 2; se finaliza la tarea 2
+        Resultado esperado: La tarea 1 pasa a estar lista y se notifica 'tarea_desbloqueada'
+        """
+        # Arrange
+        t1 = handler.create_task("Login", "Formulario", "dev1", "programador")
+        t2 = handler.create_task("Base de datos", "Esquema", "dev2", "infra")
+        handler.add_task_dependency(t1.id, t2.id)
+        eventos = []
+        handler.subscribe(lambda evento, datos: eventos.append((evento, datos)))
+        assert [t.id for t in handler.get_ready_tasks()] == [t2.id]
+
+        # Act
+        handler.update_task_state(t2.id, "en_progreso")
+        handler.update_task_state(t2.id, "finalizada")
+
+        # Assert
+        assert [t.id for t in handler.get_ready_tasks()] == [t1.id]
+        assert ('tarea_desbloqueada', {'task_id': t1.id}) in eventos
+
+    def test_filtrar_tareas_listas_por_rol_y_usuario(self, handler):
+        """Caso de éxito: Filtrar la cola de tareas listas por rol y usuario asignado
+
+        Caso de prueba: CP-LIS-002
+        Descripción: Verificar los filtros de get_ready_tasks
+        Entrada: una tarea de dev1 con dev2 como pruebas y otra tarea de dev2 en infra
+        Resultado esperado: Cada filtro retorna solo las tareas que coinciden
+        """
+        # Arrange
+        t1 = handler.create_task("Login", "Formulario", "dev1", "programador")
+        t2 = handler.create_task("Servidor", "Desplegar", "dev2", "infra")
+        handler.assign_user_to_task(t1.id, "dev2", "pruebas")
+
+        # Act & Assert
+        assert [t.id for t in handler.get_ready_tasks(usuario_alias="dev2")] == [t1.id, t2.id]
+        assert [t.id for t in handler.get_ready_tasks(rol="infra")] == [t2.id]
+        assert [t.id for t in handler.get_ready_tasks(rol="pruebas", usuario_alias="dev2")] == [t1.id]
+        assert handler.get_ready_tasks(rol="pruebas", usuario_alias="dev1") == []
+
+
+class TestFeedCambios:
+
+    def test_mutaciones_generan_eventos_con_secuencia(self, handler):
+        """Caso de éxito: Cada mutación emite un evento con número de secuencia
+
+        Caso de prueba: CP-CAM-001
+        Descripción: Verificar que el feed entrega solo los cambios posteriores a 'since'
+        Entrada: creación de tarea y cambio de estado tras leer la secuencia actual
+        Resultado esperado: Dos eventos en orden con secuencias consecutivas
+        """
+        # Arrange
+        since = handler.changes.ultimo_seq
+
+        # Act
+        task = handler.create_task("Login", "Formulario", "dev1", "programador")
+        handler.update_task_state(task.id, "en_progreso")
+        cambios = handler.changes.desde(since)
+
+        # Assert
+        assert [c["tipo"] for c in cambios] == ["tarea_creada", "estado_actualizado"]
+        assert [c["seq"] for c in cambios] == [since + 1, since + 2]
+        assert cambios[0]["datos"]["estado"] == "nueva"
+        assert handler.changes.desde(since + 2) == []
+
+    def test_historial_expirado(self):
+        """Caso de error: Pedir cambios que ya salieron del buffer circular
+
+        Caso de prueba: CP-CAM-002
+        Descripción: Verificar que el buffer es acotado y reporta secuencias perdidas
+        Entrada: buffer de capacidad 2 con 3 eventos, since=0
+        Resultado esperado: HistorialExpirado; since=1 retorna los 2 últimos eventos
+        """
+        # Arrange
+        feed = FeedCambios(capacidad=2)
+        for i in range(3):
+            feed.registrar("evento", {"i": i})
+
+        # Act & Assert
+        with pytest.raises(HistorialExpirado):
+            feed.desde(0)
+        assert [c["seq"] for c in feed.desde(1)] == [2, 3]
+        assert feed.esperar(3, timeout=0.01) == []
+
+
+class TestTransacciones:
+
+    def test_transaccion_exitosa_persiste_una_vez(self, handler, monkeypatch):
+        """Caso de éxito: Aplicar varias operaciones con una sola escritura
+
+        Caso de prueba: CP-TRX-001
+        Descripción: Verificar apply_operations con referencias "$N" y una sola llamada a save_data
+        Entrada: crear tarea, asignar usuario, agregar dependencia y pasar a en_progreso
+        Resultado esperado: Todas aplicadas, persistidas en una escritura; cada resultado refleja su operación
+        """
+        # Arrange
+        base = handler.create_task("Base de datos", "Esquema", "dev2", "infra")
+        escrituras = []
+        save_original = handler.save_data
+        monkeypatch.setattr(handler, "save_data", lambda: (escrituras.append(1), save_original()))
+
+        # Act
+        resultados = handler.apply_operations([
+            {"op": "create_task", "nombre": "Login", "descripcion": "Formulario", "usuario": "dev1", "rol": "programador"},
+            {"op": "assign_user", "id": "$0", "usuario": "dev2", "rol": "pruebas"},
+            {"op": "add_dependency", "id": "$0", "dependencytaskid": base.id},
+            {"op": "update_task_state", "id": "$0", "estado": "en_progreso"}
+        ])
+
+        # Assert
+        task = handler.get_task_by_id(resultados[0]["id"])
+        assert len(escrituras) == 1
+        assert task.estado == "en_progreso"
+        assert task.dependencias == [base.id]
+        assert len(task.usuarios_asignados) == 2
+        assert [resultado["estado"] for resultado in resultados] == ["nueva", "nueva", "nueva", "en_progreso"]
+        assert [len(resultado["usuarios_asignados"]) for resultado in resultados] == [1, 2, 2, 2]
+        assert resultados[1]["dependencias"] == []
+        assert DataHandler(storage=handler.storage).get_task_by_id(task.id).estado == "en_progreso"
+
+    def test_transaccion_fallida_revierte(self, handler):
+        """Caso de error: Una operación inválida revierte toda la transacción
+
+        Caso de prueba: CP-TRX-002
+        Descripción: Verificar el rollback de apply_operations ante un ValueError
+        Entrada: crear tarea y luego finalizarla desde 'nueva' (transición inválida)
+        Resultado esperado: ValueError con el índice de la operación, sin tareas ni eventos nuevos
+        """
+        # Arrange
+        since = handler.changes.ultimo_seq
+
+        # Act
+        with pytest.raises(ValueError, match="Operación 1"):
+            handler.apply_operations([
+                {"op": "create_task", "nombre": "Login", "descripcion": "Formulario", "usuario": "dev1", "rol": "programador"},
+                {"op": "update_task_state", "id": "$0", "estado": "finalizada"}
+            ])
+
+        # Assert
+        assert handler.tasks == []
+        assert handler.next_task_id == 1
+        assert handler.get_stats()["total_tareas"] == 0
+        assert handler.changes.desde(since) == []
+        assert DataHandler(storage=handler.storage).tasks == []
+
+    def test_rollback_deshace_cada_tipo_de_operacion(self, handler):
+        """Caso de error: El rollback deja datos e índices como antes de la transacción
+
+        Caso de prueba: CP-TRX-003
+        Descripción: Verificar las operaciones inversas de todas las mutaciones de apply_operations
+        Entrada: tareas con dependencias y asignaciones; una transacción que usa cada operación y falla al final
+        Resultado esperado: Datos serializados iguales a los previos e índices iguales a los reconstruidos
+        """
+        # Arrange
+        base = handler.create_task("Base de datos", "Esquema", "dev2", "infra")
+        api = handler.create_task("API", "Endpoints", "dev1", "programador")
+        login = handler.create_task("Login", "Formulario", "dev1", "programador")
+        handler.add_task_dependency(login.id, base.id)
+        handler.add_task_dependency(login.id, api.id)
+        handler.assign_user_to_task(login.id, "dev2", "pruebas")
+        handler.update_task_state(base.id, "en_progreso")
+        antes = handler._serialize()
+        bloqueantes = handler.get_blockers(login.id)
+
+        # Act
+        with pytest.raises(ValueError, match="Operación 9"):
+            handler.apply_operations([
+                {"op": "create_task", "nombre": "Deploy", "descripcion": "Servidor", "usuario": "dev2", "rol": "infra"},
+                {"op": "add_dependency", "id": login.id, "dependencytaskid": "$0"},
+                {"op": "remove_dependency", "id": login.id, "dependencytaskid": base.id},
+                {"op": "assign_user", "id": base.id, "usuario": "dev1", "rol": "pruebas"},
+                {"op": "remove_user", "id": login.id, "usuario": "dev1"},
+                {"op": "update_task_state", "id": base.id, "estado": "finalizada"},
+                {"op": "update_task_state", "id": api.id, "estado": "en_progreso"},
+                {"op": "update_task_state", "id": api.id, "estado": "finalizada"},
+                {"op": "create_user", "contacto": "dev3", "nombre": "Ana Torres"},
+                {"op": "update_task_state", "id": login.id, "estado": "finalizada"}
+            ])
+
+        # Assert
+        assert handler._serialize() == antes
+        assert handler.get_blockers(login.id) == bloqueantes
+        recargado = DataHandler(storage=handler.storage)
+        for nombre in ["_count_by_estado", "_count_by_rol", "_blocked_count", "_pending_deps", "_ready", "_open_load"]:
+            assert getattr(handler, nombre) == getattr(recargado, nombre), nombre
+        assert {k: v for k, v in handler._dependents.items() if v} == recargado._dependents
+        assert handler.search_tasks("deploy") == []
+        assert handler.get_user_by_alias("dev3") is None
+        assert handler.next_task_id == recargado.next_task_id
+
+    def test_rollback_de_remover_usuario_conserva_el_orden(self, handler):
+        """Caso de error: Deshacer una remoción no reordena las asignaciones de otros usuarios
+
+        Caso de prueba: CP-TRX-004
+        Descripción: Verificar que el rollback de remove_user repone solo la asignación removida en su lugar
+        Entrada: dev1 con las tareas [1, 2] y dev2 en [1, 3]; se remueve dev2 de la tarea 1 y la transacción falla
+        Resultado esperado: snapshot, tareas_asignadas y usuarios_asignados idénticos a los previos
+        """
+        # Arrange
+        login = handler.create_task("Login", "Formulario", "dev1", "programador")
+        handler.create_task("API", "Endpoints", "dev1", "programador")
+        handler.assign_user_to_task(login.id, "dev2", "pruebas")
+        handler.create_task("Deploy", "Servidor", "dev2", "infra")
+        antes = handler.snapshot()
+        tareas = {alias: handler.get_user_by_alias(alias).tareas_asignadas for alias in ["dev1", "dev2"]}
+        asignados = login.usuarios_asignados
+
+        # Act
+        with pytest.raises(ValueError, match="Operación 1"):
+            handler.apply_operations([
+                {"op": "remove_user", "id": login.id, "usuario": "dev2"},
+                {"op": "update_task_state", "id": login.id, "estado": "finalizada"}
+            ])
+
+        # Assert
+        assert handler.snapshot() == antes
+        for alias, esperadas in tareas.items():
+            assert handler.get_user_by_alias(alias).tareas_asignadas == esperadas
+        assert login.usuarios_asignados == asignados
+        assert tareas == {"dev1": [1, 2], "dev2": [1, 3]}
+
+
+class TestTablaAsignaciones:
+
+    def test_vistas_derivadas_de_la_tabla(self, handler):
+        """Caso de éxito: Tareas y usuarios leen sus asignaciones de la tabla normalizada
+
+        Caso de prueba: CP-ASG-003
+        Descripción: Verificar que asignar y remover actualiza ambas vistas y que se persiste una sola vez
+        Entrada: tarea de dev1, se asigna y luego se remueve dev2
+        Resultado esperado: Vistas consistentes y el archivo guarda la relación solo en 'assignments'
+        """
+        # Arrange
+        task = handler.create_task("Login", "Formulario", "dev1", "programador")
+        dev2 = handler.get_user_by_alias("dev2")
+
+        # Act & Assert
+        handler.assign_user_to_task(task.id, "dev2", "pruebas")
+        assert dev2.tareas_asignadas == [task.id]
+        assert [a.user_alias for a in handler.assignments] == ["dev1", "dev2"]
+
+        handler.remove_user_from_task(task.id, "dev2")
+        assert dev2.tareas_asignadas == []
+        assert len(handler.assignments) == 1
+
+        data = json.loads(handler.storage.leer())
+        assert data["assignments"] == [{"task_id": task.id, "user_alias": "dev1", "rol": "programador"}]
+        assert "usuarios_asignados" not in data["tasks"][0]
+        assert "tareas_asignadas" not in data["users"][0]
+
+        recargado = DataHandler(storage=handler.storage)
+        assert recargado.get_task_by_id(task.id).usuarios_asignados == [{"usuario": "dev1", "rol": "programador"}]
+        assert recargado.get_user_by_alias("dev1").tareas_asignadas == [task.id]
+
+    def test_cargar_formato_anterior(self, tmp_path):
+        """Caso de éxito: Cargar un archivo con la relación guardada dentro de las tareas
+
+        Caso de prueba: CP-ASG-004
+        Descripción: Verificar que la tabla se deriva de usuarios_asignados en archivos anteriores
+        Entrada: archivo con 'assignments' vacío y tareas_asignadas desactualizadas
+        Resultado esperado: Las vistas de usuario se derivan de las tareas
+        """
+        # Arrange
+        filename = str(tmp_path / "data.json")
+        with open(filename, "w") as f:
+            json.dump({
+                "tasks": [{
+                    "id": 1, "nombre": "Login", "descripcion": "Formulario",
+                    "usuario_creador": "dev1", "rol": "programador", "estado": "nueva",
+                    "dependencias": [],
+                    "usuarios_asignados": [{"usuario": "dev1", "rol": "programador"},
+                                           {"usuario": "dev2", "rol": "pruebas"}]
+                }],
+                "users": [{"alias": "dev1", "nombre": "Juan", "tareas_asignadas": [1]},
+                          {"alias": "dev2", "nombre": "María", "tareas_asignadas": []}],
+                "assignments": [],
+                "next_task_id": 2
+            }, f)
+
+        # Act
+        handler = DataHandler(filename)
+
+        # Assert
+        assert handler.get_user_by_alias("dev2").tareas_asignadas == [1]
+        assert handler.get_stats()["por_usuario"] == {"dev1": 1, "dev2": 1}
+        assert len(handler.assignments) == 2
+
+
+class TestBloqueantes:
+
+    def test_bloqueantes_transitivos_con_profundidad(self, handler):
+        """Caso de éxito: Obtener las dependencias transitivas sin finalizar
+
+        Caso de prueba: CP-BLQ-001
+        Descripción: Verificar get_blockers en una cadena 1 -> 2 -> 3 y 1 -> 3
+        Entrada: tareas 1, 2 y 3 sin finalizar
+        Resultado esperado: [(2, 1), (3, 1)] con la profundidad mínima de cada una
+        """
+        # Arrange
+        t1, t2, t3 = [handler.create_task(f"Tarea {i}", "Desc", "dev1", "programador") for i in range(3)]
+        handler.add_task_dependency(t1.id, t2.id)
+        handler.add_task_dependency(t2.id, t3.id)
+        handler.add_task_dependency(t1.id, t3.id)
+
+        # Act
+        bloqueantes = handler.get_blockers(t1.id)
+
+        # Assert
+        assert bloqueantes == [(t2.id, 1), (t3.id, 1)]
+        assert handler.get_blockers(t2.id) == [(t3.id, 1)]
+        assert handler.get_blockers(999) is None
+
+    def test_invalidacion_al_finalizar_y_cambiar_dependencias(self, handler):
+        """Caso de éxito: La memoización se invalida a lo largo de los caminos afectados
+
+        Caso de prueba: CP-BLQ-002
+        Descripción: Verificar que finalizar o remover una dependencia actualiza los bloqueantes memoizados
+        Entrada: cadena 1 -> 2 -> 3; se finaliza 3 y luego se remueve la dependencia 1 -> 2
+        Resultado esperado: Los bloqueantes reflejan cada cambio
+        """
+        # Arrange
+        t1, t2, t3 = [handler.create_task(f"Tarea {i}", "Desc", "dev1", "programador") for i in range(3)]
+        handler.add_task_dependency(t1.id, t2.id)
+        handler.add_task_dependency(t2.id, t3.id)
+        assert handler.get_blockers(t1.id) == [(t2.id, 1), (t3.id, 2)]
+
+        # Act & Assert
+        handler.update_task_state(t3.id, "en_progreso")
+        handler.update_task_state(t3.id, "finalizada")
+        assert handler.get_blockers(t1.id) == [(t2.id, 1)]
+
+        handler.remove_task_dependency(t1.id, t2.id)
+        assert handler.get_blockers(t1.id) == []
+
+    def test_memoizacion_con_escrituras_concurrentes(self, handler):
+        """Caso de éxito: La memoización no guarda bloqueantes obsoletos con escrituras concurrentes
+
+        Caso de prueba: CP-BLQ-003
+        Descripción: Verificar que get_blockers toma el bloqueo mientras otro hilo finaliza dependencias
+        Entrada: tarea 1 depende de 100 tareas que un hilo finaliza mientras se consultan los bloqueantes
+        Resultado esperado: Al terminar, los bloqueantes memoizados están vacíos
+        """
+        # Arrange
+        principal = handler.create_task("Principal", "Desc", "dev1", "programador")
+        dependencias = []
+        with handler.batch():
+            for i in range(100):
+                dependencia = handler.create_task(f"Dependencia {i}", "Desc", "dev2", "infra")
+                handler.add_task_dependency(principal.id, dependencia.id)
+                dependencias.append(dependencia)
+
+        def finalizar():
+            for dependencia in dependencias:
+                handler.update_task_state(dependencia.id, "en_progreso")
+                handler.update_task_state(dependencia.id, "finalizada")
+
+        escritor = threading.Thread(target=finalizar)
+
+        # Act
+        escritor.start()
+        while escritor.is_alive():
+            handler.get_blockers(principal.id)
+        escritor.join()
+
+        # Assert
+        assert handler.get_blockers(principal.id) == []
+
+
+class TestDependientes:
+
+    def test_dependientes_directos_y_transitivos(self, handler):
+        """Caso de éxito: Obtener el impacto aguas abajo de una tarea
+
+        Caso de prueba: CP-DEP-001
+        Descripción: Verificar get_impact con y sin transitividad y los conteos por rol y usuario
+        Entrada: 2 depende de 1 y 3 depende de 2; dev2 asignado a la tarea 3
+        Resultado esperado: Directos [2]; transitivos [2, 3] con sus conteos
+        """
+        # Arrange
+        t1 = handler.create_task("Base de datos", "Esquema", "dev1", "infra")
+        t2 = handler.create_task("API", "Endpoints", "dev1", "programador")
+        t3 = handler.create_task("Pruebas API", "Casos", "dev1", "pruebas")
+        handler.add_task_dependency(t2.id, t1.id)
+        handler.add_task_dependency(t3.id, t2.id)
+        handler.assign_user_to_task(t3.id, "dev2", "pruebas")
+
+        # Act
+        directos = handler.get_impact(t1.id)
+        transitivos = handler.get_impact(t1.id, transitive=True)
+
+        # Assert
+        assert [d["id"] for d in directos["dependientes"]] == [t2.id]
+        assert [(d["id"], d["profundidad"]) for d in transitivos["dependientes"]] == [(t2.id, 1), (t3.id, 2)]
+        assert transitivos["por_rol"] == {"programador": 1, "pruebas": 1}
+        assert transitivos["por_usuario"] == {"dev1": 2, "dev2": 1}
+        assert handler.get_impact(999) is None
+
+
+class TestSugerenciaAsignados:
+
+    def test_sugerir_por_carga_abierta(self, handler):
+        """Caso de éxito: Sugerir usuarios con menos carga abierta en el rol
+
+        Caso de prueba: CP-SUG-001
+        Descripción: Verificar suggest_assignees con contadores de carga incrementales
+        Entrada: dev1 y dev2 con tareas de pruebas abiertas; dev3 sin carga
+        Resultado esperado: dev3 primero; al finalizar la tarea de dev2 su carga baja
+        """
+        # Arrange
+        handler.create_user("dev3", "Ana Torres")
+        objetivo = handler.create_task("Login", "Formulario", "dev1", "programador")
+        t_dev1 = handler.create_task("Pruebas A", "Casos", "dev1", "pruebas")
+        handler.create_task("Pruebas B", "Casos", "dev1", "pruebas")
+        t_dev2 = handler.create_task("Pruebas C", "Casos", "dev2", "pruebas")
+
+        # Act
+        sugeridos = handler.suggest_assignees(objetivo.id, "pruebas")
+
+        # Assert
+        assert [(s["alias"], s["carga_rol"]) for s in sugeridos] == [("dev3", 0), ("dev2", 1)]
+
+        handler.update_task_state(t_dev2.id, "en_progreso")
+        handler.update_task_state(t_dev2.id, "finalizada")
+        handler.assign_user_to_task(t_dev1.id, "dev3", "pruebas")
+        sugeridos = handler.suggest_assignees(objetivo.id, "pruebas", limite=1)
+        assert [(s["alias"], s["carga_rol"]) for s in sugeridos] == [("dev2", 0)]
+        assert handler.suggest_assignees(999, "pruebas") is None
+
+
+class TestArchivado:
+
+    def test_archivar_finalizadas(self, handler):
+        """Caso de éxito: Archivar tareas finalizadas fuera del conjunto de trabajo
+
+        Caso de prueba: CP-ARC-001
+        Descripción: Verificar que las tareas archivadas se consultan por ID y siguen contando como finalizadas
+        Entrada: tarea 2 finalizada y archivada; tarea 1 depende de ella
+        Resultado esperado: Tarea 2 fuera de tasks, consultable, y la tarea 1 puede finalizar tras recargar
+        """
+        # Arrange
+        t1 = handler.create_task("Login", "Formulario", "dev1", "programador")
+        t2 = handler.create_task("Base de datos", "Esquema", "dev2", "infra")
+        handler.add_task_dependency(t1.id, t2.id)
+        handler.update_task_state(t2.id, "en_progreso")
+        handler.update_task_state(t2.id, "finalizada")
+
+        # Act
+        archivadas = handler.archive_finalized(edad_minima=0)
+
+        # Assert
+        assert archivadas == [t2.id]
+        assert handler.get_task_by_id(t2.id) is None
+        assert handler.get_archived_task(t2.id)["estado"] == "finalizada"
+        assert handler.get_user_by_alias("dev2").tareas_asignadas == []
+        assert handler.search_tasks("esquema") == []
+        stats = handler.get_stats()
+        assert stats["archivadas"] == 1
+        assert stats["por_estado"]["finalizada"] == 1
+        assert stats["total_tareas"] == 2
+
+        recargado = DataHandler(storage=handler.storage)
+        assert recargado.get_stats() == stats
+        recargado.update_task_state(t1.id, "en_progreso")
+        recargado.update_task_state(t1.id, "finalizada")
+        assert recargado.get_archived_task(t2.id)["nombre"] == "Base de datos"
+
+    def test_no_archiva_recientes(self, handler):
+        """Caso de éxito: Las tareas finalizadas recientemente se mantienen en el conjunto de trabajo
+
+        Caso de prueba: CP-ARC-002
+        Descripción: Verificar la antigüedad mínima de archive_finalized
+        Entrada: tarea recién finalizada y edad mínima por defecto
+        Resultado esperado: No se archiva ninguna tarea
+        """
+        # Arrange
+        task = handler.create_task("Login", "Formulario", "dev1", "programador")
+        handler.update_task_state(task.id, "en_progreso")
+        handler.update_task_state(task.id, "finalizada")
+
+        # Act
+        archivadas = handler.archive_finalized()
+
+        # Assert
+        assert archivadas == []
+        assert handler.get_task_by_id(task.id) is not None
+
+
+class TestImportacionMasiva:
+
+    def test_importar_valida_integridad(self, handler):
+        """Caso de error: Una importación con referencias inválidas no importa nada
+
+        Caso de prueba: CP-IMP-001
+        Descripción: Verificar la validación en bloque de import_records
+        Entrada: tarea con rol inválido, usuario inexistente y dependencia inexistente
+        Resultado esperado: ValueError con todos los errores y el almacén sin cambios
+        """
+        # Arrange
+        tareas = [
+            {"nombre": "A", "descripcion": "D", "usuario_creador": "dev1", "rol": "gerente"},
+            {"nombre": "B", "descripcion": "D", "usuario_creador": "nadie", "rol": "infra", "dependencias": [99]}
+        ]
+
+        # Act
+        with pytest.raises(ValueError) as error:
+            handler.import_records([], tareas)
+
+        # Assert
+        assert "rol 'gerente'" in str(error.value)
+        assert "usuario 'nadie'" in str(error.value)
+        assert "dependencia 99" in str(error.value)
+        assert handler.tasks == []
+
+    def test_exportar_e_importar_csv(self, handler, tmp_path, monkeypatch):
+        """Caso de éxito: Exportar a CSV e importar en otro almacén con una sola escritura
+
+        Caso de prueba: CP-IMP-002
+        Descripción: Verificar el viaje de ida y vuelta de bulk.exportar / bulk.importar
+        Entrada: dos tareas con dependencia y asignación adicional
+        Resultado esperado: El almacén destino tiene las mismas tareas, contadores y una escritura
+        """
+        # Arrange
+        t1 = handler.create_task("Login", "Formulario", "dev1", "programador")
+        t2 = handler.create_task("Base de datos", "Esquema", "dev2", "infra")
+        handler.add_task_dependency(t1.id, t2.id)
+        handler.assign_user_to_task(t1.id, "dev2", "pruebas")
+        usuarios_csv = str(tmp_path / "usuarios.csv")
+        tareas_csv = str(tmp_path / "tareas.csv")
+        bulk.exportar(handler, usuarios_csv, tareas_csv)
+
+        destino = DataHandler(storage=AlmacenamientoMemoria())
+        escrituras = []
+        monkeypatch.setattr(destino, "save_data", lambda: escrituras.append(1))
+
+        # Act
+        resultado = bulk.importar(destino, usuarios_csv, tareas_csv)
+
+        # Assert
+        assert resultado == (2, 2)
+        assert len(escrituras) == 1
+        assert [t.to_dict() for t in destino.tasks] == [t.to_dict() for t in handler.tasks]
+        assert destino.get_stats() == handler.get_stats()
+        assert destino.next_task_id == handler.next_task_id
+
+    def test_importar_valida_tipos(self, handler, tmp_path, capsys):
+        """Caso de error: Registros con tipos inválidos se rechazan sin importar nada
+
+        Caso de prueba: CP-IMP-003
+        Descripción: Verificar la validación de tipos de import_records y el error de bulk.main
+        Entrada: nombre numérico, asignación que no es objeto, tarea que no es objeto y dependencia "x"
+        Resultado esperado: ValueError con cada error, almacén sin cambios y bulk.main retorna 1 sin traceback
+        """
+        # Arrange
+        tareas = [
+            {"nombre": 5, "descripcion": "D", "usuario_creador": "dev1", "rol": "infra"},
+            {"nombre": "B", "descripcion": "D", "usuario_creador": "dev1", "rol": "infra",
+             "usuarios_asignados": ["dev2"]},
+            "no es una tarea",
+            {"nombre": "C", "descripcion": "D", "usuario_creador": "dev1", "rol": "infra", "dependencias": ["x"]}
+        ]
+        usuarios = [{"alias": ["dev3"], "nombre": "Ana"}]
+        archivo = tmp_path / "tareas.ndjson"
+        archivo.write_text('{"nombre": "A", "descripcion": "D", "usuario_creador": 7, "rol": "infra"}\n')
+
+        # Act
+        with pytest.raises(ValueError) as error:
+            handler.import_records(usuarios, tareas)
+        codigo = bulk.main(["--data", str(tmp_path / "data.json"), "import", "--tareas", str(archivo)])
+
+        # Assert
+        mensaje = str(error.value)
+        assert "Usuario 0: los campos 'alias' y 'nombre' deben ser texto" in mensaje
+        assert "Tarea 0: campo 'nombre' debe ser texto" in mensaje
+        assert "Tarea 1: cada usuario asignado debe ser un objeto" in mensaje
+        assert "Tarea 2: debe ser un objeto" in mensaje
+        assert "Tarea 3: dependencia 'x' debe ser un número" in mensaje
+        assert handler.tasks == [] and len(handler.users) == 2
+        assert codigo == 1
+        assert "campo 'usuario_creador' debe ser texto" in capsys.readouterr().err
+
+    def test_importar_dependencias_como_texto(self, handler):
+        """Caso de éxito: Los IDs de dependencias en texto se convierten a número
+
+        Caso de prueba: CP-IMP-004
+        Descripción: Verificar que "dependencias": ["1"] se acepta como la tarea 1
+        Entrada: tarea 1 y tarea 2 que depende de "1"
+        Resultado esperado: Tarea 2 con dependencias [1] y bloqueada
+        """
+        # Arrange
+        tareas = [
+            {"id": 1, "nombre": "A", "descripcion": "D", "usuario_creador": "dev1", "rol": "infra"},
+            {"id": 2, "nombre": "B", "descripcion": "D", "usuario_creador": "dev2", "rol": "pruebas", "dependencias": ["1"]}
+        ]
+
+        # Act
+        handler.import_records([], tareas)
+
+        # Assert
+        assert handler.get_task_by_id(2).dependencias == [1]
+        assert handler.get_stats()["bloqueadas"] == 1
+
+
+class TestIndicesPersistidos:
+
+    def test_reinicio_usa_indices_persistidos(self, file_handler):
+        """Caso de éxito: Un reinicio tras close() carga los índices del archivo auxiliar
+
+        Caso de prueba: CP-IDX-001
+        Descripción: Verificar que los índices persistidos se usan y equivalen a reconstruirlos
+        Entrada: tareas con dependencia; close() y nuevo DataHandler sobre el mismo archivo
+        Resultado esperado: index_source == 'sidecar' con las mismas estadísticas y búsquedas
+        """
+        # Arrange
+        t1 = file_handler.create_task("Login", "Formulario", "dev1", "programador")
+        t2 = file_handler.create_task("Base de datos", "Esquema", "dev2", "infra")
+        file_handler.add_task_dependency(t1.id, t2.id)
+
+        # Act
+        file_handler.close()
+        recargado = DataHandler(file_handler.filename)
+
+        # Assert
+        assert recargado.index_source == "sidecar"
+        assert recargado.get_stats() == file_handler.get_stats()
+        assert [t.id for t, _ in recargado.search_tasks("esquema")] == [t2.id]
+        assert [t.id for t in recargado.get_ready_tasks()] == [t2.id]
+
+    def test_datos_modificados_reconstruye(self, file_handler):
+        """Caso de éxito: Si los datos cambiaron después de guardar los índices, se reconstruyen
+
+        Caso de prueba: CP-IDX-002
+        Descripción: Verificar que la firma del archivo de datos invalida los índices persistidos
+        Entrada: close() seguido de otra mutación; y un archivo de índices corrupto
+        Resultado esperado: index_source == 'rebuild' en ambos casos
+        """
+        # Arrange
+        file_handler.create_task("Login", "Formulario", "dev1", "programador")
+        file_handler.close()
+        file_handler.create_task("Servidor", "Desplegar", "dev2", "infra")
+
+        # Act & Assert
+        recargado = DataHandler(file_handler.filename)
+        assert recargado.index_source == "rebuild"
+        assert recargado.get_stats()["total_tareas"] == 2
+
+        recargado.close()
+        with open(recargado.index_filename, "r+b") as f:
+            f.seek(-1, 2)
+            f.write(b"\x00")
+        assert DataHandler(file_handler.filename).index_source == "rebuild"
+
+    def test_indices_con_contenido_ajeno_no_se_ejecutan(self, file_handler, tmp_path):
+        """Caso de error: Un archivo de índices con un pickle o datos inesperados se ignora
+
+        Caso de prueba: CP-IDX-003
+        Descripción: Verificar que cargar los índices no deserializa objetos ejecutando código
+        Entrada: archivo de índices con firma y checksum válidos cuyo contenido es un pickle, y otro con una lista
+        Resultado esperado: index_source == 'rebuild', sin ejecutar el pickle
+        """
+        # Arrange
+        file_handler.create_task("Login", "Formulario", "dev1", "programador")
+        file_handler.close()
+        marca = tmp_path / "ejecutado"
+
+        class Carga:
+            def __reduce__(self):
+                return (open, (str(marca), "w"))
+
+        firma = file_handler._signature(file_handler.storage.leer())
+
+        for contenido in [pickle.dumps(Carga()), marshal.dumps([1, 2, 3])]:
+            cabecera = sidecar._CABECERA.pack(sidecar._MARCA, DataHandler.INDEX_VERSION, firma,
+                                              hashlib.sha256(contenido).digest())
+            with open(file_handler.index_filename, "wb") as f:
+                f.write(cabecera + contenido)
+
+            # Act
+            recargado = DataHandler(file_handler.filename)
+
+            # Assert
+            assert recargado.index_source == "rebuild"
+            assert not marca.exists()
+            assert recargado.get_stats()["total_tareas"] == 1
+
+
+class TestAlmacenamientoMemoria:
+
+    def test_memoria_sin_archivos(self, memory_storage, tmp_path, monkeypatch):
+        """Caso de éxito: El almacenamiento en memoria no escribe en disco y conserva los datos
+
+        Caso de prueba: CP-MEM-001
+        Descripción: Verificar que un DataHandler en memoria persiste y recarga sin archivos
+        Entrada: tarea finalizada y archivada; nuevo DataHandler sobre el mismo almacenamiento
+        Resultado esperado: Directorio de trabajo vacío y datos y archivadas recuperados al recargar
+        """
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        handler = DataHandler(storage=memory_storage)
+        handler.create_user("dev1", "Juan Pérez")
+        task = handler.create_task("Login", "Formulario", "dev1", "programador")
+        handler.update_task_state(task.id, "en_progreso")
+        handler.update_task_state(task.id, "finalizada")
+        handler.archive_finalized(edad_minima=0)
+
+        # Act
+        handler.close()
+        recargado = DataHandler(storage=memory_storage)
+
+        # Assert
+        assert list(tmp_path.iterdir()) == []
+        assert handler.filename is None
+        assert recargado.get_user_by_alias("dev1") is not None
+        assert recargado.get_archived_task(task.id)["estado"] == "finalizada"
+        assert recargado.get_stats() == handler.get_stats()
+
+    def test_restaurar_snapshot(self, handler_con_datos, datos_base):
+        """Caso de éxito: restore vuelve al estado del snapshot, índices incluidos
+
+        Caso de prueba: CP-MEM-002
+        Descripción: Verificar snapshot/restore sobre el fixture de datos base compartido
+        Entrada: cambios sobre los datos base y luego restore del snapshot
+        Resultado esperado: Mismas tareas, estadísticas y tareas listas que los datos base
+        """
+        # Arrange
+        esperado = DataHandler(storage=AlmacenamientoMemoria())
+        esperado.restore(datos_base)
+        handler_con_datos.update_task_state(2, "en_progreso")
+        handler_con_datos.create_task("Servidor", "Desplegar", "dev1", "infra")
+
+        # Act
+        handler_con_datos.restore(datos_base)
+
+        # Assert
+        assert handler_con_datos.snapshot() == datos_base
+        assert handler_con_datos.get_stats() == esperado.get_stats()
+        assert [t.id for t in handler_con_datos.get_ready_tasks()] == [2]
+        assert DataHandler(storage=handler_con_datos.storage).next_task_id == 3
+
+
+class TestFormatoBinario:
+
+    def test_guardar_y_cargar_binario(self, tmp_path):
+        """Caso de éxito: Un DataHandler sobre el formato binario persiste y recarga los datos
+
+        Caso de prueba: CP-BIN-001
+        Descripción: Verificar el formato binario comprimido y su detección al abrir el archivo
+        Entrada: tarea con dependencia y asignación guardada con compresión gzip
+        Resultado esperado: Cabecera binaria, y al recargar sin indicar formato los mismos datos
+        """
+        # Arrange
+        filename = str(tmp_path / "data.bin")
+        handler = DataHandler(storage=AlmacenamientoBinario(filename, "gzip"))
+        handler.create_user("dev1", "Juan Pérez")
+        handler.create_user("dev2", "María García")
+        t1 = handler.create_task("Login", "Formulario de autenticación", "dev1", "programador")
+        t2 = handler.create_task("Base de datos", "Esquema", "dev2", "infra")
+        handler.add_task_dependency(t1.id, t2.id)
+        handler.assign_user_to_task(t1.id, "dev2", "pruebas")
+
+        # Act
+        recargado = DataHandler(filename)
+
+        # Assert
+        with open(filename, "rb") as f:
+            assert f.read(6) == b"TSKDAT"
+        assert isinstance(recargado.storage, AlmacenamientoBinario)
+        assert recargado.snapshot() == handler.snapshot()
+        assert recargado.get_stats() == handler.get_stats()
+
+    def test_convertir_ida_y_vuelta(self, file_handler, tmp_path):
+        """Caso de éxito: Convertir JSON a binario y de vuelta conserva los datos
+
+        Caso de prueba: CP-BIN-002
+        Descripción: Verificar el subcomando convert de bulk.py en ambos sentidos
+        Entrada: archivo JSON con una tarea, convertido a binario zlib y luego a JSON
+        Resultado esperado: Mismo contenido en los tres archivos; formato desconocido da error
+        """
+        # Arrange
+        file_handler.create_task("Login", "Formulario", "dev1", "programador")
+        binario = str(tmp_path / "data.bin")
+        json_final = str(tmp_path / "final.json")
+
+        # Act
+        assert bulk.main(["--data", file_handler.filename, "convert", binario]) == 0
+        assert bulk.main(["--data", binario, "convert", json_final, "--formato", "json"]) == 0
+
+        # Assert
+        with open(file_handler.filename) as original, open(json_final) as final:
+            assert json.load(original) == json.load(final)
+        assert DataHandler(binario).snapshot() == file_handler.snapshot()
+
+        with open(binario, "r+b") as f:
+            f.seek(6)
+            f.write(b"\x00\x09")
+        with pytest.raises(ValueError, match="Versión de formato 9"):
+            DataHandler(binario)
+
+
+class TestCambiosDeEstadoEnLote:
+
+    def test_orden_por_dependencias_y_una_escritura(self, handler, monkeypatch):
+        """Caso de éxito: Los cambios se aplican con las dependencias primero y una sola escritura
+
+        Caso de prueba: CP-LOT-001
+        Descripción: Verificar el orden topológico y los resultados por tarea de update_task_states
+        Entrada: t1 depende de t2 y t2 de t3, enviadas en orden t1, t2, t3; t4 'nueva' -> 'finalizada'
+        Resultado esperado: t1, t2 y t3 finalizadas, t4 con error de transición y una escritura
+        """
+        # Arrange
+        t1, t2, t3, t4 = [handler.create_task(f"Tarea {i}", "Sprint", "dev1", "programador") for i in range(4)]
+        handler.add_task_dependency(t1.id, t2.id)
+        handler.add_task_dependency(t2.id, t3.id)
+        for task in (t1, t2, t3):
+            handler.update_task_state(task.id, "en_progreso")
+        escrituras = []
+        monkeypatch.setattr(handler, "save_data", lambda: escrituras.append(1))
+
+        # Act
+        resultados = handler.update_task_states([
+            {"id": t1.id, "estado": "finalizada"},
+            {"id": t2.id, "estado": "finalizada"},
+            {"id": t3.id, "estado": "finalizada"},
+            {"id": t4.id, "estado": "finalizada"},
+            {"id": t1.id, "estado": "nueva"}
+        ])
+
+        # Assert
+        assert [r["ok"] for r in resultados] == [True, True, True, False, False]
+        assert "No se puede cambiar de 'nueva' a 'finalizada'" in resultados[3]["error"]
+        assert "más de una vez" in resultados[4]["error"]
+        assert all(t.estado == "finalizada" for t in (t1, t2, t3))
+        assert len(escrituras) == 1
+        assert handler.get_stats()["por_estado"]["finalizada"] == 3
+
+
+class TestEscrituraAtomica:
+
+    def test_falla_al_guardar_conserva_version_anterior(self, file_handler, monkeypatch):
+        """Caso de error: Una escritura interrumpida no daña el archivo de datos
+
+        Caso de prueba: CP-ATO-001
+        Descripción: Verificar que save_data escribe en un temporal y lo reemplaza solo al terminar
+        Entrada: falla en os.replace al crear una tarea
+        Resultado esperado: El archivo conserva la versión anterior completa y no quedan temporales
+        """
+        # Arrange
+        file_handler.create_task("Login", "Formulario", "dev1", "programador")
+        with open(file_handler.filename) as f:
+            anterior = f.read()
+
+        def replace_interrumpido(origen, destino):
+            raise OSError("disco lleno")
+
+        monkeypatch.setattr(os, "replace", replace_interrumpido)
+
+        # Act
+        with pytest.raises(OSError):
+            file_handler.create_task("Servidor", "Desplegar", "dev2", "infra")
+
+        # Assert
+        monkeypatch.undo()
+        with open(file_handler.filename) as f:
+            assert f.read() == anterior
+        assert os.listdir(os.path.dirname(file_handler.filename)) == ["data.json"]
+        assert len(DataHandler(file_handler.filename).tasks) == 1
+
+    def test_reemplazo_conserva_permisos(self, file_handler, tmp_path):
+        """Caso de éxito: La escritura atómica conserva los permisos del archivo de datos
+
+        Caso de prueba: CP-ATO-002
+        Descripción: Verificar que el temporal de mkstemp (0600) no cambia los permisos del archivo
+        Entrada: data.json con permisos 0640 y un archivo nuevo creado por save_data
+        Resultado esperado: 0640 tras guardar, y 0666 menos la umask para el archivo nuevo
+        """
+        # Arrange
+        os.chmod(file_handler.filename, 0o640)
+        umask = os.umask(0)
+        os.umask(umask)
+
+        # Act
+        file_handler.create_task("Login", "Formulario", "dev1", "programador")
+        nuevo = DataHandler(str(tmp_path / "nuevo.json"))
+        nuevo.create_user("dev1", "Juan Pérez")
+
+        # Assert
+        assert stat.S_IMODE(os.stat(file_handler.filename).st_mode) == 0o640
+        assert stat.S_IMODE(os.stat(nuevo.filename).st_mode) == 0o666 & ~umask
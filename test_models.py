@@ -1,3 +1,4 @@
+import json
 import pytest
 import sys
 import os
@@ -7,7 +8,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from models.usuario import Usuario
 from models.tarea import Tarea
-from models.asignacion import Asignacion
+from models.asignacion import Asignacion, TablaAsignaciones
 
 
 class TestUsuario:
@@ -57,6 +58,26 @@ class TestUsuario:
         assert usuario_reconstructed.nombre == usuario.nombre
         assert usuario_reconstructed.tareas_asignadas == usuario.tareas_asignadas
 
+    def test_usuario_ligado_no_modifica_la_tabla(self):
+        """Caso de error: Las tareas de un usuario ligado a la tabla no se reemplazan desde el usuario
+        
+        Caso de prueba: CP-USR-003
+        Descripción: Verificar que el setter de tareas_asignadas no desliga al usuario de TablaAsignaciones
+        Entrada: usuario ligado con la tarea 1 asignada; se intenta asignar [1, 99]
+        Resultado esperado: ValueError y la tabla sigue con solo la tarea 1
+        """
+        # Arrange
+        tabla = TablaAsignaciones()
+        usuario = Usuario("dev1", "Juan Pérez")
+        tabla.vincular_usuario(usuario)
+        tabla.agregar(Asignacion(1, "dev1", "programador"))
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match="desde la tarea"):
+            usuario.tareas_asignadas = [1, 99]
+        assert usuario.tareas_asignadas == [1]
+        assert tabla.conteo_por_usuario() == {"dev1": 1}
+
 
 class TestTarea:
     
@@ -480,6 +501,52 @@ class TestTarea:
         assert "id" in dict_resultado
         assert "usuarios_asignados" in dict_resultado
 
+    
+    def test_rol_asignado_y_orden_estable(self):
+        """Caso de éxito: Consultar el rol de un usuario asignado conservando el orden
+        
+        Caso de prueba: CP-TAR-022
+        Descripción: Verificar rol_asignado y el orden de usuarios_asignados tras remover y reasignar
+        Entrada: tarea de dev1 con tester1 y ops1; se remueve y reasigna tester1
+        Resultado esperado: tester1 queda al final con su nuevo rol
+        """
+        # Arrange
+        tarea = Tarea(1, "Implementar API", "Desarrollar endpoints REST", "dev1", "programador")
+        tarea.asignar_usuario("tester1", "pruebas")
+        tarea.asignar_usuario("ops1", "infra")
+        
+        # Act
+        tarea.remover_usuario("tester1")
+        tarea.asignar_usuario("tester1", "programador")
+        
+        # Assert
+        assert tarea.rol_asignado("tester1") == "programador"
+        assert tarea.rol_asignado("nadie") is None
+        assert [a["usuario"] for a in tarea.usuarios_asignados] == ["dev1", "ops1", "tester1"]
+
+    def test_textos_internados_al_cargar(self):
+        """Caso de éxito: Alias, roles y estados cargados comparten una sola copia
+
+        Caso de prueba: CP-TAR-023
+        Descripción: Verificar que from_dict interna los textos repetidos de cada tarea
+        Entrada: dos tareas deserializadas de JSON con el mismo creador, rol y estado
+        Resultado esperado: Los atributos de ambas tareas son el mismo objeto
+        """
+        # Arrange
+        datos = json.dumps({"id": 1, "nombre": "A", "descripcion": "D", "usuario_creador": "dev_" + "uno",
+                            "rol": "programador", "estado": "en_progreso",
+                            "usuarios_asignados": [{"usuario": "dev_uno", "rol": "programador"}]})
+
+        # Act
+        tarea1 = Tarea.from_dict(json.loads(datos))
+        tarea2 = Tarea.from_dict(json.loads(datos))
+
+        # Assert
+        assert tarea1.usuario_creador is tarea2.usuario_creador
+        assert tarea1.rol is tarea2.rol is Tarea.ROLES_VALIDOS[0]
+        assert tarea1.estado is tarea2.estado
+        assert tarea1._asignados["dev_uno"].user_alias is tarea2.usuario_creador
+
 
 class TestAsignacion:
     